@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+MANIFEST = ".export_hashes.json"
+
+
+def maze_inputs(json_path):
+    """Files an export of json_path depends on: the JSON and its .npy, if any."""
+    inputs = [json_path]
+    npy_path = json_path.replace('.json', '.npy')
+    if os.path.exists(npy_path):
+        inputs.append(npy_path)
+    return inputs
+
+
+def has_solution(json_path):
+    """Whether a maze file has a saved solution, found without parsing the JSON."""
+    if os.path.getsize(json_path) == 0:
+        return False
+    with open(json_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return data.find(b'"solution":') != -1
+
+
+def content_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def plan_exports(directory="mazes", pattern="maze_*.json", solutions=True, check='mtime', force=False,
+                 fast=False):
+    """
+    List the images to (re)export for the mazes in a directory.
+
+    Each maze gets <name>.png, like export_maze_image, and mazes with a
+    saved solution also get <name>_solution.png, like
+    dead_end_solver.export_solution_image.
+
+    Args:
+        directory (str): Directory with maze JSON files
+        pattern (str): Glob pattern for the maze files
+        solutions (bool): Also export solution images
+        check (str): 'mtime' - an image is up to date when it is newer than
+            its inputs (images are moved in place only once complete, so a
+            killed export leaves none to mistake for current); 'hash' - when the inputs' content hash matches the
+            one recorded in the manifest by the last export
+        force (bool): Export everything
+        fast (bool): The images are to be streamed (export_image); the
+            manifest records the mode, so switching it re-exports
+
+    Returns:
+        tuple: (jobs, skipped) where jobs are (kind, json_path, output_path,
+        hash) tuples, largest input first, and skipped is the number of
+        images already up to date
+    """
+    manifest = load_manifest(directory) if check == 'hash' else {}
+    jobs = []
+    skipped = 0
+
+    for json_path in sorted(glob.glob(os.path.join(directory, pattern))):
+        kinds = ['maze']
+        if solutions and has_solution(json_path):
+            kinds.append('solution')
+
+        inputs = maze_inputs(json_path)
+        digest = None
+        if check == 'hash':
+            digest = content_hash(inputs) + (':fast' if fast else '')
+        newest = max(os.path.getmtime(path) for path in inputs)
+
+        for kind in kinds:
+            output = json_path.replace('.json', '.png' if kind == 'maze' else '_solution.png')
+            if not force and os.path.exists(output):
+                if check == 'hash' and manifest.get(os.path.basename(output)) == digest:
+                    skipped += 1
+                    continue
+                if check == 'mtime' and os.path.getmtime(output) >= newest:
+                    skipped += 1
+                    continue
+            jobs.append((kind, json_path, output, digest))
+
+    jobs.sort(key=lambda job: os.path.getsize(job[1]), reverse=True)
+    return jobs, skipped
+
+
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def export_image(kind, json_path, output_path, fast=False):
+    """
+    Export one maze or solution image the way the interactive exporters do.
+
+    Their progress output is swallowed; a solution export that fails
+    raises instead of returning None. With fast, the image is streamed as
+    a palette PNG by png_stream at the same cell size instead: no caption
+    strip or S/E labels, but an order of magnitude faster to encode than
+    pygame's RGB PNGs, and smaller.
+
+    Returns:
+        int: Size of the image in bytes
+    """
+    from dead_end_solver import export_solution_image, solution_cell_size
+    from export_maze_image import export_maze_to_image, load_maze_from_file, maze_cell_size
+
+    maze, data = load_maze_from_file(json_path)
+    start = tuple(data.get('start', [1, 1]))
+    end = tuple(data.get('end', [maze.shape[0] - 2, maze.shape[1] - 2]))
+
+    if fast:
+        from png_stream import write_maze_png
+
+        if kind == 'maze':
+            write_maze_png(maze, output_path, maze_cell_size(maze.size), None, start, end)
+        else:
+            solution = np.array(data['solution'], dtype=np.uint8)
+            write_maze_png(maze, output_path, solution_cell_size(maze.size), solution, start, end)
+        return os.path.getsize(output_path)
+
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        if kind == 'maze':
+            export_maze_to_image(maze, output_path, start, end)
+        else:
+            solution = np.array(data['solution'], dtype=np.uint8)
+            if export_solution_image(maze, solution, start, end, json_path) is None:
+                raise RuntimeError(log.getvalue().strip().splitlines()[-1])
+    return os.path.getsize(output_path)
+
+
+def batch_export(directory="mazes", pattern="maze_*.json", solutions=True, check='mtime', force=False,
+                 workers=None, fast=False, progress=True):
+    """
+    Export every maze image (and solution image) in a directory across a process pool.
+
+    Images that are already up to date are skipped, see plan_exports;
+    fast streams palette PNGs, see export_image.
+
+    Returns:
+        dict: Counts of exported, skipped and failed images, the failures,
+        bytes written, elapsed seconds and images per second
+    """
+    start_time = time.perf_counter()
+    jobs, skipped = plan_exports(directory, pattern, solutions, check, force, fast)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+
+    manifest = load_manifest(directory) if check == 'hash' else None
+    exported = 0
+    written = 0
+    failures = []
+
+    if jobs:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {pool.submit(export_image, *job[:3], fast): job for job in jobs}
+            for future in as_completed(futures):
+                kind, json_path, output, digest = futures[future]
+                try:
+                    written += future.result()
+                except Exception as e:
+                    failures.append((output, f"{type(e).__name__}: {e}"))
+                    if progress:
+                        print(f"  FAILED {os.path.basename(output)}: {e}")
+                    continue
+
+                exported += 1
+                if manifest is not None:
+                    manifest[os.path.basename(output)] = digest
+                if progress:
+                    print(f"  [{exported + len(failures)}/{len(jobs)}] {os.path.basename(output)}")
+
+    if manifest is not None and exported:
+        save_manifest(directory, manifest)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        'exported': exported,
+        'skipped': skipped,
+        'failed': len(failures),
+        'failures': failures,
+        'bytes_written': written,
+        'workers': workers,
+        'elapsed': elapsed,
+        'images_per_second': exported / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every maze (and solution) image in a directory")
+    parser.add_argument('--directory', default="mazes", help="Maze directory (default: mazes)")
+    parser.add_argument('--pattern', default="maze_*.json", help="Glob for maze files (default: maze_*.json)")
+    parser.add_argument('--no-solutions', action='store_true', help="Skip solution images")
+    parser.add_argument('--check', choices=['mtime', 'hash'], default='mtime',
+                        help="How to tell an image is up to date (default: mtime)")
+    parser.add_argument('--force', action='store_true', help="Re-export up-to-date images too")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: all cores)")
+    parser.add_argument('--fast', action='store_true',
+                        help="Stream palette PNGs without the caption strip (much faster)")
+    parser.add_argument('--quiet', action='store_true', help="Only print the summary")
+    args = parser.parse_args()
+
+    stats = batch_export(args.directory, args.pattern, not args.no_solutions, args.check, args.force,
+                         args.workers, args.fast, progress=not args.quiet)
+
+    print(f"\nExported {stats['exported']} images ({stats['bytes_written'] / (1024 * 1024):.1f} MB), "
+          f"skipped {stats['skipped']} up to date, {stats['failed']} failed")
+    print(f"{stats['elapsed']:.1f} seconds on {stats['workers']} workers: "
+          f"{stats['images_per_second']:.2f} images/sec")
+
+
+if __name__ == "__main__":
+    main()
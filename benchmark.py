@@ -0,0 +1,291 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from large_maze_generator import PRESETS, LargeMazeGenerator
+from solver_registry import available_solvers, peak_rss
+
+
+# Bumped when the layout of the result JSON changes
+FORMAT_VERSION = 1
+
+# Presets run by default; the larger ones take minutes per case
+DEFAULT_PRESETS = ['1', '2', '3']
+
+# Cases besides the solvers, in the order they run
+BASE_CASES = ['generate', 'save', 'load', 'export_image', 'export_png_stream']
+
+
+def all_cases():
+    """Every benchmark case: generation, one solve:<name> per solver, save/load and exports."""
+    return BASE_CASES[:1] + [f"solve:{name}" for name in available_solvers()] + BASE_CASES[1:]
+
+
+def select_cases(patterns=None):
+    """
+    Cases matching comma-separated names or groups ('solve' for every
+    solver, 'export' for both exports), in run order.
+    """
+    cases = all_cases()
+    if not patterns:
+        return cases
+    wanted = patterns.split(',')
+    return [case for case in cases
+            if any(case == w or case.startswith(w + ':') or case.startswith(w + '_') for w in wanted)]
+
+
+def summarize(times):
+    """Median, p95, min, max and mean of a list of timings, in seconds."""
+    if not times:
+        return {'median': None, 'p95': None, 'min': None, 'max': None, 'mean': None}
+    times = np.asarray(times, dtype=np.float64)
+    return {
+        'median': float(np.median(times)),
+        'p95': float(np.percentile(times, 95)),
+        'min': float(times.min()),
+        'max': float(times.max()),
+        'mean': float(times.mean()),
+    }
+
+
+def _case_action(case, maze, width, height, seed, workdir, time_limit):
+    # Setup for one case (untimed); returns a callable doing one timed run,
+    # which returns (seconds, status) - solvers report their own solve time
+    start, end = (1, 1), (height - 2, width - 2)
+    generator = LargeMazeGenerator(width, height, verbose=False)
+
+    if case == 'generate':
+        def generate():
+            random.seed(seed)
+            t = time.perf_counter()
+            generator.generate_iterative(visualize=False)
+            return time.perf_counter() - t, 'ok'
+        return generate
+
+    if case.startswith('solve:'):
+        from solver_registry import run_solver
+
+        name = case.split(':', 1)[1]
+
+        def solve():
+            result = run_solver(name, maze, start, end, track_memory=False, time_limit=time_limit)
+            return result.solve_time, 'ok' if result.solved else result.status
+        return solve
+
+    os.chdir(workdir)
+    filename = "maze_benchmark.json"
+
+    if case == 'save':
+        def save():
+            t = time.perf_counter()
+            generator.save_maze(maze, filename, export_image=False)
+            return time.perf_counter() - t, 'ok'
+        return save
+
+    if case == 'load':
+        from dead_end_solver import load_maze
+
+        generator.save_maze(maze, filename, export_image=False)
+
+        def load():
+            t = time.perf_counter()
+            load_maze(filename, "mazes")
+            return time.perf_counter() - t, 'ok'
+        return load
+
+    if case == 'export_image':
+        from export_maze_image import export_maze_to_image
+
+        def export():
+            t = time.perf_counter()
+            export_maze_to_image(maze, "maze_benchmark.png", start, end)
+            return time.perf_counter() - t, 'ok'
+        return export
+
+    if case == 'export_png_stream':
+        from export_maze_image import maze_cell_size
+        from png_stream import write_maze_png
+
+        def stream():
+            t = time.perf_counter()
+            write_maze_png(maze, "maze_benchmark.png", maze_cell_size(maze.size), None, start, end)
+            return time.perf_counter() - t, 'ok'
+        return stream
+
+    raise ValueError(f"Unknown benchmark case: {case}")
+
+
+def run_case(case, maze_path, width, height, seed=42, repeats=5, warmup=1, time_limit=None):
+    """
+    Time one case: warmup runs, then repeated timed runs.
+
+    Meant to run in a fresh process (see run_benchmarks), so the peak RSS
+    reported belongs to this case alone; baseline_rss is the peak after
+    imports and setup, before the first run.
+
+    Returns:
+        dict: Case name, status, timings with their summary and RSS in bytes
+    """
+    maze = np.load(maze_path)
+    times = []
+    status = 'ok'
+
+    with tempfile.TemporaryDirectory(prefix="maze_benchmark_") as workdir, \
+            contextlib.redirect_stdout(io.StringIO()):
+        cwd = os.getcwd()
+        try:
+            action = _case_action(case, maze, width, height, seed, workdir, time_limit)
+            baseline_rss = peak_rss()
+            for i in range(warmup + repeats):
+                elapsed, status = action()
+                if status != 'ok':
+                    break
+                if i >= warmup:
+                    times.append(elapsed)
+        finally:
+            os.chdir(cwd)
+
+    result = {'case': case, 'status': status, 'runs': len(times), 'times': times}
+    result.update(summarize(times))
+    result['baseline_rss'] = baseline_rss
+    result['peak_rss'] = peak_rss()
+    return result
+
+
+def environment():
+    """Machine and code version the results were taken on."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    from kernels import NUMBA_AVAILABLE
+
+    return {
+        'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': NUMBA_AVAILABLE,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(presets=None, cases=None, seed=42, repeats=5, warmup=1, time_limit=60.0, progress=True):
+    """
+    Run the benchmark cases over preset maze sizes.
+
+    Each preset's maze is generated once with the seed and shared through
+    a .npy file; each case then runs in its own spawned process, one at a
+    time, so cases neither share memory peaks nor compete for cores.
+
+    Args:
+        presets (list): Keys of large_maze_generator.PRESETS (DEFAULT_PRESETS by default)
+        cases (list): Case names (all_cases() by default)
+        seed (int): Random seed for every generated maze
+        repeats (int): Timed runs per case
+        warmup (int): Untimed runs first (JIT compilation, caches)
+        time_limit (float): Per-run deadline for solvers; a solver that
+            runs out gets status 'timeout' and no timings
+
+    Returns:
+        dict: {'format', 'environment', 'settings', 'results'} ready for JSON,
+        one result per (preset, case)
+    """
+    presets = presets or DEFAULT_PRESETS
+    cases = cases or all_cases()
+    results = []
+    context = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory(prefix="maze_benchmark_") as directory:
+        for key in presets:
+            width, height, _ = PRESETS[key]
+            random.seed(seed)
+            maze = LargeMazeGenerator(width, height, verbose=False).generate_iterative(visualize=False)
+            maze_path = os.path.join(directory, f"preset_{key}.npy")
+            np.save(maze_path, maze)
+            del maze
+
+            if progress:
+                print(f"Preset {key}: {width}x{height} ({width * height:,} cells)")
+            for case in cases:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    future = pool.submit(run_case, case, maze_path, width, height, seed, repeats,
+                                         warmup, time_limit)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'case': case, 'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                                  'runs': 0, 'times': []}
+                        result.update(summarize([]))
+                result = {'preset': key, 'width': width, 'height': height, 'cells': width * height,
+                          **result}
+                results.append(result)
+                if progress:
+                    print_result(result)
+
+    return {
+        'format': FORMAT_VERSION,
+        'environment': environment(),
+        'settings': {'presets': list(presets), 'seed': seed, 'repeats': repeats, 'warmup': warmup,
+                     'time_limit': time_limit},
+        'results': results,
+    }
+
+
+def print_result(result):
+    if result['status'] != 'ok':
+        print(f"  {result['case']:<32}{result['status']}{': ' + result['error'] if result.get('error') else ''}")
+        return
+    print(f"  {result['case']:<32}median {result['median']:>9.4f}s  p95 {result['p95']:>9.4f}s  "
+          f"peak RSS {result['peak_rss'] / (1024 * 1024):>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generation, solving, I/O and export")
+    parser.add_argument('--presets', default=','.join(DEFAULT_PRESETS),
+                        help=f"Comma-separated preset keys from {', '.join(PRESETS)} "
+                             f"(default: %(default)s)")
+    parser.add_argument('--cases', help="Comma-separated cases or groups (default: all): "
+                                        f"{', '.join(all_cases())}")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per case (default: 5)")
+    parser.add_argument('--warmup', type=int, default=1, help="Untimed runs first (default: 1)")
+    parser.add_argument('--time-limit', type=float, default=60.0,
+                        help="Per-run solver deadline in seconds (default: 60)")
+    parser.add_argument('--output', help="Result JSON file (default: benchmarks/benchmark_<timestamp>.json)")
+    args = parser.parse_args()
+
+    presets = args.presets.split(',')
+    unknown = [key for key in presets if key not in PRESETS]
+    if unknown:
+        parser.error(f"unknown presets: {', '.join(unknown)}")
+    cases = select_cases(args.cases)
+    if not cases:
+        parser.error(f"no cases match {args.cases}")
+
+    report = run_benchmarks(presets, cases, args.seed, args.repeats, args.warmup, args.time_limit)
+
+    output = args.output or os.path.join("benchmarks", f"benchmark_{report['environment']['timestamp']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+
+
+# Where named baselines are kept
+BASELINE_DIR = os.path.join("benchmarks", "baselines")
+
+# Slowdown always tolerated, as a fraction of the baseline median
+TOLERANCE = 0.10
+
+# Multiple of the measured run-to-run spread added to the tolerance
+NOISE_FACTOR = 1.0
+
+# Changes below this many seconds are never regressions (timer and scheduler noise)
+MIN_DELTA = 0.005
+
+# Peak RSS growth tolerated, as a fraction and an absolute floor in bytes
+MEMORY_TOLERANCE = 0.10
+MIN_MEMORY_DELTA = 16 * 1024 * 1024
+
+
+def load_report(path):
+    with open(path, 'r') as f:
+        report = json.load(f)
+    if 'results' not in report:
+        raise ValueError(f"{path} is not a benchmark result file")
+    return report
+
+
+def baseline_path(name):
+    """Path of a named baseline in BASELINE_DIR, or name itself when it is a .json path."""
+    if name.endswith('.json'):
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(result_path, name="default"):
+    """Store a benchmark result file as the named baseline."""
+    load_report(result_path)
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    shutil.copyfile(result_path, path)
+    return path
+
+
+def result_key(result):
+    """(stage, algorithm, size) of a benchmark result, e.g. ('solve', 'left_hand', '1001x1001')."""
+    stage, _, algorithm = result['case'].partition(':')
+    return stage, algorithm or '-', f"{result['width']}x{result['height']}"
+
+
+def spread(result):
+    """Relative run-to-run noise of a result: (p95 - min) / median."""
+    if not result.get('median'):
+        return 0.0
+    return (result['p95'] - result['min']) / result['median']
+
+
+def compare_result(base, new, tolerance=TOLERANCE, noise_factor=NOISE_FACTOR, min_delta=MIN_DELTA,
+                   memory_tolerance=MEMORY_TOLERANCE):
+    """
+    Compare one case of a new run with its baseline.
+
+    The median may grow by the tolerance plus noise_factor times the
+    larger spread of the two runs, so noisy cases need a bigger change to
+    be flagged, and never by less than min_delta seconds. A case that ran
+    in the baseline but not now (timeout, error) is a regression too.
+
+    Returns:
+        dict: key, medians, ratio, allowed limit and verdict: 'regression',
+        'improvement', 'ok', 'failed' (was ok, now not), 'still failing'
+        or 'fixed'; memory_verdict is 'regression' when peak RSS grew
+        beyond memory_tolerance (and MIN_MEMORY_DELTA)
+    """
+    comparison = {
+        'key': result_key(new),
+        'case': new['case'],
+        'preset': new.get('preset'),
+        'base_status': base['status'],
+        'status': new['status'],
+        'base_median': base.get('median'),
+        'median': new.get('median'),
+        'ratio': None,
+        'limit': None,
+        'memory_verdict': 'ok',
+    }
+
+    if base['status'] != 'ok' or new['status'] != 'ok':
+        if base['status'] == 'ok':
+            comparison['verdict'] = 'failed'
+        elif new['status'] == 'ok':
+            comparison['verdict'] = 'fixed'
+        else:
+            comparison['verdict'] = 'still failing'
+        return comparison
+
+    ratio = new['median'] / base['median'] if base['median'] > 0 else 1.0
+    limit = tolerance + noise_factor * max(spread(base), spread(new))
+    delta = new['median'] - base['median']
+    comparison['ratio'] = ratio
+    comparison['limit'] = limit
+    if ratio - 1 > limit and delta > min_delta:
+        comparison['verdict'] = 'regression'
+    elif 1 - ratio > limit and -delta > min_delta:
+        comparison['verdict'] = 'improvement'
+    else:
+        comparison['verdict'] = 'ok'
+
+    base_rss, new_rss = base.get('peak_rss'), new.get('peak_rss')
+    if base_rss and new_rss and new_rss > base_rss * (1 + memory_tolerance) and \
+            new_rss - base_rss > MIN_MEMORY_DELTA:
+        comparison['memory_verdict'] = 'regression'
+    comparison['base_peak_rss'] = base_rss
+    comparison['peak_rss'] = new_rss
+    return comparison
+
+
+def compare_reports(base, new, **thresholds):
+    """
+    Compare every case of a new benchmark report with a baseline report.
+
+    Returns:
+        tuple: (comparisons, missing, added) - comparisons for cases in both,
+        keys only in the baseline and keys only in the new report
+    """
+    base_results = {result_key(r): r for r in base['results']}
+    new_results = {result_key(r): r for r in new['results']}
+    comparisons = [compare_result(base_results[key], new_results[key], **thresholds)
+                   for key in new_results if key in base_results]
+    missing = [key for key in base_results if key not in new_results]
+    added = [key for key in new_results if key not in base_results]
+    return comparisons, missing, added
+
+
+def is_regression(comparison):
+    return comparison['verdict'] in ('regression', 'failed') or comparison['memory_verdict'] == 'regression'
+
+
+def environment_differences(base, new):
+    """Environment fields that differ between two reports (results may not be comparable)."""
+    fields = ('machine', 'platform', 'cpu_count', 'python', 'numpy', 'numba')
+    base_env, new_env = base.get('environment', {}), new.get('environment', {})
+    return [f"{field}: {base_env.get(field)} -> {new_env.get(field)}"
+            for field in fields if base_env.get(field) != new_env.get(field)]
+
+
+def print_comparison(comparisons, missing=(), added=()):
+    print(f"\n{'Stage':<19}{'Algorithm':<24}{'Size':>11}{'Base (s)':>11}{'New (s)':>11}"
+          f"{'Change':>9}{'Allowed':>9}  Verdict")
+    print("-" * 110)
+    for c in comparisons:
+        stage, algorithm, size = c['key']
+        base = f"{c['base_median']:.4f}" if c['base_median'] is not None else c['base_status']
+        new = f"{c['median']:.4f}" if c['median'] is not None else c['status']
+        change = f"{(c['ratio'] - 1) * 100:+.1f}%" if c['ratio'] is not None else '-'
+        limit = f"{c['limit'] * 100:.1f}%" if c['limit'] is not None else '-'
+        verdict = c['verdict']
+        if c['memory_verdict'] == 'regression':
+            verdict += (f", memory regression: peak RSS {c['base_peak_rss'] / (1024 * 1024):.0f} -> "
+                        f"{c['peak_rss'] / (1024 * 1024):.0f} MB")
+        print(f"{stage:<19}{algorithm:<24}{size:>11}{base:>11}{new:>11}{change:>9}{limit:>9}  {verdict}")
+    for key in missing:
+        print(f"  not run (in baseline): {' '.join(key)}")
+    for key in added:
+        print(f"  new (no baseline): {' '.join(key)}")
+
+
+def rerun_regressions(report, comparisons, base, retries=1, **thresholds):
+    """
+    Re-run the cases flagged as regressions and keep each case's faster run.
+
+    A one-off slow run (another process, thermal throttling) is then not
+    reported unless the slowdown reproduces.
+
+    Returns:
+        list: The comparisons, redone for the re-run cases
+    """
+    from benchmark import run_benchmarks
+
+    settings = report['settings']
+    for _ in range(retries):
+        flagged = [c for c in comparisons if is_regression(c)]
+        if not flagged:
+            break
+        print(f"\nRe-running {len(flagged)} flagged case(s)...")
+        for c in flagged:
+            rerun = run_benchmarks([c['preset']], [c['case']], settings['seed'], settings['repeats'],
+                                   settings['warmup'], settings['time_limit'])['results'][0]
+            for i, result in enumerate(report['results']):
+                if result_key(result) == c['key'] and (
+                        result['status'] != 'ok' or
+                        (rerun['status'] == 'ok' and rerun['median'] < result['median'])):
+                    report['results'][i] = rerun
+        comparisons, _, _ = compare_reports(base, report, **thresholds)
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store benchmark baselines and gate new runs against them")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    save = commands.add_parser('save', help="Store a benchmark result file as a baseline")
+    save.add_argument('results', help="Result JSON from benchmark.py")
+    save.add_argument('--name', default="default", help="Baseline name (default: default)")
+
+    for name, text in (('compare', "Compare a result file with a baseline"),
+                       ('run', "Run the baseline's benchmarks again and compare")):
+        command = commands.add_parser(name, help=text)
+        if name == 'compare':
+            command.add_argument('results', help="Result JSON from benchmark.py")
+        else:
+            command.add_argument('--cases', help="Only these cases or groups (see benchmark.py)")
+            command.add_argument('--retries', type=int, default=1,
+                                 help="Re-runs of flagged cases before reporting them (default: 1)")
+            command.add_argument('--output', help="Also save the new results here")
+        command.add_argument('--baseline', default="default", help="Baseline name or file (default: default)")
+        command.add_argument('--tolerance', type=float, default=TOLERANCE,
+                             help=f"Slowdown always tolerated (default: {TOLERANCE})")
+        command.add_argument('--noise-factor', type=float, default=NOISE_FACTOR,
+                             help=f"Multiple of the run spread added to the tolerance (default: {NOISE_FACTOR})")
+        command.add_argument('--min-delta', type=float, default=MIN_DELTA,
+                             help=f"Smallest slowdown in seconds that can fail (default: {MIN_DELTA})")
+        command.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE,
+                             help=f"Peak RSS growth tolerated (default: {MEMORY_TOLERANCE})")
+        command.add_argument('--json', help="Write the comparison to this JSON file")
+    args = parser.parse_args()
+
+    if args.command == 'save':
+        path = save_baseline(args.results, args.name)
+        print(f"Baseline saved: {path}")
+        return
+
+    path = baseline_path(args.baseline)
+    if not os.path.exists(path):
+        print(f"No baseline at {path}; store one with: python benchmark_compare.py save <results.json>")
+        sys.exit(2)
+    base = load_report(path)
+    thresholds = {'tolerance': args.tolerance, 'noise_factor': args.noise_factor,
+                  'min_delta': args.min_delta, 'memory_tolerance': args.memory_tolerance}
+
+    if args.command == 'run':
+        from benchmark import run_benchmarks, select_cases
+
+        settings = base['settings']
+        wanted = set(select_cases(args.cases))
+        # Cases left out on purpose are not reported as missing
+        base = dict(base, results=[r for r in base['results'] if r['case'] in wanted])
+        cases = list(dict.fromkeys(r['case'] for r in base['results']))
+        new = run_benchmarks(settings['presets'], cases, settings['seed'], settings['repeats'],
+                             settings['warmup'], settings['time_limit'])
+    else:
+        new = load_report(args.results)
+
+    comparisons, missing, added = compare_reports(base, new, **thresholds)
+    if args.command == 'run' and args.retries:
+        comparisons = rerun_regressions(new, comparisons, base, args.retries, **thresholds)
+    if args.command == 'run' and args.output:
+        with open(args.output, 'w') as f:
+            json.dump(new, f, indent=2)
+
+    print(f"Baseline: {path} ({base['environment'].get('timestamp')}, "
+          f"commit {(base['environment'].get('commit') or '?')[:10]})")
+    differences = environment_differences(base, new)
+    if differences:
+        print(f"Warning: environments differ, timings may not be comparable ({'; '.join(differences)})")
+    print_comparison(comparisons, missing, added)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'baseline': path, 'comparisons': comparisons,
+                       'missing': missing, 'added': added}, f, indent=2)
+
+    regressions = [c for c in comparisons if is_regression(c)]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond tolerance")
+        sys.exit(1)
+    print("\nNo regressions beyond tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,17 @@ import json
 import os
 import time
 import pygame
-import sys
 from datetime import datetime
 
+import metrics
+from dirty_renderer import DirtyCellRenderer
+from frame_pipeline import FramePipeline
+from viewport import CONTROLS
+from maze_render import save_maze_image
+from planner import load_array
 
+
+@metrics.timed('load')
 def load_maze(filename, directory="mazes"):
     filepath = os.path.join(directory, filename)
     
@@ -20,7 +27,7 @@ def load_maze(filename, directory="mazes"):
         maze = np.array(data['maze'])
     elif 'maze_file' in data:
         npy_path = os.path.join(directory, data['maze_file'])
-        maze = np.load(npy_path)
+        maze = load_array(npy_path)
     else:
         raise ValueError("No maze data found in file")
     
@@ -30,13 +37,111 @@ def load_maze(filename, directory="mazes"):
     return maze, start_pos, end_pos, data
 
 
-def solve_maze_dead_end_filling(maze, start, end, visualize=True):
+def count_open_neighbors(working_maze, y, x):
+    height, width = working_maze.shape
+    count = 0
+    neighbors = []
+    for dy, dx in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+        ny, nx = y + dy, x + dx
+        if 0 <= ny < height and 0 <= nx < width:
+            if working_maze[ny, nx] == 0:
+                count += 1
+                neighbors.append((ny, nx))
+    return count, neighbors
+
+
+def fill_dead_ends(working_maze, start, end, observer=None, budget=None, backend='auto'):
+    """
+    Fill dead ends in place until none remain.
+
+    Filled cells are set to 2; the open cells left over form the solution.
+    observer(cells, state) is called once per iteration with the dead ends
+    filled in it. With a budget, SolveInterrupted is raised between rows
+    once it runs out (between whole scans on the numba backend); explored
+    then holds the cells filled so far.
+
+    Returns:
+        tuple: (iterations, cells_filled)
+    """
+    from kernels import find_dead_ends, resolve_backend
+    from solver_registry import CELL_VISITED, SolveInterrupted
+
+    height, width = working_maze.shape
+    start, end = tuple(start), tuple(end)
+    iterations = 0
+    cells_filled = 0
+
+    if resolve_backend(backend) == 'numba':
+        while True:
+            iterations += 1
+            if budget is not None and budget.exceeded(height * width):
+                raise SolveInterrupted(budget.reason, explored=working_maze == 2,
+                                       counters={'steps': iterations, 'iterations': iterations,
+                                                 'cells_filled': cells_filled})
+            ys, xs = find_dead_ends(working_maze, start, end)
+            if not ys.size:
+                break
+
+            cells_filled += int(ys.size)
+            working_maze[ys, xs] = 2
+
+            if observer:
+                observer(list(zip(ys.tolist(), xs.tolist())), CELL_VISITED)
+
+        return iterations, cells_filled
+
+    while True:
+        iterations += 1
+        dead_ends = []
+
+        for y in range(height):
+            if budget is not None and budget.exceeded(width):
+                raise SolveInterrupted(budget.reason, explored=working_maze == 2,
+                                       counters={'steps': iterations, 'iterations': iterations,
+                                                 'cells_filled': cells_filled})
+            for x in range(width):
+                if working_maze[y, x] == 0 and (y, x) != start and (y, x) != end:
+                    open_count, neighbors = count_open_neighbors(working_maze, y, x)
+                    if open_count == 1:
+                        dead_ends.append((y, x))
+
+        if not dead_ends:
+            break
+
+        cells_filled += len(dead_ends)
+        for y, x in dead_ends:
+            working_maze[y, x] = 2
+
+        if observer:
+            observer(dead_ends, CELL_VISITED)
+
+    return iterations, cells_filled
+
+
+def make_legend(font, items, size=15, spacing=20):
+    """Render a color legend once onto an opaque surface so frames can just blit it."""
+    width = size + 5 + max(font.size(label)[0] for _, label in items)
+    legend = pygame.Surface((width, (len(items) - 1) * spacing + size))
+    legend.fill((255, 255, 255))
+    for i, (color, label) in enumerate(items):
+        y_pos = i * spacing
+        pygame.draw.rect(legend, color, (0, y_pos, size, size))
+        pygame.draw.rect(legend, (0, 0, 0), (0, y_pos, size, size), 1)
+        legend.blit(font.render(label, True, (0, 0, 0)), (size + 5, y_pos))
+    return legend
+
+
+def solve_maze_dead_end_filling(maze, start, end, visualize=True, verbose=True):
+    # verbose prints a progress line every 10 fill iterations; with metrics
+    # enabled the progress is recorded as events instead
+    from solver_registry import CELL_PATH, CELL_VISITED, CELL_WALL
+
     height, width = maze.shape
     total_cells = height * width
     
     if total_cells > 10000000:
         print(f"\nWarning: Very large maze ({total_cells:,} cells)")
-        print("Solving may take several minutes. Visualization updates reduced to prevent lag.\n")
+        print("Solving may take several minutes.\n")
     
     working_maze = maze.copy()
     solution = np.zeros_like(maze)
@@ -63,6 +168,7 @@ def solve_maze_dead_end_filling(maze, start, end, visualize=True):
         
         screen = pygame.display.set_mode((screen_width, screen_height))
         pygame.display.set_caption(f"Dead End Filling Solver - {height}x{width} | {cell_size}px cells")
+        print(f"View: {CONTROLS}")
         
         WHITE = (255, 255, 255)
         BLACK = (0, 0, 0)
@@ -73,141 +179,79 @@ def solve_maze_dead_end_filling(maze, start, end, visualize=True):
         
         font = pygame.font.Font(None, 24)
         clock = pygame.time.Clock()
-    
-    start_time = time.time()
-    iterations = 0
-    cells_filled = 0
-    
-    def count_open_neighbors(y, x):
-        count = 0
-        neighbors = []
-        for dy, dx in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            ny, nx = y + dy, x + dx
-            if 0 <= ny < height and 0 <= nx < width:
-                if working_maze[ny, nx] == 0:
-                    count += 1
-                    neighbors.append((ny, nx))
-        return count, neighbors
-    
-    def draw_maze():
-        if not visualize:
-            return
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
         
+        # Walls and grid are drawn once; frames repaint only the cells filled since the last one
+        renderer = DirtyCellRenderer(screen, maze, cell_size,
+                                     {CELL_VISITED: GRAY, CELL_WALL: BLACK, CELL_PATH: BLUE},
+                                     palette=np.array([WHITE, BLACK, BLUE, GREEN, RED], dtype=np.uint8),
+                                     start=start, end=end, area=(screen_width, screen_height - 60),
+                                     grid_color=(200, 200, 200), highlight=(CELL_PATH,))
         screen.fill(WHITE)
+        info_rect = pygame.Rect(0, screen_height - 60, screen_width, 60)
         
-        for y in range(height):
-            for x in range(width):
-                px = x * cell_size
-                py = y * cell_size
-                
-                if px >= screen_width - cell_size or py >= screen_height - 60:
-                    continue
-                
-                if (y, x) == start:
-                    color = GREEN
-                elif (y, x) == end:
-                    color = RED
-                elif working_maze[y, x] == 1:
-                    color = BLACK
-                elif working_maze[y, x] == 2:
-                    color = GRAY
-                else:
-                    color = WHITE
-                
-                if cell_size > 1:
-                    pygame.draw.rect(screen, color, (px, py, cell_size, cell_size))
-                    if cell_size > 2:
-                        pygame.draw.rect(screen, (200, 200, 200), (px, py, cell_size, cell_size), 1)
-                else:
-                    screen.set_at((px, py), color)
-        
-        elapsed = time.time() - start_time
-        info_text = f"Iteration: {iterations} | Filled: {cells_filled} | Time: {elapsed:.2f}s"
-        text_surface = font.render(info_text, True, BLACK)
-        screen.blit(text_surface, (10, screen_height - 50))
-        
-        # Draw color legend
-        legend_x = 10
-        legend_y = 10
-        legend_size = 15
-        legend_spacing = 20
-        
+        legend = None
         if cell_size >= 4:
-            legend_items = [
+            legend = make_legend(font, [
                 (GREEN, "Start"),
                 (RED, "End"),
                 (BLACK, "Wall"),
                 (GRAY, "Dead End"),
                 (WHITE, "Path")
-            ]
-            
-            for i, (color, label) in enumerate(legend_items):
-                y_pos = legend_y + i * legend_spacing
-                pygame.draw.rect(screen, color, (legend_x, y_pos, legend_size, legend_size))
-                pygame.draw.rect(screen, BLACK, (legend_x, y_pos, legend_size, legend_size), 1)
-                label_surface = font.render(label, True, BLACK)
-                screen.blit(label_surface, (legend_x + legend_size + 5, y_pos))
+            ])
+    
+    start_time = time.time()
+    iterations = 0
+    cells_filled = 0
+    
+    def draw_info():
+        screen.fill(WHITE, info_rect)
+        rects = [info_rect]
         
-        pygame.display.flip()
+        elapsed = time.time() - start_time
+        info_text = f"Iteration: {iterations} | Filled: {cells_filled} | Time: {elapsed:.2f}s"
+        text_surface = font.render(info_text, True, BLACK)
+        screen.blit(text_surface, (10, screen_height - 50))
         
-        if total_cells > 1000000:
-            clock.tick(120)
-        else:
-            clock.tick(60)
+        # Legend sits over the maze, so it goes back on top of any repainted cells
+        if legend is not None:
+            rects.append(screen.blit(legend, (10, 10)))
+        return rects
     
     print("Starting Dead End Filling algorithm...")
     print(f"Maze size: {height}x{width} = {total_cells:,} cells")
+    open_cells = int(np.count_nonzero(maze == 0))
     
-    if visualize:
-        draw_maze()
-    
-    found_dead_ends = True
-    
-    while found_dead_ends:
+    def on_fill(dead_ends, state):
+        nonlocal iterations, cells_filled
         iterations += 1
-        found_dead_ends = False
-        dead_ends = []
+        cells_filled += len(dead_ends)
         
-        for y in range(height):
-            for x in range(width):
-                if working_maze[y, x] == 0 and (y, x) != start and (y, x) != end:
-                    open_count, neighbors = count_open_neighbors(y, x)
-                    if open_count == 1:
-                        dead_ends.append((y, x))
+        if visualize:
+            pipeline.publish(dead_ends, CELL_VISITED)
         
-        if dead_ends:
-            found_dead_ends = True
-            cells_filled += len(dead_ends)
-            
-            for y, x in dead_ends:
-                working_maze[y, x] = 2
-            
-            if total_cells > 10000000:
-                update_freq = 10
-            elif total_cells > 1000000:
-                update_freq = 5
-            else:
-                update_freq = 1
-            
-            if visualize and iterations % update_freq == 0:
-                draw_maze()
-            
-            if iterations % 10 == 0:
-                print(f"Iteration {iterations}: Filled {len(dead_ends)} dead ends (Total: {cells_filled})")
+        if iterations % 10 == 0:
+            metrics.progress('solve', cells_filled, open_cells, verbose)
+    
+    def solve():
+        with metrics.phase('solve', algorithm='dead_end_filling') as solve_phase:
+            iterations, cells_filled = fill_dead_ends(working_maze, start, end, observer=on_fill)
+            solve_phase.update(iterations=iterations, cells_filled=cells_filled)
+            return iterations, cells_filled
+    
+    if visualize:
+        # The filling runs in a worker thread; the view follows it at a fixed frame rate
+        pipeline = FramePipeline(renderer)
+        iterations, cells_filled = pipeline.run(solve, draw=draw_info)
+        solve_time = pipeline.solve_time
+    else:
+        iterations, cells_filled = solve()
+        solve_time = time.time() - start_time
     
     for y in range(height):
         for x in range(width):
             if working_maze[y, x] == 0:
                 solution[y, x] = 1
     
-    end_time = time.time()
-    solve_time = end_time - start_time
-    
     print(f"\nDead End Filling Complete!")
     print(f"Total iterations: {iterations}")
     print(f"Dead ends filled: {cells_filled}")
@@ -215,66 +259,26 @@ def solve_maze_dead_end_filling(maze, start, end, visualize=True):
     print(f"Solve time: {solve_time:.2f} seconds")
     
     if visualize:
-        for y in range(height):
-            for x in range(width):
-                if solution[y, x] == 1:
-                    working_maze[y, x] = 0
-                elif working_maze[y, x] == 2:
-                    working_maze[y, x] = 1
-        
-        screen.fill(WHITE)
-        
-        for y in range(height):
-            for x in range(width):
-                px = x * cell_size
-                py = y * cell_size
-                
-                if px >= screen_width - cell_size or py >= screen_height - 60:
-                    continue
-                
-                if (y, x) == start:
-                    color = GREEN
-                elif (y, x) == end:
-                    color = RED
-                elif working_maze[y, x] == 1:
-                    color = BLACK
-                elif solution[y, x] == 1:
-                    color = BLUE
-                else:
-                    color = WHITE
-                
-                if cell_size > 1:
-                    pygame.draw.rect(screen, color, (px, py, cell_size, cell_size))
-                    if cell_size > 2:
-                        pygame.draw.rect(screen, (200, 200, 200), (px, py, cell_size, cell_size), 1)
-                else:
-                    screen.set_at((px, py), color)
+        # Filled dead ends turn back into walls and the remaining path is highlighted
+        renderer.mark(np.argwhere(working_maze == 2), CELL_WALL)
+        renderer.mark(np.argwhere(solution == 1), CELL_PATH)
+        rects = renderer.flush()
+        screen.fill(WHITE, info_rect)
+        rects.append(info_rect)
         
         final_text = f"SOLVED! Time: {solve_time:.2f}s | Path: {np.sum(solution)} cells"
         text_surface = font.render(final_text, True, (0, 128, 0))
         screen.blit(text_surface, (10, screen_height - 50))
         
-        # Draw final color legend
-        legend_x = 10
-        legend_y = 10
-        legend_size = 15
-        legend_spacing = 20
-        
-        legend_items = [
+        legend = make_legend(font, [
             (GREEN, "Start"),
             (RED, "End"),
             (BLACK, "Wall"),
             (BLUE, "Solution Path")
-        ]
+        ])
+        rects.append(screen.blit(legend, (10, 10)))
         
-        for i, (color, label) in enumerate(legend_items):
-            y_pos = legend_y + i * legend_spacing
-            pygame.draw.rect(screen, color, (legend_x, y_pos, legend_size, legend_size))
-            pygame.draw.rect(screen, BLACK, (legend_x, y_pos, legend_size, legend_size), 1)
-            label_surface = font.render(label, True, BLACK)
-            screen.blit(label_surface, (legend_x + legend_size + 5, y_pos))
-        
-        pygame.display.flip()
+        pygame.display.update(rects)
         
         print("\nClose window to exit...")
         waiting = True
@@ -282,6 +286,10 @@ def solve_maze_dead_end_filling(maze, start, end, visualize=True):
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     waiting = False
+                elif renderer.handle_event(event):
+                    rects = renderer.flush()
+                    rects.append(screen.blit(legend, (10, 10)))
+                    pygame.display.update(rects)
             clock.tick(30)
         
         pygame.quit()
@@ -289,13 +297,18 @@ def solve_maze_dead_end_filling(maze, start, end, visualize=True):
     return solution, cells_filled, solve_time
 
 
+@metrics.timed('save')
 def save_solution(filename, solution, stats, solve_time, directory="mazes"):
+    from solution_verifier import verify_solution
+
     filepath = os.path.join(directory, filename)
-    
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    maze, start, end, data = load_maze(filename, directory)
+    problems = verify_solution(maze, solution, start, end)
     
     data['solved'] = True
+    data['solution_valid'] = not problems
+    if problems:
+        data['solution_problems'] = problems
     data['solution'] = solution.tolist()
     data['algorithm'] = 'dead_end_filling'
     data['dead_ends_filled'] = int(stats)
@@ -307,80 +320,33 @@ def save_solution(filename, solution, stats, solve_time, directory="mazes"):
         json.dump(data, f, indent=2)
     
     print(f"\nSolution saved to: {filepath}")
+    if problems:
+        print(f"Warning: saved solution is not a single start-to-end path: {'; '.join(problems)}")
 
 
-def export_solution_image(maze, solution, start, end, filename):
-    height, width = maze.shape
-    total_cells = height * width
-    
+def solution_cell_size(total_cells):
+    """Pixels per cell for a solution image: smaller cells for bigger mazes."""
     if total_cells > 10000000:
-        cell_size = 5
+        return 5
     elif total_cells > 4000000:
-        cell_size = 8
+        return 8
     elif total_cells > 1000000:
-        cell_size = 12
+        return 12
     elif total_cells > 100000:
-        cell_size = 15
-    else:
-        cell_size = 20
-    
-    img_width = width * cell_size
-    img_height = height * cell_size + 40
-    
-    max_dim = 32767
-    if img_width > max_dim or img_height > max_dim:
-        cell_size = max(1, min(max_dim // width, max_dim // height))
-        img_width = width * cell_size
-        img_height = height * cell_size + 40
+        return 15
+    return 20
+
+
+def export_solution_image(maze, solution, start, end, filename):
+    height, width = maze.shape
+    cell_size = solution_cell_size(height * width)
     
+    # Beyond pygame's surface limits save_maze_image streams the PNG instead
     try:
-        pygame.init()
-        surface = pygame.Surface((img_width, img_height))
-        
-        BLACK = (0, 0, 0)
-        WHITE = (255, 255, 255)
-        GREEN = (0, 255, 0)
-        RED = (255, 0, 0)
-        BLUE = (100, 149, 237)
-        
-        surface.fill(WHITE)
-        
         print(f"Rendering solution image ({width}x{height})...")
-        for y in range(height):
-            for x in range(width):
-                if maze[y, x] == 1:
-                    color = BLACK
-                elif solution[y, x] == 1:
-                    color = BLUE
-                else:
-                    color = WHITE
-                
-                rect = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
-                pygame.draw.rect(surface, color, rect)
-        
-        start_y, start_x = start
-        start_rect = pygame.Rect(start_x * cell_size, start_y * cell_size, cell_size, cell_size)
-        pygame.draw.rect(surface, GREEN, start_rect)
-        
-        end_y, end_x = end
-        end_rect = pygame.Rect(end_x * cell_size, end_y * cell_size, cell_size, cell_size)
-        pygame.draw.rect(surface, RED, end_rect)
-        
-        if cell_size >= 8:
-            font = pygame.font.Font(None, min(24, cell_size * 2))
-            start_text = font.render('S', True, BLACK)
-            end_text = font.render('E', True, BLACK)
-            surface.blit(start_text, (start_x * cell_size + 2, start_y * cell_size + 2))
-            surface.blit(end_text, (end_x * cell_size + 2, end_y * cell_size + 2))
-        
-        font = pygame.font.Font(None, 24)
         info_text = f"Solved: {width}x{height} | Solution Path (Blue) | Dead End Filling Algorithm"
-        text_surface = font.render(info_text, True, BLACK)
-        surface.blit(text_surface, (10, height * cell_size + 10))
-        
         output_path = filename.replace('.json', '_solution.png')
-        pygame.image.save(surface, output_path)
-        pygame.quit()
+        save_maze_image(maze, output_path, cell_size, info_text, solution=solution, start=start, end=end)
         
         file_size = os.path.getsize(output_path) / (1024 * 1024)
         print(f"Solution image saved: {output_path} ({file_size:.2f} MB)")
@@ -0,0 +1,131 @@
+import numpy as np
+
+from maze_render import END, PALETTE, START, cell_codes
+from viewport import Viewport
+
+
+class DirtyCellRenderer:
+    """
+    Incremental maze view: a pan/zoom viewport plus a buffer of changed cells.
+
+    Solvers append changed cells to the dirty buffer - the renderer is an
+    observer(cells, state) - and flush() applies them to the viewport's code
+    grid and repaints only those cells, so a frame costs O(changed cells)
+    instead of O(maze cells). The whole view is redrawn only when it is
+    panned or zoomed (see handle_event), at O(visible pixels).
+
+    Start and end keep their static colors.
+    """
+
+    def __init__(self, screen, maze, cell_size, colors, palette=PALETTE, start=None, end=None,
+                 area=None, grid_color=None, highlight=(), capacity=4096):
+        """
+        Args:
+            screen (pygame.Surface): Surface the maze is shown on
+            maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+            cell_size (int): Initial pixels per cell
+            colors (dict): RGB color for each cell state passed to mark();
+                cells marked with other states are ignored
+            palette (numpy.ndarray): Static colors indexed by maze_render
+                cell code (OPEN, WALL, SOLUTION, START, END)
+            start (tuple): Optional start cell (y, x)
+            end (tuple): Optional end cell (y, x)
+            area (tuple): (width, height) in pixels reserved for the maze at
+                the top-left of the screen; the whole screen by default
+            grid_color (tuple): Optional color of a one pixel border drawn
+                around every cell (only for cells larger than 2px)
+            highlight (sequence): States kept visible when zoomed out below
+                one pixel per cell (start and end always are)
+            capacity (int): Initial dirty buffer size; it grows as needed
+        """
+        self.screen = screen
+        self.fixed = [tuple(cell) for cell in (start, end) if cell is not None]
+
+        palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        self._codes = np.zeros(256, dtype=np.uint8)
+        self._known = np.zeros(256, dtype=bool)
+        for i, state in enumerate(colors):
+            self._codes[state] = len(palette) + i
+            self._known[state] = True
+        palette = np.vstack([palette] + [np.asarray(colors[state], dtype=np.uint8).reshape(1, 3)
+                                         for state in colors])
+
+        overlay = [int(self._codes[state]) for state in highlight if self._known[state]]
+        overlay += [code for cell, code in ((start, START), (end, END)) if cell is not None]
+        self.viewport = Viewport(cell_codes(maze, None, start, end), palette, area or screen.get_size(),
+                                 cell_size, overlay, grid_color)
+
+        self._cells = np.empty((capacity, 2), dtype=np.int32)
+        self._states = np.empty(capacity, dtype=np.uint8)
+        self._count = 0
+
+    @property
+    def pending(self):
+        """Cells marked since the last flush (duplicates included)."""
+        return self._count
+
+    def mark(self, cells, state):
+        """
+        Append cells, a sequence or (n, 2) array of (y, x), to the dirty buffer.
+
+        state is one state for all the cells or an array with one per cell.
+        """
+        cells = np.asarray(cells, dtype=np.int32).reshape(-1, 2)
+        stop = self._count + len(cells)
+        if stop > len(self._cells):
+            capacity = max(stop, 2 * len(self._cells))
+            grown = np.empty((capacity, 2), dtype=np.int32)
+            grown[:self._count] = self._cells[:self._count]
+            self._cells = grown
+            states = np.empty(capacity, dtype=np.uint8)
+            states[:self._count] = self._states[:self._count]
+            self._states = states
+
+        self._cells[self._count:stop] = cells
+        self._states[self._count:stop] = state
+        self._count = stop
+
+    __call__ = mark
+
+    def handle_event(self, event):
+        """Pass a pygame event to the viewport; True if the view moved."""
+        return self.viewport.handle_event(event)
+
+    def flush(self):
+        """
+        Apply the cells marked since the last flush, draw them and empty the buffer.
+
+        When a cell was marked more than once, its latest state wins. The
+        whole view is drawn instead on the first flush and after the view
+        moved.
+
+        Returns:
+            list: pygame.Rect areas of the screen that changed, for
+            pygame.display.update
+        """
+        count, self._count = self._count, 0
+        ys = xs = None
+        if count:
+            ys = self._cells[:count, 0]
+            xs = self._cells[:count, 1]
+            states = self._states[:count]
+
+            rows, cols = self.viewport.codes.shape
+            keep = (ys >= 0) & (ys < rows) & (xs >= 0) & (xs < cols) & self._known[states]
+            for y, x in self.fixed:
+                keep &= (ys != y) | (xs != x)
+            ys, xs, states = ys[keep], xs[keep], states[keep]
+
+            # Latest mark per cell: first occurrence in the reversed buffer
+            _, first = np.unique((ys.astype(np.int64) * cols + xs)[::-1], return_index=True)
+            latest = ys.size - 1 - first
+            ys, xs, states = ys[latest], xs[latest], states[latest]
+            self.viewport.set_cells(ys, xs, self._codes[states])
+
+        if self.viewport.changed:
+            return [self.viewport.render(self.screen)]
+        if ys is not None and ys.size:
+            rect = self.viewport.paint(self.screen, ys, xs)
+            if rect is not None:
+                return [rect]
+        return []
@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from dead_end_solver import load_maze
+from solver_registry import SolveInterrupted, nearest_cell
+
+
+UNREACHABLE = -1
+
+
+def _padded_open_flat(maze):
+    """Open-cell mask with a one-cell wall border, flattened, and its row stride."""
+    height, width = maze.shape
+    open_pad = np.zeros((height + 2, width + 2), dtype=bool)
+    open_pad[1:-1, 1:-1] = maze == 0
+    return open_pad.ravel(), width + 2
+
+
+def wavefront(open_flat, stride, sources, target=None, budget=None):
+    """
+    Level-synchronous BFS over a flattened, wall-bordered open mask.
+
+    Every source starts at distance 0, so several independent grids can be
+    searched at once by stacking them in one array separated by wall rows.
+
+    Args:
+        open_flat (numpy.ndarray): Flat boolean open mask whose outer ring is wall
+        stride (int): Row length of the flattened grid
+        sources (sequence): Flat indices of the source cells
+        target (int): Optional flat index; expansion stops once it is reached
+        budget (SolveBudget): Optional limits, charged per frontier cell;
+            SolveInterrupted is raised with the flat reached-cell mask as
+            explored when they run out
+
+    Returns:
+        numpy.ndarray: Flat int32 distances, UNREACHABLE (-1) where not reached
+    """
+    dist = np.full(open_flat.size, UNREACHABLE, dtype=np.int32)
+    offsets = np.array([-stride, stride, -1, 1], dtype=np.int64)
+    frontier = np.asarray(sources, dtype=np.int64)
+    dist[frontier] = 0
+    d = 0
+
+    while frontier.size:
+        if target is not None and dist[target] >= 0:
+            break
+        if budget is not None and budget.exceeded(frontier.size):
+            raise SolveInterrupted(budget.reason, explored=dist >= 0, counters={'steps': d})
+        d += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[open_flat[candidates]]
+        candidates = candidates[dist[candidates] == UNREACHABLE]
+        frontier = np.unique(candidates)
+        dist[frontier] = d
+
+    return dist
+
+
+def compute_distance_field(maze, source, stop_at=None, budget=None):
+    """
+    BFS distance from a source cell to every open cell.
+
+    The whole frontier is expanded per step with NumPy: neighbour indices of
+    every frontier cell are gathered at once and filtered through boolean
+    open/unvisited masks, so no per-cell Python runs. The maze is padded with
+    a wall border so neighbour lookups never leave the array.
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        source (tuple): Source position (y, x)
+        stop_at (tuple): Optional cell; expansion stops once it is reached
+        budget (SolveBudget): Optional limits; SolveInterrupted is raised
+            with the explored cells when they run out
+
+    Returns:
+        numpy.ndarray: int32 distances, UNREACHABLE (-1) for walls and
+        cells not reached
+    """
+    maze = np.asarray(maze)
+    if maze.ndim != 2:
+        raise ValueError("Invalid maze: must be a 2D numpy array")
+
+    height, width = maze.shape
+    sy, sx = source
+    if not (0 <= sy < height and 0 <= sx < width):
+        raise ValueError(f"Source position {source} is out of bounds")
+    if maze[sy, sx] != 0:
+        raise ValueError(f"Source position {source} is a wall")
+
+    open_flat, stride = _padded_open_flat(maze)
+
+    target = None
+    if stop_at is not None:
+        target = (stop_at[0] + 1) * stride + stop_at[1] + 1
+
+    try:
+        dist = wavefront(open_flat, stride, [(sy + 1) * stride + sx + 1], target=target,
+                         budget=budget)
+    except SolveInterrupted as e:
+        e.explored = e.explored.reshape(height + 2, width + 2)[1:-1, 1:-1].copy()
+        e.frontier = None if stop_at is None else nearest_cell(e.explored, stop_at)
+        raise
+
+    return dist.reshape(height + 2, width + 2)[1:-1, 1:-1].copy()
+
+
+def path_from_distance_field(dist, end):
+    """
+    Rebuild a shortest path by descending the distance field from end.
+
+    Returns:
+        list: Cells (y, x) from the field's source to end inclusive
+    """
+    height, width = dist.shape
+    y, x = end
+    d = int(dist[y, x])
+    if d < 0:
+        raise ValueError(f"End position {end} is not reachable from the source")
+
+    path = [(y, x)]
+    while d > 0:
+        for dy, dx in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            ny, nx = y + dy, x + dx
+            if 0 <= ny < height and 0 <= nx < width and dist[ny, nx] == d - 1:
+                y, x = ny, nx
+                break
+        d -= 1
+        path.append((y, x))
+
+    path.reverse()
+    return path
+
+
+def solve_maze_wavefront(maze, start, end):
+    """
+    Solve a maze with the vectorized wavefront and rebuild the path by descent.
+
+    Returns:
+        tuple: (solution, path_length, solve_time)
+    """
+    start_time = time.time()
+
+    dist = compute_distance_field(maze, start, stop_at=end)
+    if dist[end] < 0:
+        raise RuntimeError(f"No path from {start} to {end}")
+
+    solution = np.zeros_like(maze)
+    for y, x in path_from_distance_field(dist, end):
+        solution[y, x] = 1
+
+    solve_time = time.time() - start_time
+    return solution, int(dist[end]), solve_time
+
+
+def distance_to_colors(dist):
+    """
+    Map a distance field to an RGB heatmap.
+
+    Near cells are blue, far cells are red, walls and unreachable cells are black.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (height, width, 3)
+    """
+    reachable = dist >= 0
+    max_dist = max(1, int(dist.max()))
+    t = np.where(reachable, dist, 0).astype(np.float32) / max_dist
+
+    colors = np.zeros(dist.shape + (3,), dtype=np.uint8)
+    colors[..., 0] = (255 * t).astype(np.uint8)
+    colors[..., 1] = (255 * (1 - np.abs(2 * t - 1))).astype(np.uint8)
+    colors[..., 2] = (255 * (1 - t)).astype(np.uint8)
+    colors[~reachable] = 0
+    return colors
+
+
+if __name__ == "__main__":
+    import glob
+
+    maze_files = glob.glob("mazes/maze_*.json")
+
+    if not maze_files:
+        print("No maze files found in 'mazes/' directory")
+        print("Run 'python maze.py' to create a maze first")
+        sys.exit(0)
+
+    latest_file = max(maze_files, key=os.path.getctime)
+    filename = os.path.basename(latest_file)
+
+    print(f"\n{'='*60}")
+    print(f"Loading maze: {filename}")
+    print(f"{'='*60}\n")
+
+    maze, start, end, maze_data = load_maze(filename)
+
+    start_time = time.time()
+    dist = compute_distance_field(maze, start)
+    elapsed = time.time() - start_time
+
+    reached = int(np.count_nonzero(dist >= 0))
+    print(f"Distance field: {reached:,} cells reached in {elapsed:.2f} seconds")
+    print(f"Farthest cell: {int(dist.max()):,} moves from start")
+    print(f"Distance to end: {int(dist[end]):,} moves")
+
+    from export_maze_image import export_distance_heatmap
+    export_distance_heatmap(maze, dist, latest_file.replace('.json', '_distance.png'))
@@ -4,6 +4,11 @@ import os
 import pygame
 from datetime import datetime
 
+import metrics
+from maze_render import save_maze_image
+from planner import load_array
+
+@metrics.timed('load')
 def load_maze_from_file(filepath):
     with open(filepath, 'r') as f:
         data = json.load(f)
@@ -12,12 +17,26 @@ def load_maze_from_file(filepath):
         maze = np.array(data['maze'], dtype=np.uint8)
     elif 'maze_file' in data:
         npy_path = os.path.join(os.path.dirname(filepath), data['maze_file'])
-        maze = np.load(npy_path)
+        maze = load_array(npy_path)
     else:
         raise ValueError("No maze data found in file")
     
     return maze, data
 
+def maze_cell_size(total_cells):
+    """Pixels per cell for a maze image: smaller cells for bigger mazes."""
+    if total_cells > 10000000:
+        return 5
+    elif total_cells > 4000000:
+        return 8
+    elif total_cells > 1000000:
+        return 12
+    elif total_cells > 100000:
+        return 15
+    elif total_cells > 10000:
+        return 20
+    return 25
+
 def export_maze_to_image(maze, output_path, start=(1, 1), end=None):
     height, width = maze.shape
     
@@ -27,69 +46,17 @@ def export_maze_to_image(maze, output_path, start=(1, 1), end=None):
     print(f"Exporting {width}x{height} maze to image...")
     
     total_cells = width * height
-    
+    cell_size = maze_cell_size(total_cells)
     if total_cells > 10000000:
         print(f"Warning: Maze too large ({total_cells:,} cells). Using 5px cells - image will be very large!")
-        cell_size = 5
-    elif total_cells > 4000000:
-        cell_size = 8
-    elif total_cells > 1000000:
-        cell_size = 12
-    elif total_cells > 100000:
-        cell_size = 15
-    elif total_cells > 10000:
-        cell_size = 20
-    else:
-        cell_size = 25
     
+    # Beyond pygame's surface limits save_maze_image streams the PNG instead
     img_width = width * cell_size
     img_height = height * cell_size + 40
     
-    max_dim = 32767
-    if img_width > max_dim or img_height > max_dim:
-        cell_size = max(1, min(max_dim // width, max_dim // height))
-        img_width = width * cell_size
-        img_height = height * cell_size + 40
-    
-    pygame.init()
-    surface = pygame.Surface((img_width, img_height))
-    
-    BLACK = (0, 0, 0)
-    WHITE = (255, 255, 255)
-    GREEN = (0, 255, 0)
-    RED = (255, 0, 0)
-    
-    surface.fill(WHITE)
-    
     print("Rendering maze...")
-    for y in range(height):
-        for x in range(width):
-            if maze[y, x] == 1:
-                rect = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
-                pygame.draw.rect(surface, BLACK, rect)
-    
-    start_y, start_x = start
-    start_rect = pygame.Rect(start_x * cell_size, start_y * cell_size, cell_size, cell_size)
-    pygame.draw.rect(surface, GREEN, start_rect)
-    
-    end_y, end_x = end
-    end_rect = pygame.Rect(end_x * cell_size, end_y * cell_size, cell_size, cell_size)
-    pygame.draw.rect(surface, RED, end_rect)
-    
-    if cell_size >= 8:
-        font = pygame.font.Font(None, min(24, cell_size * 2))
-        start_text = font.render('S', True, BLACK)
-        end_text = font.render('E', True, BLACK)
-        surface.blit(start_text, (start_x * cell_size + 2, start_y * cell_size + 2))
-        surface.blit(end_text, (end_x * cell_size + 2, end_y * cell_size + 2))
-    
-    font = pygame.font.Font(None, 24)
     info_text = f"Maze: {width}x{height} ({total_cells:,} cells) | Start (Green) to End (Red)"
-    text_surface = font.render(info_text, True, BLACK)
-    surface.blit(text_surface, (10, height * cell_size + 10))
-    
-    pygame.image.save(surface, output_path)
-    pygame.quit()
+    save_maze_image(maze, output_path, cell_size, info_text, start=start, end=end)
     
     file_size = os.path.getsize(output_path) / (1024 * 1024)
     print(f"Image saved: {output_path}")
@@ -99,6 +66,34 @@ def export_maze_to_image(maze, output_path, start=(1, 1), end=None):
     
     return output_path
 
+def export_distance_heatmap(maze, dist, output_path, cell_size=None):
+    from distance_field import distance_to_colors
+
+    height, width = maze.shape
+
+    if cell_size is None:
+        cell_size = max(1, min(10, 4000 // max(width, height)))
+
+    max_dim = 32767
+    if width * cell_size > max_dim or height * cell_size > max_dim:
+        cell_size = max(1, min(max_dim // width, max_dim // height))
+
+    print(f"Exporting {width}x{height} distance heatmap ({cell_size}px cells)...")
+
+    colors = distance_to_colors(dist)
+    if cell_size > 1:
+        colors = np.repeat(np.repeat(colors, cell_size, axis=0), cell_size, axis=1)
+
+    pygame.init()
+    # surfarray expects (width, height, 3)
+    surface = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+    pygame.image.save(surface, output_path)
+    pygame.quit()
+
+    print(f"Heatmap saved: {output_path}")
+
+    return output_path
+
 def main():
     import glob
     
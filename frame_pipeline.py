@@ -0,0 +1,179 @@
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import pygame
+
+import metrics
+
+
+class PipelineStopped(Exception):
+    """Raised inside the solver thread when the pipeline is stopped (window closed)."""
+
+
+class FramePipeline:
+    """
+    Producer/consumer split between a solver and its live view.
+
+    The solver runs in a worker thread and reports cells through publish(),
+    which is the observer(cells, state) passed to the solver. Cells are
+    batched into compact (cells, states) array deltas on a bounded queue;
+    when the queue is full the solver never waits - it keeps merging into
+    its pending batch until there is room. A pending batch that outgrows
+    max_pending is coalesced to one entry per cell (its latest state), so it
+    is bounded by the cells of the maze, not by the length of the run. The
+    main thread drains the queue at a fixed frame rate into a
+    DirtyCellRenderer, so frames that fall behind are dropped (only the
+    latest state of each cell is drawn) and the solve time measured in the
+    worker does not include rendering.
+    """
+
+    def __init__(self, renderer, fps=60, capacity=64, batch=4096, max_pending=65536):
+        """
+        Args:
+            renderer (DirtyCellRenderer): View the deltas are drawn into
+            fps (int): Frames drawn per second while the solver runs
+            capacity (int): Deltas the queue holds before the solver starts
+                merging instead of publishing
+            batch (int): Cells collected before a delta is published
+            max_pending (int): Cells collected while the queue is full
+                before the pending batch is coalesced
+        """
+        self.renderer = renderer
+        self.fps = fps
+        self.batch = batch
+        self.max_pending = max_pending
+        self.deltas = queue.Queue(capacity)
+        self.solve_time = None
+        self.frames = 0
+        self._cells = []
+        self._states = []
+        # Coalesced (cells, states) arrays of the pending batch, or None
+        self._merged = None
+        self._stopped = False
+
+    def publish(self, cells, state):
+        """Observer for the solver thread: queue cells (y, x) with their new state."""
+        if self._stopped:
+            raise PipelineStopped()
+        self._cells.extend(cells)
+        self._states.extend([state] * len(cells))
+        if len(self._cells) >= self.batch:
+            if not self.deltas.full():
+                self._put(block=False)
+            # Coalescing again only once the list matches the merged size
+            # keeps the total sorting work at O(n log n)
+            elif len(self._cells) >= max(self.max_pending, self._merged_size()):
+                self._merged = self._pending()
+                self._cells = []
+                self._states = []
+
+    __call__ = publish
+
+    def _merged_size(self):
+        return 0 if self._merged is None else len(self._merged[1])
+
+    def _pending(self):
+        # The pending batch as arrays with one entry per cell, holding its latest state
+        cells = np.array(self._cells, dtype=np.int32).reshape(-1, 2)
+        states = np.array(self._states, dtype=np.uint8)
+        if self._merged is not None:
+            cells = np.concatenate([self._merged[0], cells])
+            states = np.concatenate([self._merged[1], states])
+        keys = (cells[:, 0].astype(np.int64) << 32) | cells[:, 1].astype(np.int64)
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = np.sort(len(keys) - 1 - last)
+        return cells[keep], states[keep]
+
+    def _put(self, block):
+        if not self._cells and self._merged is None:
+            return
+        if self._merged is not None:
+            delta = self._pending()
+        else:
+            delta = (np.array(self._cells, dtype=np.int32).reshape(-1, 2),
+                     np.array(self._states, dtype=np.uint8))
+        try:
+            self.deltas.put(delta, block=block, timeout=0.1 if block else None)
+        except queue.Full:
+            return
+        self._cells = []
+        self._states = []
+        self._merged = None
+
+    def stop(self):
+        """Make the solver thread stop at its next publish()."""
+        self._stopped = True
+
+    def _drain(self):
+        while True:
+            try:
+                cells, states = self.deltas.get_nowait()
+            except queue.Empty:
+                return
+            self.renderer.mark(cells, states)
+
+    def run(self, solve, draw=None):
+        """
+        Run solve() in a worker thread and draw frames until it returns.
+
+        Closing the window stops the solver and exits, like the live views
+        always did. Other events go to the renderer (pan/zoom).
+
+        Args:
+            solve (callable): Called without arguments in the worker; it
+                should run the solver with publish (or a wrapper around it)
+                as the observer
+            draw (callable): Optional draw() called on every frame after the
+                maze cells, returning a list of extra screen rects it painted
+                (info bar, legend)
+
+        Returns:
+            The return value of solve; exceptions raised in solve are
+            re-raised here. The seconds spent in solve are in self.solve_time.
+        """
+        outcome = {}
+
+        def worker():
+            start_time = time.perf_counter()
+            try:
+                outcome['result'] = solve()
+            except BaseException as e:
+                outcome['error'] = e
+            self.solve_time = time.perf_counter() - start_time
+            # The last batch must reach the view, so this one waits for room
+            while (self._cells or self._merged is not None) and not self._stopped:
+                self._put(block=True)
+
+        thread = threading.Thread(target=worker, name="solver", daemon=True)
+        clock = pygame.time.Clock()
+        thread.start()
+
+        while True:
+            running = thread.is_alive()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.stop()
+                    thread.join()
+                    pygame.quit()
+                    sys.exit()
+                self.renderer.handle_event(event)
+
+            self._drain()
+            rects = self.renderer.flush()
+            if draw is not None:
+                rects += draw()
+            pygame.display.update(rects)
+            self.frames += 1
+
+            if not running:
+                break
+            clock.tick(self.fps)
+
+        thread.join()
+        metrics.count('render.frames', self.frames)
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
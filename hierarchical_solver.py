@@ -0,0 +1,463 @@
+import heapq
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from dead_end_solver import load_maze
+from distance_field import UNREACHABLE, compute_distance_field, path_from_distance_field, wavefront
+from solver_registry import SolveInterrupted
+from tree_index import maze_checksum
+
+
+# Upper bound on stacked tile cells searched in one wavefront batch
+BATCH_CELLS = 4000000
+
+
+def abstraction_path_for(maze_filepath):
+    """Path of the hierarchical abstraction stored next to a maze JSON file."""
+    return maze_filepath.replace('.json', '_hpa.npz')
+
+
+class HierarchicalIndex:
+    """
+    HPA*-style abstraction of a maze.
+
+    The grid is cut into tile_size x tile_size tiles. Every open cell with an
+    open neighbour in another tile is an entrance node. Abstract edges join
+    the two cells of each tile crossing (length 1) and every pair of entrances
+    of one tile that are connected inside it (length = BFS distance within
+    the tile). Queries search this small graph first and then refine only the
+    tiles on the chosen route.
+
+    Adjacency is CSR over node ids: neighbours of node i are
+    indices[indptr[i]:indptr[i+1]] with lengths in weights.
+    """
+
+    def __init__(self, shape, tile_size, node_cells, indptr, indices, weights, checksum=None):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.tile_size = int(tile_size)
+        self.node_cells = node_cells
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.checksum = checksum
+        self._adjacency = None
+        self._tile_nodes = None
+
+    @property
+    def node_count(self):
+        return len(self.node_cells)
+
+    @classmethod
+    def build(cls, maze, tile_size=64, budget=None):
+        """
+        Build the abstraction.
+
+        Args:
+            maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+            tile_size (int): Tile edge length in cells
+            budget (SolveBudget): Optional limits, charged per batch of tile
+                cells searched; SolveInterrupted is raised when they run out
+
+        Returns:
+            HierarchicalIndex
+        """
+        maze = np.asarray(maze)
+        height, width = maze.shape
+        t = tile_size
+        open_grid = maze == 0
+
+        # Tile crossings: open horizontal/vertical pairs straddling a tile border
+        ys, xs = np.nonzero(open_grid[:, :-1] & open_grid[:, 1:] &
+                            ((np.arange(1, width) % t) == 0)[None, :])
+        h_a = ys * width + xs
+        h_b = h_a + 1
+        ys, xs = np.nonzero(open_grid[:-1, :] & open_grid[1:, :] &
+                            ((np.arange(1, height) % t) == 0)[:, None])
+        v_a = ys * width + xs
+        v_b = v_a + width
+
+        cross_a = np.concatenate([h_a, v_a])
+        cross_b = np.concatenate([h_b, v_b])
+        node_cells = np.unique(np.concatenate([cross_a, cross_b]))
+
+        src = [np.searchsorted(node_cells, cross_a), np.searchsorted(node_cells, cross_b)]
+        dst = [src[1], src[0]]
+        wts = [np.ones(len(cross_a), dtype=np.int32)] * 2
+
+        intra_src, intra_dst, intra_w = cls._intra_tile_edges(open_grid, node_cells, t, budget)
+        src.append(intra_src)
+        dst.append(intra_dst)
+        wts.append(intra_w)
+
+        src = np.concatenate(src)
+        dst = np.concatenate(dst)
+        wts = np.concatenate(wts).astype(np.int32)
+        order = np.argsort(src, kind='stable')
+
+        n = len(node_cells)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+        return cls(maze.shape, t, node_cells, indptr, dst[order].astype(np.int32), wts[order],
+                   checksum=maze_checksum(maze))
+
+    @staticmethod
+    def _intra_tile_edges(open_grid, node_cells, t, budget=None):
+        """
+        All-pairs entrance distances inside each tile.
+
+        One wavefront runs per entrance, but the searches are batched: each
+        source gets its own wall-padded copy of its tile, copies are stacked
+        into one array and expanded together.
+        """
+        height, width = open_grid.shape
+        tiles_x = (width + t - 1) // t
+        pad = t + 2
+        copy_cells = pad * pad
+
+        ny, nx = np.divmod(node_cells, width)
+        tile_of = (ny // t) * tiles_x + nx // t
+        order = np.argsort(tile_of, kind='stable')
+        tiles, starts, counts = np.unique(tile_of[order], return_index=True, return_counts=True)
+
+        src, dst, wts = [], [], []
+        per_batch = max(1, BATCH_CELLS // copy_cells)
+        batch = []
+        batch_copies = 0
+
+        def run_batch(batch, copies):
+            stacked = np.zeros((copies, pad, pad), dtype=bool)
+            sources = np.empty(copies, dtype=np.int64)
+            c = 0
+            for tile, nodes in batch:
+                y0, x0 = (tile // tiles_x) * t, (tile % tiles_x) * t
+                block = open_grid[y0:y0 + t, x0:x0 + t]
+                k = len(nodes)
+                stacked[c:c + k, 1:1 + block.shape[0], 1:1 + block.shape[1]] = block
+                local = (ny[nodes] - y0 + 1) * pad + (nx[nodes] - x0 + 1)
+                sources[c:c + k] = np.arange(c, c + k) * copy_cells + local
+                c += k
+
+            dist = wavefront(stacked.ravel(), pad, sources)
+
+            c = 0
+            for tile, nodes in batch:
+                y0, x0 = (tile // tiles_x) * t, (tile % tiles_x) * t
+                k = len(nodes)
+                local = (ny[nodes] - y0 + 1) * pad + (nx[nodes] - x0 + 1)
+                d = dist[(np.arange(c, c + k) * copy_cells)[:, None] + local[None, :]]
+                i, j = np.nonzero(d > 0)
+                src.append(nodes[i])
+                dst.append(nodes[j])
+                wts.append(d[i, j])
+                c += k
+
+            # Checked after the batch, while its arrays still count towards memory
+            if budget is not None and budget.exceeded(copies * copy_cells):
+                raise SolveInterrupted(budget.reason, counters={'entrances': len(node_cells)})
+
+        for tile, s, k in zip(tiles.tolist(), starts.tolist(), counts.tolist()):
+            if k < 2:
+                continue
+            if batch and batch_copies + k > per_batch:
+                run_batch(batch, batch_copies)
+                batch, batch_copies = [], 0
+            batch.append((tile, order[s:s + k]))
+            batch_copies += k
+        if batch:
+            run_batch(batch, batch_copies)
+
+        if not src:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.int32)
+        return np.concatenate(src), np.concatenate(dst), np.concatenate(wts)
+
+    def _tile_bounds(self, pos):
+        t = self.tile_size
+        y0, x0 = (pos[0] // t) * t, (pos[1] // t) * t
+        return y0, x0, min(y0 + t, self.shape[0]), min(x0 + t, self.shape[1])
+
+    def _nodes_in_tile(self, pos):
+        if self._tile_nodes is None:
+            t = self.tile_size
+            tiles_x = (self.shape[1] + t - 1) // t
+            ny, nx = np.divmod(self.node_cells, self.shape[1])
+            tile_of = (ny // t) * tiles_x + nx // t
+            groups = {}
+            for i, tile in enumerate(tile_of.tolist()):
+                groups.setdefault(tile, []).append(i)
+            self._tile_nodes = (tiles_x, groups)
+        tiles_x, groups = self._tile_nodes
+        t = self.tile_size
+        return groups.get((pos[0] // t) * tiles_x + pos[1] // t, [])
+
+    def _adjacency_lists(self):
+        if self._adjacency is None:
+            self._adjacency = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._adjacency
+
+    def _tile_field(self, maze, pos, stop_at=None):
+        y0, x0, y1, x1 = self._tile_bounds(pos)
+        local_stop = None if stop_at is None else (stop_at[0] - y0, stop_at[1] - x0)
+        dist = compute_distance_field(maze[y0:y1, x0:x1], (pos[0] - y0, pos[1] - x0),
+                                      stop_at=local_stop)
+        return dist, y0, x0
+
+    def _links(self, maze, pos):
+        """Distances from pos to the entrances of its own tile."""
+        dist, y0, x0 = self._tile_field(maze, pos)
+        links = []
+        for i in self._nodes_in_tile(pos):
+            y, x = divmod(int(self.node_cells[i]), self.shape[1])
+            d = int(dist[y - y0, x - x0])
+            if d != UNREACHABLE:
+                links.append((i, d))
+        return links, dist, y0, x0
+
+    def abstract_path(self, maze, start, end):
+        """
+        A* over the abstract graph with start and end linked in.
+
+        Returns:
+            tuple: (list of cells (y, x) visited at the abstract level, length),
+            or None if end is unreachable
+        """
+        width = self.shape[1]
+        n = self.node_count
+        source, target = n, n + 1
+        ey, ex = end
+
+        start_links, start_dist, y0, x0 = self._links(maze, start)
+        end_links = dict(self._links(maze, end)[0])
+
+        direct = None
+        if self._tile_bounds(start) == self._tile_bounds(end):
+            d = int(start_dist[ey - y0, ex - x0])
+            if d != UNREACHABLE:
+                direct = d
+
+        indptr, indices, weights = self._adjacency_lists()
+        node_cells = self.node_cells.tolist()
+
+        def position(i):
+            if i == source:
+                return start
+            if i == target:
+                return end
+            return divmod(node_cells[i], width)
+
+        def heuristic(i):
+            y, x = position(i)
+            return abs(y - ey) + abs(x - ex)
+
+        dist = {source: 0}
+        via = {}
+        heap = [(heuristic(source), 0, source)]
+
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if u == target:
+                break
+            if d > dist[u]:
+                continue
+
+            if u == source:
+                edges = list(start_links)
+                if direct is not None:
+                    edges.append((target, direct))
+            else:
+                edges = [(indices[k], weights[k]) for k in range(indptr[u], indptr[u + 1])]
+                if u in end_links:
+                    edges.append((target, end_links[u]))
+
+            for v, w in edges:
+                nd = d + w
+                if nd < dist.get(v, nd + 1):
+                    dist[v] = nd
+                    via[v] = u
+                    heapq.heappush(heap, (nd + heuristic(v), nd, v))
+
+        if target not in dist:
+            return None
+
+        route = [target]
+        while route[-1] != source:
+            route.append(via[route[-1]])
+        route.reverse()
+        return [position(i) for i in route], dist[target]
+
+    def refine(self, maze, waypoints):
+        """Expand abstract waypoints into a cell path, searching only their tiles."""
+        path = [waypoints[0]]
+        for a, b in zip(waypoints, waypoints[1:]):
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and self._tile_bounds(a) != self._tile_bounds(b):
+                path.append(b)
+                continue
+            dist, y0, x0 = self._tile_field(maze, a, stop_at=b)
+            segment = path_from_distance_field(dist, (b[0] - y0, b[1] - x0))
+            path.extend((y + y0, x + x0) for y, x in segment[1:])
+        return path
+
+    def path(self, maze, start, end):
+        """Cell path from start to end, or None if unreachable."""
+        if start == end:
+            return [start]
+        result = self.abstract_path(maze, start, end)
+        if result is None:
+            return None
+        return self.refine(maze, result[0])
+
+    def matches(self, maze):
+        return (tuple(maze.shape) == self.shape and
+                (self.checksum is None or self.checksum == maze_checksum(maze)))
+
+    def save(self, path):
+        np.savez(path, shape=np.array(self.shape), tile_size=np.array(self.tile_size),
+                 node_cells=self.node_cells, indptr=self.indptr, indices=self.indices,
+                 weights=self.weights,
+                 checksum=np.array(-1 if self.checksum is None else self.checksum, dtype=np.int64))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            checksum = int(data['checksum'])
+            return cls(tuple(data['shape']), int(data['tile_size']), data['node_cells'],
+                       data['indptr'], data['indices'], data['weights'],
+                       checksum=None if checksum < 0 else checksum)
+
+
+def load_or_build_abstraction(maze, maze_filepath=None, tile_size=64):
+    """
+    Load the abstraction saved next to a maze file, rebuilding it if missing or stale.
+
+    Returns:
+        HierarchicalIndex
+    """
+    index_path = abstraction_path_for(maze_filepath) if maze_filepath else None
+
+    if index_path and os.path.exists(index_path):
+        index = HierarchicalIndex.load(index_path)
+        if index.matches(maze) and index.tile_size == tile_size:
+            return index
+        print("Hierarchical abstraction is stale, rebuilding...")
+
+    start_time = time.time()
+    index = HierarchicalIndex.build(maze, tile_size=tile_size)
+    print(f"Hierarchical abstraction built in {time.time() - start_time:.2f} seconds: "
+          f"{index.node_count:,} entrances, {len(index.indices):,} abstract edges")
+
+    if index_path:
+        index.save(index_path)
+        print(f"Hierarchical abstraction saved to: {index_path}")
+
+    return index
+
+
+def solve_maze_hierarchical(maze, start, end, index=None, tile_size=64):
+    """
+    Solve a maze with hierarchical pathfinding.
+
+    Returns:
+        tuple: (solution, path_length, solve_time)
+    """
+    if index is None:
+        index = HierarchicalIndex.build(maze, tile_size=tile_size)
+
+    start_time = time.time()
+    path = index.path(maze, start, end)
+    if path is None:
+        raise RuntimeError(f"No path from {start} to {end}")
+
+    solution = np.zeros_like(maze)
+    for y, x in path:
+        solution[y, x] = 1
+    solve_time = time.time() - start_time
+
+    return solution, len(path) - 1, solve_time
+
+
+def compare_with_flat_solvers(maze, start, end, index):
+    """
+    Per-query latency and peak traced memory of the hierarchical solver
+    against flat whole-grid solvers.
+
+    Every row reports path_length in moves: the route's cells minus one for
+    the hierarchical and wavefront solvers, and the steps walked (dead-end
+    excursions included) for the left-hand rule.
+
+    Returns:
+        list: (name, path_length, seconds, peak_bytes) rows
+    """
+    from distance_field import solve_maze_wavefront
+    from left_hand_algo import left_hand_algo
+
+    solvers = [
+        ('hierarchical', lambda: solve_maze_hierarchical(maze, start, end, index=index)),
+        ('wavefront_bfs', lambda: solve_maze_wavefront(maze, start, end)),
+        # A perfect-maze walk passes each corridor at most twice, well under
+        # maze.size moves; the default 10M cap is hit from 7001 up
+        ('left_hand', lambda: left_hand_algo(maze, start, end, visualize=False,
+                                             max_steps=maze.size)),
+    ]
+
+    rows = []
+    for name, solve in solvers:
+        # tracemalloc slows allocation-heavy loops badly, so time and memory
+        # are measured in separate runs
+        query_start = time.perf_counter()
+        solution, length, _ = solve()
+        elapsed = time.perf_counter() - query_start
+        del solution
+
+        tracemalloc.start()
+        solve()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rows.append((name, int(length), elapsed, peak))
+
+    print(f"\n{'Solver':<16}{'Moves':>12}{'Time (s)':>12}{'Peak MB':>12}")
+    for name, length, elapsed, peak in rows:
+        print(f"{name:<16}{length:>12,}{elapsed:>12.3f}{peak / (1024 * 1024):>12.1f}")
+
+    return rows
+
+
+def main():
+    import glob
+    import random
+
+    print("=" * 60)
+    print("HIERARCHICAL MAZE SOLVER")
+    print("=" * 60)
+
+    choice = input("\nUse latest maze (l) or generate preset 5001 (5) / 7001 (7)? [l]: ").strip().lower()
+
+    if choice in ('5', '7'):
+        from large_maze_generator import LargeMazeGenerator
+
+        size = 5001 if choice == '5' else 7001
+        random.seed(size)
+        maze = LargeMazeGenerator(size, size).generate_iterative(visualize=False)
+        start, end = (1, 1), (size - 2, size - 2)
+        maze_filepath = None
+    else:
+        maze_files = glob.glob("mazes/maze_*.json")
+        if not maze_files:
+            print("No maze files found in 'mazes/' directory")
+            print("Run 'python large_maze_generator.py' to create a maze first")
+            return
+        maze_filepath = max(maze_files, key=os.path.getctime)
+        maze, start, end, _ = load_maze(os.path.basename(maze_filepath))
+
+    index = load_or_build_abstraction(maze, maze_filepath)
+    compare_with_flat_solvers(maze, start, end, index)
+
+
+if __name__ == "__main__":
+    main()
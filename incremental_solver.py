@@ -0,0 +1,378 @@
+import heapq
+import statistics
+import time
+from array import array
+
+import numpy as np
+
+from distance_field import UNREACHABLE, _padded_open_flat, solve_maze_wavefront, wavefront
+
+
+INF = 1 << 30
+
+
+class IncrementalSolver:
+    """
+    LPA* solver that keeps its search state between wall edits.
+
+    g holds the current distance estimate of every cell and rhs the one-step
+    lookahead min(g(neighbour) + 1). A cell is consistent when both agree;
+    toggling a cell only makes that cell and its neighbours inconsistent, and
+    compute_shortest_path re-expands inconsistent cells in key order until
+    the end is consistent again, so an edit costs work proportional to the
+    region whose distances actually changed.
+
+    The start stays fixed (moving starts are what D* Lite adds on top), which
+    is all that re-solving after level edits needs.
+
+    Cells are addressed as flat indices into the maze padded with a one-cell
+    wall border, so neighbour lookups never leave the grid. State lives in
+    compact array.array buffers: indexing them is much cheaper from Python
+    than indexing NumPy arrays element by element.
+    """
+
+    def __init__(self, maze, start, end, reseed_limit=None):
+        """
+        Args:
+            maze (numpy.ndarray): Maze array (1 = wall, 0 = path); toggle_cells
+                edits it in place
+            start (tuple): Starting position (y, x)
+            end (tuple): Ending position (y, x)
+            reseed_limit (int): Expansions after which a repair gives up and
+                reseeds from a fresh wavefront instead (default: 2% of the
+                open cells). Edits that reroute most of the maze are cheaper
+                to redo with the vectorized BFS than cell by cell.
+        """
+        maze = np.asarray(maze)
+        if maze.ndim != 2:
+            raise ValueError("Invalid maze: must be a 2D numpy array")
+
+        height, width = maze.shape
+        for name, (y, x) in (('Start', start), ('End', end)):
+            if not (0 <= y < height and 0 <= x < width):
+                raise ValueError(f"{name} position {(y, x)} is out of bounds")
+        if maze[start] != 0:
+            raise ValueError(f"Start position {start} is a wall")
+
+        self.maze = maze
+        self.start = tuple(start)
+        self.end = tuple(end)
+        self.stride = width + 2
+        self.offsets = (-self.stride, self.stride, -1, 1)
+        self.source = self._flat(self.start)
+        self.goal = self._flat(self.end)
+        self.expanded = 0
+        self.reseeds = 0
+        if reseed_limit is None:
+            reseed_limit = max(1000, int(np.count_nonzero(maze == 0)) // 50)
+        self.reseed_limit = reseed_limit
+
+        # The current path as flat indices, and each path cell's position in it
+        self.route = []
+        self.position = {}
+        self.changed = set()
+        self.solution = np.zeros_like(maze)
+
+        self._seed()
+        self._repair_path()
+
+    def _seed(self):
+        """
+        Reset the search state from one vectorized wavefront.
+
+        A level-synchronous BFS that stops at end gives exact distances for
+        every cell it reached, which is a fully consistent LPA* state once
+        the open cells just past the wavefront are queued with their rhs.
+        """
+        open_flat, stride = _padded_open_flat(self.maze)
+        dist = wavefront(open_flat, stride, [self.source], target=self.goal)
+
+        g = np.where(dist == UNREACHABLE, INF, dist).astype(np.int32)
+        rhs = g.copy()
+
+        # Open cells the wavefront did not reach but that touch it
+        neighbour_best = np.full(g.size, INF, dtype=np.int64)
+        for offset in self.offsets:
+            neighbour_best = np.minimum(neighbour_best, np.roll(g, -offset).astype(np.int64) + 1)
+        boundary = np.flatnonzero(open_flat & (dist == UNREACHABLE) & (neighbour_best < INF))
+        rhs[boundary] = neighbour_best[boundary]
+
+        self.open = bytearray(open_flat.astype(np.uint8).tobytes())
+        self.g = array('i', g.tobytes())
+        self.rhs = array('i', rhs.tobytes())
+        self.queue = [(self._key(s), s) for s in boundary.tolist()]
+        heapq.heapify(self.queue)
+
+        # Every g may have moved, so the whole path is re-traced
+        self.changed = {self.source}
+
+    def _flat(self, cell):
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def _cell(self, s):
+        return s // self.stride - 1, s % self.stride - 1
+
+    def _key(self, s):
+        m = min(self.g[s], self.rhs[s])
+        y, x = divmod(s, self.stride)
+        return (m + abs(y - self.end[0] - 1) + abs(x - self.end[1] - 1), m)
+
+    def _update_vertex(self, s):
+        g, rhs, is_open = self.g, self.rhs, self.open
+        if s != self.source:
+            if is_open[s]:
+                best = INF
+                for offset in self.offsets:
+                    n = s + offset
+                    if is_open[n] and g[n] + 1 < best:
+                        best = g[n] + 1
+                rhs[s] = best
+            else:
+                rhs[s] = INF
+        if g[s] != rhs[s]:
+            heapq.heappush(self.queue, (self._key(s), s))
+
+    def compute_shortest_path(self, limit=None):
+        """
+        Expand inconsistent cells until the end is consistent.
+
+        Stale queue entries are skipped lazily instead of being removed when
+        a cell's key changes.
+
+        Args:
+            limit (int): Optional expansion cap; the search stops early, with
+                the state still inconsistent, once it is reached
+
+        Returns:
+            int: Number of cells expanded, or None when the limit was hit
+        """
+        g, rhs, queue, goal = self.g, self.rhs, self.queue, self.goal
+        expanded = 0
+
+        while queue and (queue[0][0] < self._key(goal) or rhs[goal] != g[goal]):
+            key, s = heapq.heappop(queue)
+            if g[s] == rhs[s]:
+                continue
+            current = self._key(s)
+            if key < current:
+                heapq.heappush(queue, (current, s))
+                continue
+
+            if limit is not None and expanded >= limit:
+                self.expanded += expanded
+                return None
+            expanded += 1
+            self.changed.add(s)
+            if g[s] > rhs[s]:
+                g[s] = rhs[s]
+            else:
+                g[s] = INF
+                self._update_vertex(s)
+            for offset in self.offsets:
+                n = s + offset
+                if self.open[n]:
+                    self._update_vertex(n)
+
+        self.expanded += expanded
+        return expanded
+
+    def _repair_path(self):
+        """
+        Splice the new path onto the unchanged prefix of the old one.
+
+        The old path is still a shortest path up to the first cell whose g
+        changed, so the descent from the end only has to run until it meets
+        that prefix. Only the dropped suffix and the new descent touch the
+        solution grid.
+        """
+        g, is_open, route, position = self.g, self.open, self.route, self.position
+        cut = min((position[s] for s in self.changed if s in position), default=len(route))
+        self.changed = set()
+
+        descent = []
+        keep = 0
+        s = self.goal
+        if is_open[s] and g[s] < INF:
+            while True:
+                i = position.get(s)
+                if i is not None and i < cut:
+                    keep = i + 1
+                    break
+                descent.append(s)
+                if s == self.source:
+                    break
+                n = min((s + offset for offset in self.offsets if is_open[s + offset]),
+                        key=g.__getitem__)
+                if g[n] >= g[s]:
+                    raise RuntimeError(f"Inconsistent search state at {self._cell(s)}")
+                s = n
+
+        for s in route[keep:]:
+            del position[s]
+            self.solution[self._cell(s)] = 0
+        del route[keep:]
+
+        descent.reverse()
+        for s in descent:
+            position[s] = len(route)
+            route.append(s)
+            self.solution[self._cell(s)] = 1
+
+    def toggle_cells(self, cells):
+        """
+        Flip cells between wall and open, in self.maze, and repair the path.
+
+        Only the toggled cells and their neighbours are re-evaluated directly;
+        the search then spreads from them as far as distances change. The
+        solution grid is patched rather than rebuilt: cells that left the
+        path are cleared and cells that joined it are set.
+
+        Args:
+            cells (iterable): Cells (y, x) to toggle; the start cannot be closed
+
+        Returns:
+            dict: path_length (None when the end is cut off), expanded
+            (cells re-expanded), reseeded (the repair hit reseed_limit and
+            fell back to a fresh wavefront) and repair_time; the path itself is in
+            self.path and self.solution
+        """
+        start_time = time.time()
+        height, width = self.maze.shape
+
+        touched = set()
+        for y, x in cells:
+            if not (0 <= y < height and 0 <= x < width):
+                raise ValueError(f"Cell {(y, x)} is out of bounds")
+            if (y, x) == self.start:
+                raise ValueError("The start cell cannot be toggled")
+            self.maze[y, x] = 0 if self.maze[y, x] else 1
+            s = self._flat((y, x))
+            self.open[s] = 0 if self.maze[y, x] else 1
+            touched.add(s)
+            touched.update(s + offset for offset in self.offsets)
+            self.changed.add(s)
+
+        for s in touched:
+            self._update_vertex(s)
+        expanded = self.compute_shortest_path(limit=self.reseed_limit)
+        reseeded = expanded is None
+        if reseeded:
+            self.reseeds += 1
+            self._seed()
+            expanded = self.reseed_limit
+        self._repair_path()
+
+        return {
+            'path_length': self.path_length,
+            'expanded': expanded,
+            'reseeded': reseeded,
+            'repair_time': time.time() - start_time,
+        }
+
+    @property
+    def path(self):
+        """Current path as cells (y, x) from start to end, or None when cut off."""
+        return [self._cell(s) for s in self.route] if self.route else None
+
+    @property
+    def path_length(self):
+        return len(self.route) - 1 if self.route else None
+
+
+def benchmark_single_edits(maze, start, end, edits=20, seed=0):
+    """
+    Compare incremental repair with a full wavefront solve for single-cell edits.
+
+    Edits cycle through opening a wall between two corridors anywhere,
+    opening one next to the current path (a likely shortcut) and closing an
+    open cell off the path. Each edit is undone afterwards so the maze ends
+    as it started. Path lengths are checked against the full solve.
+
+    Returns:
+        dict: median/max repair and full-solve times in seconds
+    """
+    rng = np.random.default_rng(seed)
+    maze = np.array(maze, copy=True)
+    height, width = maze.shape
+
+    build_start = time.time()
+    solver = IncrementalSolver(maze, start, end)
+    build_time = time.time() - build_start
+    print(f"Initial solve: {build_time:.2f}s, path length {solver.path_length:,}")
+
+    open_grid = maze == 0
+    inner = np.zeros_like(open_grid)
+    inner[1:-1, 1:-1] = True
+    # Walls with open cells on both sides, horizontally or vertically
+    shortcut = inner & ~open_grid
+    shortcut[1:-1, 1:-1] &= ((open_grid[1:-1, :-2] & open_grid[1:-1, 2:]) |
+                             (open_grid[:-2, 1:-1] & open_grid[2:, 1:-1]))
+    on_path = solver.solution.astype(bool)
+    near_path = np.zeros_like(on_path)
+    near_path[1:, :] |= on_path[:-1, :]
+    near_path[:-1, :] |= on_path[1:, :]
+    near_path[:, 1:] |= on_path[:, :-1]
+    near_path[:, :-1] |= on_path[:, 1:]
+    kinds = [('open ', np.argwhere(shortcut)),
+             ('near ', np.argwhere(shortcut & near_path)),
+             ('close', np.argwhere(open_grid & ~on_path))]
+
+    repair_times, full_times = [], []
+    for i in range(edits):
+        kind, candidates = kinds[i % len(kinds)]
+        cell = tuple(int(v) for v in candidates[rng.integers(len(candidates))])
+
+        for undo in (False, True):
+            result = solver.toggle_cells([cell])
+            full_start = time.time()
+            try:
+                _, full_length, _ = solve_maze_wavefront(maze, start, end)
+            except RuntimeError:
+                full_length = None
+            full_time = time.time() - full_start
+
+            if result['path_length'] != full_length:
+                raise RuntimeError(f"Incremental path length {result['path_length']} != "
+                                   f"full solve {full_length} after toggling {cell}")
+            if not undo:
+                repair_times.append(result['repair_time'])
+                full_times.append(full_time)
+                detail = 'reseeded' if result['reseeded'] else f"{result['expanded']:,} expanded"
+                print(f"  {kind} {cell}: repair {result['repair_time'] * 1000:8.1f} ms "
+                      f"({detail}), full {full_time * 1000:8.1f} ms")
+
+    return {
+        'build_time': build_time,
+        'repair_median': statistics.median(repair_times),
+        'repair_max': max(repair_times),
+        'full_median': statistics.median(full_times),
+        'full_max': max(full_times),
+    }
+
+
+def main():
+    import random
+
+    from large_maze_generator import LargeMazeGenerator
+
+    print("=" * 60)
+    print("INCREMENTAL RE-SOLVE BENCHMARK")
+    print("=" * 60)
+
+    size = input("\nMaze size (2001 preset) [2001]: ").strip()
+    size = int(size) if size else 2001
+
+    random.seed(size)
+    maze = LargeMazeGenerator(size, size).generate_iterative(visualize=False)
+    start, end = (1, 1), (maze.shape[0] - 2, maze.shape[1] - 2)
+
+    stats = benchmark_single_edits(maze, start, end)
+    print(f"\nRepair: median {stats['repair_median'] * 1000:.1f} ms, "
+          f"max {stats['repair_max'] * 1000:.1f} ms")
+    print(f"Full solve: median {stats['full_median'] * 1000:.1f} ms, "
+          f"max {stats['full_max'] * 1000:.1f} ms")
+    print(f"Speedup (median): {stats['full_median'] / stats['repair_median']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import heapq
+import os
+import sys
+import time
+
+import numpy as np
+
+from dead_end_solver import load_maze
+from solver_registry import SolveInterrupted
+from tree_index import maze_checksum
+
+
+def graph_path_for(maze_filepath):
+    """Path of the junction graph cache stored next to a maze JSON file."""
+    return maze_filepath.replace('.json', '_junctions.npz')
+
+
+def open_neighbor_counts(maze):
+    """Number of open 4-neighbours of every cell, computed with array shifts."""
+    open_grid = (np.asarray(maze) == 0).astype(np.uint8)
+    counts = np.zeros(open_grid.shape, dtype=np.uint8)
+    counts[1:, :] += open_grid[:-1, :]
+    counts[:-1, :] += open_grid[1:, :]
+    counts[:, 1:] += open_grid[:, :-1]
+    counts[:, :-1] += open_grid[:, 1:]
+    return counts
+
+
+class JunctionGraph:
+    """
+    Maze graph with corridors contracted into weighted edges.
+
+    Nodes are junctions (3+ open neighbours), dead ends (1), isolated cells (0)
+    and any cells passed as keep (start and end). Every run of corridor cells
+    between two nodes becomes one edge.
+
+    Storage is CSR: the neighbours of node i are indices[indptr[i]:indptr[i+1]],
+    with edge lengths (in moves) in weights and undirected edge ids in edge_ids.
+    The corridor cells of edge e are span_cells[span_ptr[e]:span_ptr[e+1]],
+    ordered from edge_u[e] to edge_v[e]. Cells are flat indices (y * width + x).
+    """
+
+    def __init__(self, shape, node_cells, indptr, indices, weights, edge_ids,
+                 edge_u, edge_v, span_ptr, span_cells, checksum=None):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.node_cells = node_cells
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.edge_ids = edge_ids
+        self.edge_u = edge_u
+        self.edge_v = edge_v
+        self.span_ptr = span_ptr
+        self.span_cells = span_cells
+        self.checksum = checksum
+        self._adjacency = None
+
+    @property
+    def node_count(self):
+        return len(self.node_cells)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_u)
+
+    @classmethod
+    def build(cls, maze, keep=(), budget=None):
+        """
+        Contract the corridors of a maze.
+
+        Args:
+            maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+            keep (iterable): Cells (y, x) that must be nodes, e.g. start and end
+            budget (SolveBudget): Optional limits, charged per corridor cell
+                walked; SolveInterrupted is raised when they run out
+
+        Returns:
+            JunctionGraph
+        """
+        maze = np.asarray(maze)
+        height, width = maze.shape
+        open_flat = (maze == 0).ravel()
+
+        is_node = (maze == 0) & (open_neighbor_counts(maze) != 2)
+        for y, x in keep:
+            if maze[y, x] != 0:
+                raise ValueError(f"Position {(y, x)} is a wall")
+            is_node[y, x] = True
+
+        node_cells = np.flatnonzero(is_node)
+        node_flat = is_node.ravel()
+        node_id = {int(c): i for i, c in enumerate(node_cells)}
+
+        edge_u, edge_v, lengths = [], [], []
+        span_ptr = [0]
+        span_cells = []
+
+        for u, cell in enumerate(node_cells.tolist()):
+            x0 = cell % width
+            for off in (-width, width, -1, 1):
+                if off == -1 and x0 == 0 or off == 1 and x0 == width - 1:
+                    continue
+                nxt = cell + off
+                if nxt < 0 or nxt >= height * width or not open_flat[nxt]:
+                    continue
+
+                # Walk the corridor until the next node
+                span = []
+                prev, cur = cell, nxt
+                while not node_flat[cur]:
+                    span.append(cur)
+                    x = cur % width
+                    for step in (-width, width, -1, 1):
+                        if step == -1 and x == 0 or step == 1 and x == width - 1:
+                            continue
+                        cand = cur + step
+                        if cand != prev and 0 <= cand < height * width and open_flat[cand]:
+                            prev, cur = cur, cand
+                            break
+
+                if budget is not None and budget.exceeded(len(span) + 1):
+                    raise SolveInterrupted(budget.reason, counters={'nodes': u, 'edges': len(edge_u)})
+
+                v = node_id[cur]
+                # Each corridor is walked from both ends; keep one copy
+                if v <= u:
+                    continue
+
+                edge_u.append(u)
+                edge_v.append(v)
+                lengths.append(len(span) + 1)
+                span_cells.extend(span)
+                span_ptr.append(len(span_cells))
+
+        return cls.from_edges(maze.shape, node_cells, edge_u, edge_v, lengths,
+                              span_ptr, span_cells, checksum=maze_checksum(maze))
+
+    @classmethod
+    def from_edges(cls, shape, node_cells, edge_u, edge_v, lengths, span_ptr, span_cells,
+                   checksum=None):
+        """Assemble CSR arrays from an undirected edge list."""
+        edge_u = np.asarray(edge_u, dtype=np.int32)
+        edge_v = np.asarray(edge_v, dtype=np.int32)
+        lengths = np.asarray(lengths, dtype=np.int32)
+        n = len(node_cells)
+        m = len(edge_u)
+
+        src = np.concatenate([edge_u, edge_v])
+        dst = np.concatenate([edge_v, edge_u])
+        ids = np.concatenate([np.arange(m, dtype=np.int32)] * 2)
+        order = np.argsort(src, kind='stable')
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+        return cls(shape, node_cells, indptr, dst[order], np.concatenate([lengths] * 2)[order],
+                   ids[order], edge_u, edge_v, np.asarray(span_ptr, dtype=np.int64),
+                   np.asarray(span_cells, dtype=np.int64), checksum=checksum)
+
+    def node_of(self, pos):
+        """Node id of cell (y, x), or None if the cell lies inside a corridor."""
+        flat = pos[0] * self.shape[1] + pos[1]
+        i = int(np.searchsorted(self.node_cells, flat))
+        if i < len(self.node_cells) and self.node_cells[i] == flat:
+            return i
+        return None
+
+    def _adjacency_lists(self):
+        # Python lists are much faster than NumPy scalars inside the heap loop
+        if self._adjacency is None:
+            self._adjacency = (self.indptr.tolist(), self.indices.tolist(),
+                               self.weights.tolist(), self.edge_ids.tolist())
+        return self._adjacency
+
+    def shortest_path(self, start, end):
+        """
+        Dijkstra over the contracted graph.
+
+        Returns:
+            tuple: (node path, edge ids along it, length in moves), or None if
+            end is unreachable
+        """
+        source, target = self.node_of(start), self.node_of(end)
+        if source is None or target is None:
+            raise ValueError("Start and end must be graph nodes; rebuild the graph with keep=(start, end)")
+
+        indptr, indices, weights, edge_ids = self._adjacency_lists()
+        dist = {source: 0}
+        via = {}
+        heap = [(0, source)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u == target:
+                break
+            if d > dist[u]:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < dist.get(v, nd + 1):
+                    dist[v] = nd
+                    via[v] = (u, edge_ids[k])
+                    heapq.heappush(heap, (nd, v))
+
+        if target not in dist:
+            return None
+
+        nodes, edges = [target], []
+        while nodes[-1] != source:
+            u, e = via[nodes[-1]]
+            nodes.append(u)
+            edges.append(e)
+        nodes.reverse()
+        edges.reverse()
+        return nodes, edges, dist[target]
+
+    def expand(self, nodes, edges):
+        """Expand a node/edge path into the cell-level solution grid."""
+        solution = np.zeros(self.shape, dtype=np.uint8)
+        flat = solution.ravel()
+        flat[self.node_cells[nodes]] = 1
+        for e in edges:
+            flat[self.span_cells[self.span_ptr[e]:self.span_ptr[e + 1]]] = 1
+        return solution
+
+    def matches(self, maze, keep=()):
+        if tuple(maze.shape) != self.shape:
+            return False
+        if self.checksum is not None and self.checksum != maze_checksum(maze):
+            return False
+        return all(self.node_of(pos) is not None for pos in keep)
+
+    def save(self, path):
+        np.savez(path, shape=np.array(self.shape), node_cells=self.node_cells,
+                 indptr=self.indptr, indices=self.indices, weights=self.weights,
+                 edge_ids=self.edge_ids, edge_u=self.edge_u, edge_v=self.edge_v,
+                 span_ptr=self.span_ptr, span_cells=self.span_cells,
+                 checksum=np.array(-1 if self.checksum is None else self.checksum, dtype=np.int64))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            checksum = int(data['checksum'])
+            return cls(tuple(data['shape']), data['node_cells'], data['indptr'], data['indices'],
+                       data['weights'], data['edge_ids'], data['edge_u'], data['edge_v'],
+                       data['span_ptr'], data['span_cells'],
+                       checksum=None if checksum < 0 else checksum)
+
+
+def load_or_build_graph(maze, maze_filepath=None, keep=()):
+    """
+    Load the junction graph cached next to a maze file, rebuilding it if missing or stale.
+
+    Args:
+        maze (numpy.ndarray): The maze the graph must describe
+        maze_filepath (str): Path of the maze JSON file (graph is not cached if None)
+        keep (iterable): Cells (y, x) that must be graph nodes
+
+    Returns:
+        JunctionGraph
+    """
+    graph_path = graph_path_for(maze_filepath) if maze_filepath else None
+
+    if graph_path and os.path.exists(graph_path):
+        graph = JunctionGraph.load(graph_path)
+        if graph.matches(maze, keep):
+            return graph
+        print("Junction graph is stale, rebuilding...")
+
+    start_time = time.time()
+    graph = JunctionGraph.build(maze, keep=keep)
+    open_cells = int(np.count_nonzero(maze == 0))
+    print(f"Junction graph built in {time.time() - start_time:.2f} seconds: "
+          f"{graph.node_count:,} nodes, {graph.edge_count:,} edges ({open_cells:,} open cells)")
+
+    if graph_path:
+        graph.save(graph_path)
+        print(f"Junction graph saved to: {graph_path}")
+
+    return graph
+
+
+def solve_maze_junction_graph(maze, start, end, graph=None):
+    """
+    Solve a maze on its corridor-contracted graph.
+
+    Returns:
+        tuple: (solution, path_length, solve_time)
+    """
+    if graph is None:
+        graph = JunctionGraph.build(maze, keep=(start, end))
+
+    start_time = time.time()
+    result = graph.shortest_path(start, end)
+    if result is None:
+        raise RuntimeError(f"No path from {start} to {end}")
+
+    nodes, edges, length = result
+    solution = graph.expand(nodes, edges)
+    solve_time = time.time() - start_time
+
+    return solution, length, solve_time
+
+
+if __name__ == "__main__":
+    import glob
+
+    maze_files = glob.glob("mazes/maze_*.json")
+
+    if not maze_files:
+        print("No maze files found in 'mazes/' directory")
+        print("Run 'python maze.py' to create a maze first")
+        sys.exit(0)
+
+    latest_file = max(maze_files, key=os.path.getctime)
+    filename = os.path.basename(latest_file)
+
+    print(f"\n{'='*60}")
+    print(f"Loading maze: {filename}")
+    print(f"{'='*60}\n")
+
+    maze, start, end, maze_data = load_maze(filename)
+    graph = load_or_build_graph(maze, latest_file, keep=(start, end))
+
+    solution, length, solve_time = solve_maze_junction_graph(maze, start, end, graph=graph)
+
+    print(f"\nJunction Graph Solve Complete!")
+    print(f"Path length: {length:,} moves")
+    print(f"Solution path cells: {int(np.sum(solution)):,}")
+    print(f"Solve time: {solve_time:.3f} seconds")
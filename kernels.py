@@ -0,0 +1,310 @@
+import random
+import time
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def resolve_backend(backend='auto'):
+    """
+    Pick the kernel backend.
+
+    Args:
+        backend (str): 'auto' (numba when installed), 'numba' or 'python'
+
+    Returns:
+        str: 'numba' or 'python'
+    """
+    if backend == 'auto':
+        return 'numba' if NUMBA_AVAILABLE else 'python'
+    if backend == 'numba' and not NUMBA_AVAILABLE:
+        raise ValueError("Numba backend requested but numba is not installed (pip install numba)")
+    if backend not in ('numba', 'python'):
+        raise ValueError(f"Unknown backend '{backend}'. Use 'auto', 'numba' or 'python'")
+    return backend
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _carve(maze, stack, sp, words, wpos):
+        # Mirrors LargeMazeGenerator.generate_iterative. A cell two steps
+        # away is unvisited exactly when it is still a wall, and
+        # random.choice(neighbors) is replayed from raw Mersenne Twister
+        # words the way Random._randbelow consumes them: one 32-bit word per
+        # getrandbits(k) call, keeping the top k bits, retrying while >= n.
+        height, width = maze.shape
+        cand_x = np.empty(4, dtype=np.int64)
+        cand_y = np.empty(4, dtype=np.int64)
+        carved = 0
+
+        while sp > 0:
+            x = stack[sp - 1, 0]
+            y = stack[sp - 1, 1]
+
+            n = 0
+            # North, south, west, east - same order as the Python loop
+            if y - 2 > 0 and maze[y - 2, x] == 1:
+                cand_x[n] = x
+                cand_y[n] = y - 2
+                n += 1
+            if y + 2 < height - 1 and maze[y + 2, x] == 1:
+                cand_x[n] = x
+                cand_y[n] = y + 2
+                n += 1
+            if x - 2 > 0 and maze[y, x - 2] == 1:
+                cand_x[n] = x - 2
+                cand_y[n] = y
+                n += 1
+            if x + 2 < width - 1 and maze[y, x + 2] == 1:
+                cand_x[n] = x + 2
+                cand_y[n] = y
+                n += 1
+
+            if n == 0:
+                sp -= 1
+                continue
+
+            bits = 1 if n == 1 else (2 if n <= 3 else 3)
+            choice_start = wpos
+            while True:
+                if wpos >= words.shape[0]:
+                    # Out of random words: roll back this choice and ask for more
+                    return sp, choice_start, carved, False
+                r = words[wpos] >> (32 - bits)
+                wpos += 1
+                if r < n:
+                    break
+
+            nx = cand_x[r]
+            ny = cand_y[r]
+            maze[(y + ny) // 2, (x + nx) // 2] = 0
+            maze[ny, nx] = 0
+            stack[sp, 0] = nx
+            stack[sp, 1] = ny
+            sp += 1
+            carved += 1
+
+        return sp, wpos, carved, True
+
+    @njit(cache=True)
+    def _find_dead_ends(working_maze, sy, sx, ey, ex, out_y, out_x):
+        height, width = working_maze.shape
+        count = 0
+        for y in range(height):
+            for x in range(width):
+                if working_maze[y, x] != 0 or (y == sy and x == sx) or (y == ey and x == ex):
+                    continue
+                open_count = 0
+                if x + 1 < width and working_maze[y, x + 1] == 0:
+                    open_count += 1
+                if y + 1 < height and working_maze[y + 1, x] == 0:
+                    open_count += 1
+                if x > 0 and working_maze[y, x - 1] == 0:
+                    open_count += 1
+                if y > 0 and working_maze[y - 1, x] == 0:
+                    open_count += 1
+                if open_count == 1:
+                    out_y[count] = y
+                    out_x[count] = x
+                    count += 1
+        return count
+
+    @njit(cache=True)
+    def _left_hand(maze, y, x, ey, ex, direction, steps, max_steps, out_y, out_x):
+        # Status: 0 reached end, 1 output buffer full, 2 step limit
+        height, width = maze.shape
+        dys = (-1, 0, 1, 0)
+        dxs = (0, 1, 0, -1)
+        n = 0
+
+        while not (y == ey and x == ex):
+            if n == out_y.shape[0]:
+                return y, x, direction, steps, n, 1
+            steps += 1
+            if steps > max_steps:
+                return y, x, direction, steps - 1, n, 2
+
+            for turn in (-1, 0, 1, 2):
+                ndir = (direction + turn) % 4
+                ny = y + dys[ndir]
+                nx = x + dxs[ndir]
+                if 0 <= ny < height and 0 <= nx < width and maze[ny, nx] == 0:
+                    direction = ndir
+                    y = ny
+                    x = nx
+                    break
+
+            out_y[n] = y
+            out_x[n] = x
+            n += 1
+
+        return y, x, direction, steps, n, 0
+
+
+def _random_words(rng, count):
+    return np.frombuffer(rng.getrandbits(32 * count).to_bytes(4 * count, 'little'),
+                         dtype='<u4').astype(np.uint32)
+
+
+def carve_maze(maze, start=(1, 1), rng=random):
+    """
+    Compiled iterative backtracking carve, bit-identical to the Python loop.
+
+    The Python generator draws one random.choice per carve. The kernel
+    consumes the same Mersenne Twister stream in word chunks, and afterwards
+    the generator state is rewound and advanced by exactly the words used,
+    so the random module ends in the same state as after the Python loop.
+
+    Args:
+        maze (numpy.ndarray): All-wall uint8 maze, carved in place
+        start (tuple): Start cell (x, y) as used by generate_iterative
+        rng: random.Random-compatible generator (default: the random module)
+
+    Returns:
+        int: Number of cells visited (passages)
+    """
+    height, width = maze.shape
+    x, y = start
+    maze[y, x] = 0
+
+    stack = np.empty(((height // 2) * (width // 2) + 1, 2), dtype=np.int64)
+    stack[0, 0], stack[0, 1] = x, y
+    sp = 1
+
+    state = rng.getstate()
+    chunk = min(max(1024, (height // 2) * (width // 2) * 2), 1 << 22)
+    words = _random_words(rng, chunk)
+    used = 0
+    visited = 1
+
+    while True:
+        sp, wpos, carved, done = _carve(maze, stack, sp, words, 0)
+        used += wpos
+        visited += carved
+        if done:
+            break
+        words = np.concatenate([words[wpos:], _random_words(rng, chunk)])
+
+    rng.setstate(state)
+    if used:
+        rng.getrandbits(32 * used)
+
+    return visited
+
+
+def find_dead_ends(working_maze, start, end):
+    """
+    Compiled dead-end scan: open cells (other than start/end) with exactly
+    one open neighbour, in the same row-major order as the Python scan.
+
+    Returns:
+        tuple: (ys, xs) int arrays
+    """
+    size = working_maze.size
+    out_y = np.empty(size, dtype=np.int64)
+    out_x = np.empty(size, dtype=np.int64)
+    n = _find_dead_ends(working_maze, start[0], start[1], end[0], end[1], out_y, out_x)
+    return out_y[:n], out_x[:n]
+
+
+def left_hand_steps(maze, position, end, direction, steps, max_steps, limit):
+    """
+    Advance a left-hand walk by at most limit steps.
+
+    Returns:
+        tuple: (ys, xs, position, direction, steps, status) where status is
+        'solved', 'running' (limit reached) or 'step_limit'
+    """
+    out_y = np.empty(limit, dtype=np.int64)
+    out_x = np.empty(limit, dtype=np.int64)
+    y, x, direction, steps, n, code = _left_hand(maze, position[0], position[1], end[0], end[1],
+                                                 direction, steps, max_steps, out_y, out_x)
+    status = ('solved', 'running', 'step_limit')[code]
+    return out_y[:n], out_x[:n], (int(y), int(x)), int(direction), int(steps), status
+
+
+def benchmark(sizes=(201, 501, 1001), seed=42, repeats=3):
+    """
+    Time the Python and Numba backends of each kernel and check they agree.
+
+    Returns:
+        list: (kernel, size, python_seconds, numba_seconds) rows
+    """
+    from dead_end_solver import fill_dead_ends
+    from large_maze_generator import LargeMazeGenerator
+    from left_hand_algo import left_hand_walk
+
+    backends = ['python'] + (['numba'] if NUMBA_AVAILABLE else [])
+    rows = []
+
+    def best_of(func):
+        best, value = None, None
+        for _ in range(repeats):
+            t = time.perf_counter()
+            value = func()
+            elapsed = time.perf_counter() - t
+            best = elapsed if best is None else min(best, elapsed)
+        return best, value
+
+    if NUMBA_AVAILABLE:
+        # Warm up the JIT so compile time is not measured
+        warm = LargeMazeGenerator(11, 11)
+        maze = warm.generate_iterative(visualize=False, backend='numba')
+        fill_dead_ends(maze.copy(), (1, 1), (9, 9), backend='numba')
+        left_hand_walk(maze, (1, 1), (9, 9), backend='numba')
+
+    for size in sizes:
+        generator = LargeMazeGenerator(size, size)
+        start, end = (1, 1), (size - 2, size - 2)
+        timings = {}
+        mazes = {}
+
+        for backend in backends:
+            def generate():
+                random.seed(seed)
+                return generator.generate_iterative(visualize=False, backend=backend, verbose=False)
+            timings[backend], mazes[backend] = best_of(generate)
+        if len(mazes) == 2 and not np.array_equal(mazes['python'], mazes['numba']):
+            raise RuntimeError(f"Backends disagree on generated {size}x{size} maze")
+        rows.append(('generate_iterative', size, timings['python'], timings.get('numba')))
+
+        maze = mazes['python']
+        timings, walks = {}, {}
+        for backend in backends:
+            timings[backend], walks[backend] = best_of(
+                lambda: left_hand_walk(maze, start, end, backend=backend))
+        if len(walks) == 2 and walks['python'] != walks['numba']:
+            raise RuntimeError(f"Backends disagree on left-hand walk for {size}x{size}")
+        rows.append(('left_hand_walk', size, timings['python'], timings.get('numba')))
+
+        # The Python dead-end scan is O(cells) per iteration; keep it to small sizes
+        if size <= 201:
+            timings, filled = {}, {}
+            for backend in backends:
+                def fill():
+                    working = maze.copy()
+                    fill_dead_ends(working, start, end, backend=backend)
+                    return working
+                timings[backend], filled[backend] = best_of(fill)
+            if len(filled) == 2 and not np.array_equal(filled['python'], filled['numba']):
+                raise RuntimeError(f"Backends disagree on dead-end filling for {size}x{size}")
+            rows.append(('fill_dead_ends', size, timings['python'], timings.get('numba')))
+
+    print(f"\n{'Kernel':<22}{'Size':>8}{'Python (s)':>14}{'Numba (s)':>14}{'Speedup':>10}")
+    for kernel, size, py, nb in rows:
+        speedup = f"{py / nb:.1f}x" if nb else '-'
+        nb_text = f"{nb:.4f}" if nb else 'n/a'
+        print(f"{kernel:<22}{size:>8}{py:>14.4f}{nb_text:>14}{speedup:>10}")
+
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"Numba available: {NUMBA_AVAILABLE}")
+    benchmark()
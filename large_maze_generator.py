@@ -3,12 +3,30 @@ import numpy as np
 import json
 import os
 import sys
+import time
 from datetime import datetime
 import pygame
 from collections import deque
 
+import metrics
+from dirty_renderer import DirtyCellRenderer
+from kernels import carve_maze, resolve_backend
+from maze_render import save_maze_image
+from planner import available_memory, format_bytes, image_cell_size, plan_run
+from viewport import CONTROLS, Viewport
+
+# Preset sizes offered by main(): key -> (width, height, description)
+PRESETS = {
+    '1': (201, 201, "Small (40K cells) - Very visible"),
+    '2': (501, 501, "Medium (251K cells) - Recommended"),
+    '3': (1001, 1001, "Large (1M cells) - Good balance"),
+    '4': (2001, 2001, "Extra Large (4M cells) - Advanced"),
+    '5': (5001, 5001, "Huge (25M cells) - Expert only"),
+    '6': (7001, 7001, "Maximum (49M cells) - Visualization disabled"),
+}
+
 class LargeMazeGenerator:
-    def __init__(self, width, height):
+    def __init__(self, width, height, verbose=True):
         if width % 2 == 0:
             width += 1
         if height % 2 == 0:
@@ -17,8 +35,10 @@ class LargeMazeGenerator:
         self.WIDTH = width
         self.HEIGHT = height
         self.total_cells = width * height
+        self.verbose = verbose
         
-        print(f"Initializing maze generator: {width}x{height} = {self.total_cells:,} cells")
+        if verbose:
+            print(f"Initializing maze generator: {width}x{height} = {self.total_cells:,} cells")
         
         self.WALL = 1
         self.EMPTY = 0
@@ -27,8 +47,36 @@ class LargeMazeGenerator:
         # Not using recursion for generation, but set reasonable limit for safety
         sys.setrecursionlimit(10000)
         
-    def generate_iterative(self, visualize=True, cell_size=1):
-        print("Generating maze using iterative backtracking...")
+    def generate_iterative(self, visualize=True, cell_size=1, backend='auto', refresh_budget=0.05,
+                           observer=None, verbose=None):
+        """
+        Carve a perfect maze with iterative backtracking.
+
+        Without a live window the carve runs in the compiled kernel when
+        numba is available (backend 'auto' or 'numba'); it consumes the
+        random module exactly like the Python loop, so a given seed yields
+        the same maze on either backend.
+
+        With a live window, refresh_budget is the largest share of wall
+        time spent drawing progress frames: a frame is drawn only while
+        the time spent drawing so far stays under that share of the time
+        elapsed, so large mazes get fewer frames instead of a slower carve.
+
+        observer(cells, state) is called with the cells opened at every step
+        (state CELL_OPEN), e.g. by a recorder.Recorder; it makes the carve
+        run the Python loop.
+
+        verbose (default: the generator's) prints the start and completion
+        lines and a progress line every 10,000 passages (50,000 on mazes
+        over 10M cells) in the Python loop; with metrics enabled the
+        progress is recorded as events instead.
+        """
+        from solver_registry import CELL_OPEN
+
+        if verbose is None:
+            verbose = self.verbose
+        if verbose:
+            print("Generating maze using iterative backtracking...")
         
         maze = np.ones((self.HEIGHT, self.WIDTH), dtype=np.uint8)
         
@@ -36,19 +84,13 @@ class LargeMazeGenerator:
         visited = set()
         visited.add((1, 1))
         maze[1, 1] = self.EMPTY
+        if observer:
+            observer([(1, 1)], CELL_OPEN)
         
         total_passages = ((self.HEIGHT // 2) * (self.WIDTH // 2))
         
-        # Optimize progress updates based on maze size
-        if self.total_cells > 10000000:
-            progress_interval = max(10000, total_passages // 20)
-        elif self.total_cells > 1000000:
-            progress_interval = max(5000, total_passages // 50)
-        else:
-            progress_interval = max(100, total_passages // 100)
-        
         screen = None
-        if visualize and self.total_cells <= 4000000:
+        if visualize and self.total_cells <= 10000000:
             pygame.init()
             
             display_info = pygame.display.Info()
@@ -72,21 +114,48 @@ class LargeMazeGenerator:
             
             screen = pygame.display.set_mode((screen_width, screen_height + 50))
             pygame.display.set_caption(f"Generating Maze: {self.WIDTH}x{self.HEIGHT}")
+            print(f"View: {CONTROLS}")
             
             BLACK = (0, 0, 0)
             WHITE = (255, 255, 255)
             BLUE = (100, 149, 237)
             font = pygame.font.Font(None, 24)
+            
+            # The view reads the maze array itself, so a frame needs no per-cell bookkeeping
+            viewport = Viewport(maze, np.array([WHITE, BLACK], dtype=np.uint8),
+                                (screen_width, screen_height), cell_size, pyramid=False)
+            screen.fill(BLACK)
+            info_rect = pygame.Rect(0, screen_height, screen_width, 50)
+        
+        carve = metrics.begin('generate', width=self.WIDTH, height=self.HEIGHT)
+        if screen is None and observer is None and resolve_backend(backend) == 'numba':
+            passages = carve_maze(maze)
+            carve.end(backend='numba', passages=passages)
+            if verbose:
+                print(f"Maze generation complete! Total passages: {passages:,}")
+            return maze
         
         step = 0
+        start_time = time.perf_counter()
+        draw_time = 0.0
+        progress_interval = 50000 if self.total_cells > 10000000 else 10000
         
-        while stack:
-            for event in pygame.event.get() if screen else []:
+        def draw_progress():
+            for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    if screen:
-                        pygame.quit()
+                    pygame.quit()
                     sys.exit()
+                viewport.handle_event(event)
+            
+            screen.fill(BLACK, info_rect)
+            
+            progress = (len(visited) / total_passages) * 100
+            text = font.render(f"Progress: {progress:.1f}% ({len(visited):,}/{total_passages:,})", True, BLUE)
+            screen.blit(text, (10, screen_height + 10))
             
+            pygame.display.update([viewport.render(screen), info_rect])
+        
+        while stack:
             x, y = stack[-1]
             
             neighbors = []
@@ -114,55 +183,28 @@ class LargeMazeGenerator:
                 stack.append((nx, ny))
                 
                 step += 1
+                if observer:
+                    observer([(y + dy // 2, x + dx // 2), (ny, nx)], CELL_OPEN)
                 
-                if screen and step % progress_interval == 0:
-                    screen.fill(BLACK)
-                    
-                    # Optimize rendering for large mazes - sample pixels
-                    sample_rate = max(1, self.HEIGHT // 800, self.WIDTH // 800)
-                    for sy in range(0, self.HEIGHT, sample_rate):
-                        for sx in range(0, self.WIDTH, sample_rate):
-                            if maze[sy, sx] == self.EMPTY:
-                                px = (sx * cell_size) % screen_width
-                                py = (sy * cell_size) % screen_height
-                                if cell_size > 1:
-                                    pygame.draw.rect(screen, WHITE, (px, py, cell_size, cell_size))
-                                else:
-                                    screen.set_at((px, py), WHITE)
-                    
-                    progress = (len(visited) / total_passages) * 100
-                    text = font.render(f"Progress: {progress:.1f}% ({len(visited):,}/{total_passages:,})", True, BLUE)
-                    screen.blit(text, (10, screen_height + 10))
-                    
-                    pygame.display.flip()
-                    pygame.time.wait(10)  # Small delay to prevent CPU overload
+                # Draw only while drawing stays within its share of the wall time
+                if screen and step % 256 == 0:
+                    now = time.perf_counter()
+                    if draw_time <= refresh_budget * (now - start_time):
+                        draw_progress()
+                        draw_time += time.perf_counter() - now
                 
-                if self.total_cells > 10000000:
-                    if step % 50000 == 0:
-                        progress = (len(visited) / total_passages) * 100
-                        print(f"Progress: {progress:.1f}% - Visited: {len(visited):,}/{total_passages:,}")
-                elif step % 10000 == 0:
-                    progress = (len(visited) / total_passages) * 100
-                    print(f"Progress: {progress:.1f}% - Visited: {len(visited):,}/{total_passages:,}")
+                if step % progress_interval == 0:
+                    metrics.progress('generate', len(visited), total_passages, verbose)
             else:
                 stack.pop()
         
+        carve.end(backend='python', passages=len(visited), steps=step, draw_time=draw_time)
         if screen:
-            screen.fill(BLACK)
-            for y in range(self.HEIGHT):
-                for x in range(self.WIDTH):
-                    if maze[y, x] == self.EMPTY:
-                        px = x * cell_size
-                        py = y * cell_size
-                        if px < screen_width and py < screen_height:
-                            if cell_size > 1:
-                                pygame.draw.rect(screen, WHITE, (px, py, cell_size, cell_size))
-                            else:
-                                screen.set_at((px, py), WHITE)
+            screen.fill(BLACK, info_rect)
             
             text = font.render(f"Maze Complete! {self.WIDTH}x{self.HEIGHT}", True, (0, 255, 0))
             screen.blit(text, (10, screen_height + 10))
-            pygame.display.flip()
+            pygame.display.update([viewport.render(screen), info_rect])
             
             print("\nMaze generated! Close the window to continue...")
             waiting = True
@@ -171,13 +213,24 @@ class LargeMazeGenerator:
                     if event.type == pygame.QUIT:
                         waiting = False
                         pygame.time.wait(100)
+                    elif viewport.handle_event(event):
+                        pygame.display.update(viewport.render(screen))
             
             pygame.quit()
         
-        print(f"Maze generation complete! Total passages: {len(visited):,}")
+        if verbose:
+            print(f"Maze generation complete! Total passages: {len(visited):,}")
         return maze
     
-    def save_maze(self, maze, filename=None):
+    @metrics.timed('save')
+    def save_maze(self, maze, filename=None, export_image=True, plan=None):
+        # plan: planner.Plan for this size; picks JSON or .npy and how the
+        # image is exported (default: planned against the available memory).
+        # An infeasible plan raises planner.PlanError before anything is written
+        if plan is None:
+            plan = plan_run(self.WIDTH, self.HEIGHT, export=export_image)
+        plan.check()
+        
         if not os.path.exists("mazes"):
             os.makedirs("mazes")
         
@@ -197,11 +250,11 @@ class LargeMazeGenerator:
             'solved': False
         }
         
-        if self.total_cells <= 100000000:
+        if plan.storage == 'json':
             data['maze'] = maze.tolist()
             print(f"Saving full maze data...")
         else:
-            print(f"Maze too large ({self.total_cells:,} cells) - saving metadata only")
+            print(f"Maze too large for JSON lists ({self.total_cells:,} cells) - saving array as .npy")
             np.save(filepath.replace('.json', '.npy'), maze)
             data['maze_file'] = filename.replace('.json', '.npy')
             data['note'] = 'Full maze data saved in separate .npy file'
@@ -215,15 +268,20 @@ class LargeMazeGenerator:
         print(f"   Start: (1, 1)")
         print(f"   End: ({self.HEIGHT - 2}, {self.WIDTH - 2})")
         
-        image_path = self.export_as_image(maze, filepath.replace('.json', '.png'))
-        if image_path:
-            print(f"   Image: {image_path}")
+        if export_image and plan.export is None:
+            print(f"   Image: skipped, no export fits in {format_bytes(plan.budget)}")
+        elif export_image:
+            image_path = self.export_as_image(maze, filepath.replace('.json', '.png'),
+                                              stream=plan.export == 'stream')
+            if image_path:
+                print(f"   Image: {image_path}")
         
         print(f"{'='*60}\n")
         
         return filepath
     
-    def export_as_image(self, maze, filename=None):
+    @metrics.timed('render')
+    def export_as_image(self, maze, filename=None, stream=False):
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"maze_{self.WIDTH}x{self.HEIGHT}_{timestamp}.png"
@@ -233,66 +291,18 @@ class LargeMazeGenerator:
         
         print(f"Exporting maze as image for manual solving...")
         
-        cell_size = 1
-        if self.total_cells > 10000000:
-            print(f"Maze too large to export as single image ({self.total_cells:,} cells)")
-            return None
+        cell_size = image_cell_size(self.total_cells)
+        if stream or self.total_cells > 10000000:
+            # Past pygame's surface limits or the memory budget; the PNG is streamed
+            stream = True
+            print(f"Streaming full-resolution image with {cell_size}px per cell...")
         elif self.total_cells > 4000000:
-            cell_size = 5
             print(f"Creating large image with {cell_size}px per cell (may take time)...")
-        elif self.total_cells > 1000000:
-            cell_size = 8
-        elif self.total_cells > 100000:
-            cell_size = 12
-        else:
-            cell_size = 20
-        
-        img_width = self.WIDTH * cell_size
-        img_height = self.HEIGHT * cell_size + 40
-        
-        if img_width > 32767 or img_height > 32767:
-            print(f"Image dimensions too large ({img_width}x{img_height}), reducing cell size...")
-            cell_size = max(1, min(32767 // self.WIDTH, 32767 // self.HEIGHT))
-            img_width = self.WIDTH * cell_size
-            img_height = self.HEIGHT * cell_size + 40
         
         try:
-            pygame.init()
-            surface = pygame.Surface((img_width, img_height))
-            
-            BLACK = (0, 0, 0)
-            WHITE = (255, 255, 255)
-            GREEN = (0, 255, 0)
-            RED = (255, 0, 0)
-            
-            surface.fill(WHITE)
-            
-            for y in range(self.HEIGHT):
-                for x in range(self.WIDTH):
-                    if maze[y, x] == self.WALL:
-                        rect = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
-                        pygame.draw.rect(surface, BLACK, rect)
-            
-            start_rect = pygame.Rect(1 * cell_size, 1 * cell_size, cell_size, cell_size)
-            pygame.draw.rect(surface, GREEN, start_rect)
-            
-            end_rect = pygame.Rect((self.WIDTH - 2) * cell_size, (self.HEIGHT - 2) * cell_size, cell_size, cell_size)
-            pygame.draw.rect(surface, RED, end_rect)
-            
-            if cell_size >= 8:
-                font = pygame.font.Font(None, min(24, cell_size * 2))
-                start_text = font.render('S', True, BLACK)
-                end_text = font.render('E', True, BLACK)
-                surface.blit(start_text, (1 * cell_size + 2, 1 * cell_size + 2))
-                surface.blit(end_text, ((self.WIDTH - 2) * cell_size + 2, (self.HEIGHT - 2) * cell_size + 2))
-            
-            font = pygame.font.Font(None, 24)
             info_text = f"Maze: {self.WIDTH}x{self.HEIGHT} | Start (Green) to End (Red)"
-            text_surface = font.render(info_text, True, BLACK)
-            surface.blit(text_surface, (10, self.HEIGHT * cell_size + 10))
-            
-            pygame.image.save(surface, filename)
-            pygame.quit()
+            save_maze_image(maze, filename, cell_size, info_text,
+                            start=(1, 1), end=(self.HEIGHT - 2, self.WIDTH - 2), stream=stream)
             
             file_size = os.path.getsize(filename) / (1024 * 1024)
             print(f"✅ Image exported: {file_size:.2f} MB")
@@ -327,6 +337,7 @@ class LargeMazeGenerator:
         
         screen = pygame.display.set_mode((screen_width, screen_height))
         pygame.display.set_caption(f"Maze: {self.WIDTH}x{self.HEIGHT} ({self.total_cells:,} cells) | {cell_size}px cells")
+        print(f"View: {CONTROLS}")
         
         BLACK = (0, 0, 0)
         WHITE = (255, 255, 255)
@@ -337,26 +348,14 @@ class LargeMazeGenerator:
         screen.fill(BLACK)
         
         print("Rendering maze...")
-        for y in range(self.HEIGHT):
-            for x in range(self.WIDTH):
-                px = x * cell_size
-                py = y * cell_size
-                
-                if px < screen_width and py < screen_height:
-                    color = WHITE if maze[y, x] == self.EMPTY else BLACK
-                    
-                    if (y, x) == (1, 1):
-                        color = GREEN
-                    elif (y, x) == (self.HEIGHT - 2, self.WIDTH - 2):
-                        color = RED
-                    
-                    if cell_size > 1:
-                        pygame.draw.rect(screen, color, (px, py, cell_size, cell_size))
-                    else:
-                        screen.set_at((px, py), color)
+        renderer = DirtyCellRenderer(screen, maze, cell_size, {},
+                                     palette=np.array([WHITE, BLACK, BLACK, GREEN, RED], dtype=np.uint8),
+                                     start=(1, 1), end=(self.HEIGHT - 2, self.WIDTH - 2),
+                                     area=(screen_width, screen_height - 50))
+        renderer.flush()
         
         text = font.render(f"Maze: {self.WIDTH}x{self.HEIGHT} ({self.total_cells:,} cells)", True, WHITE)
-        screen.blit(text, (10, screen_height + 10))
+        screen.blit(text, (10, screen_height - 40))
         
         pygame.display.flip()
         print("Maze rendered! Close window to exit...")
@@ -366,6 +365,8 @@ class LargeMazeGenerator:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     waiting = False
+                elif renderer.handle_event(event):
+                    pygame.display.update(renderer.flush())
         
         pygame.quit()
 
@@ -374,29 +375,22 @@ def main():
     print("="*60)
     print("LARGE MAZE GENERATOR")
     print("="*60)
-    print("\nOptimized for Mac M1 Air 8GB - Max 50M cells")
+    budget = available_memory()
+    if budget is not None:
+        print(f"\nAvailable memory: {format_bytes(budget)}")
     print("Large mazes (>10M cells) disable visualization to prevent lag\n")
     
-    presets = {
-        '1': (201, 201, "Small (40K cells) - Very visible"),
-        '2': (501, 501, "Medium (251K cells) - Recommended"),
-        '3': (1001, 1001, "Large (1M cells) - Good balance"),
-        '4': (2001, 2001, "Extra Large (4M cells) - Advanced"),
-        '5': (5001, 5001, "Huge (25M cells) - Expert only"),
-        '6': (7001, 7001, "Maximum (49M cells) - Visualization disabled"),
-    }
-    
     print("Preset sizes:")
-    for key, (w, h, desc) in presets.items():
-        print(f"  {key}. {desc}: {w}x{h} = {w*h:,} cells")
+    for key, (w, h, desc) in PRESETS.items():
+        fits = plan_run(w, h, budget).feasible
+        print(f"  {key}. {desc}: {w}x{h} = {w*h:,} cells{'' if fits else '  (does not fit in memory)'}")
     
     print("  c. Custom size")
-    print("\nRecommended for 8GB RAM: Options 1-3")
     
     choice = input("\nSelect preset (1-5) or 'c' for custom: ").strip().lower()
     
-    if choice in presets:
-        width, height, _ = presets[choice]
+    if choice in PRESETS:
+        width, height, _ = PRESETS[choice]
     elif choice == 'c':
         width = int(input("Enter width (odd number, e.g., 5001): "))
         height = int(input("Enter height (odd number, e.g., 5001): "))
@@ -415,18 +409,26 @@ def main():
     
     generator = LargeMazeGenerator(width, height)
     
+    # Refuse up front rather than running out of memory halfway through;
+    # visualizing always runs the Python carve
+    plan = plan_run(generator.WIDTH, generator.HEIGHT, budget,
+                    generators=['python'] if visualize else None)
+    print(plan.describe())
+    if not plan.feasible:
+        print("\n❌ This maze does not fit in the available memory; choose a smaller size.")
+        return
+    
     print(f"\nGenerating {width}x{height} maze ({generator.total_cells:,} cells)...")
     print("This may take several minutes for very large mazes...\n")
     
-    import time
     start_time = time.time()
     
-    maze = generator.generate_iterative(visualize=visualize)
+    maze = generator.generate_iterative(visualize=visualize, backend=plan.generator)
     
     elapsed = time.time() - start_time
     print(f"\nGeneration time: {elapsed:.2f} seconds")
     
-    generator.save_maze(maze)
+    generator.save_maze(maze, plan=plan)
     
     view = input("\nView final maze? (y/n): ").strip().lower()
     if view == 'y':
@@ -1,12 +1,17 @@
 import json
 import os
-import sys
 import time
 from datetime import datetime
 
 import numpy as np
 import pygame
 
+import metrics
+from dirty_renderer import DirtyCellRenderer
+from frame_pipeline import FramePipeline
+from planner import load_array
+from viewport import CONTROLS
+
 
 # Color constants for visualization
 COLOR_WHITE = (255, 255, 255)
@@ -18,6 +23,7 @@ COLOR_YELLOW = (255, 255, 0)
 COLOR_GRAY = (128, 128, 128)
 
 
+@metrics.timed('load')
 def load_maze(filename, directory="mazes"):
     """
     Load a maze from a JSON file.
@@ -41,7 +47,7 @@ def load_maze(filename, directory="mazes"):
         maze = np.array(data['maze'])
     elif 'maze_file' in data:
         npy_path = os.path.join(directory, data['maze_file'])
-        maze = np.load(npy_path)
+        maze = load_array(npy_path)
     else:
         raise ValueError("No maze data found in file")
     
@@ -51,7 +57,29 @@ def load_maze(filename, directory="mazes"):
     return maze, start_pos, end_pos, data
 
 
-def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
+def left_hand_walk(maze, start, end, max_steps=10000000, observer=None, budget=None, backend='auto'):
+    """
+    Headless left-hand rule walk.
+
+    Args:
+        maze: 2D numpy array (1 = wall, 0 = path)
+        start: Starting position (y, x)
+        end: Ending position (y, x)
+        max_steps: Step limit before giving up
+        observer: Optional observer(cells, state) called with every cell stepped on
+        budget: Optional SolveBudget; SolveInterrupted is raised with the
+            cells walked so far when it runs out
+        backend: 'auto', 'numba' or 'python'; the numba kernel walks in
+            chunks, so observer and budget see a chunk of steps at a time
+
+    Returns:
+        Tuple of (walk, steps, status): walk lists every cell stepped on after
+        start (cells repeat when the walk retraces a dead end), status is
+        'solved' or 'step_limit'
+    """
+    from kernels import left_hand_steps, resolve_backend
+    from solver_registry import CELL_PATH, SolveInterrupted, nearest_cell
+
     if maze is None or len(maze.shape) != 2:
         raise ValueError("Invalid maze: must be a 2D numpy array")
     
@@ -60,11 +88,10 @@ def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
     
     if not (0 <= end[0] < maze.shape[0] and 0 <= end[1] < maze.shape[1]):
         raise ValueError(f"End position {end} is out of bounds")
-    
+
     height, width = maze.shape
-    solution = np.zeros_like(maze)
+    start, end = tuple(start), tuple(end)
     DIRS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-    DIR_NAMES = ["UP", "RIGHT", "DOWN", "LEFT"]
 
     def in_bounds(y, x):
         return 0 <= y < height and 0 <= x < width
@@ -83,6 +110,68 @@ def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
     if direction is None:
         raise RuntimeError("Start position is enclosed. Left-hand rule cannot begin.")
 
+    steps = 0
+    walk = []
+
+    def interrupted():
+        explored = np.zeros(maze.shape, dtype=bool)
+        explored[start] = True
+        if walk:
+            ys, xs = zip(*walk)
+            explored[list(ys), list(xs)] = True
+        return SolveInterrupted(budget.reason, explored=explored,
+                                frontier=nearest_cell(explored, end),
+                                counters={'steps': steps})
+
+    if resolve_backend(backend) == 'numba':
+        chunk = 65536 if observer or budget is not None else 1 << 20
+        status = 'running'
+        while status == 'running':
+            if budget is not None and budget.exceeded(chunk):
+                raise interrupted()
+            ys, xs, (y, x), direction, steps, status = left_hand_steps(
+                maze, (y, x), end, direction, steps, max_steps, chunk)
+            cells = list(zip(ys.tolist(), xs.tolist()))
+            walk.extend(cells)
+            if observer and cells:
+                observer(cells, CELL_PATH)
+        return walk, steps, status
+
+    while (y, x) != end:
+        steps += 1
+        if steps > max_steps:
+            return walk, steps - 1, 'step_limit'
+
+        if budget is not None and budget.exceeded():
+            steps -= 1
+            raise interrupted()
+
+        # Left, forward, right, back
+        for turn in [-1, 0, 1, 2]:
+            ndir = (direction + turn) % 4
+            dy, dx = DIRS[ndir]
+            ny, nx = y + dy, x + dx
+            if is_open(ny, nx):
+                direction = ndir
+                y, x = ny, nx
+                break
+
+        walk.append((y, x))
+        if observer:
+            observer([(y, x)], CELL_PATH)
+
+    return walk, steps, 'solved'
+
+
+def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
+    from solver_registry import CELL_PATH, erase_loops
+
+    if maze is None or len(maze.shape) != 2:
+        raise ValueError("Invalid maze: must be a 2D numpy array")
+    
+    height, width = maze.shape
+    solution = np.zeros_like(maze)
+
     if visualize:
         pygame.init()
         
@@ -104,6 +193,7 @@ def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
         
         screen = pygame.display.set_mode((screen_width, screen_height))
         pygame.display.set_caption(f"Left-Hand Rule Solver - {height}x{width} | {cell_size}px cells")
+        print(f"View: {CONTROLS}")
 
         WHITE = (255, 255, 255)
         BLACK = (0, 0, 0)
@@ -113,72 +203,51 @@ def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
         clock = pygame.time.Clock()
         font = pygame.font.Font(None, 24)
 
+        # Walls are drawn once; frames repaint only the cells walked since the last one
+        renderer = DirtyCellRenderer(screen, maze, cell_size, {CELL_PATH: BLUE},
+                                     palette=np.array([WHITE, BLACK, BLUE, GREEN, RED], dtype=np.uint8),
+                                     start=start, end=end, area=(screen_width, screen_height - 60),
+                                     highlight=(CELL_PATH,))
+        screen.fill(WHITE)
+        info_rect = pygame.Rect(0, screen_height - 60, screen_width, 60)
+
     start_time = time.time()
     steps = 0
-    path = []
-    backtracks = 0
-    turns_made = {'left': 0, 'forward': 0, 'right': 0, 'back': 0}
-    
-    prev_direction = direction
 
-    while (y, x) != end:
-        steps += 1
-        if steps > max_steps:
-            raise RuntimeError("Left-hand rule exceeded step limit. Likely looping maze.")
+    def on_step(cells, state):
+        nonlocal steps
+        steps += len(cells)
+        if visualize:
+            pipeline.publish(cells, CELL_PATH)
 
-        # Left, forward, right, back
-        for turn in [-1, 0, 1, 2]:
-            ndir = (direction + turn) % 4
-            dy, dx = DIRS[ndir]
-            ny, nx = y + dy, x + dx
-            if is_open(ny, nx):
-                direction = ndir
-                y, x = ny, nx
-                break
+    def draw_info():
+        screen.fill(WHITE, info_rect)
+        elapsed = time.time() - start_time
+        info_text = f"Steps: {steps} | Path length: {steps} | Time: {elapsed:.2f}s"
+        text_surface = font.render(info_text, True, BLACK)
+        screen.blit(text_surface, (10, screen_height - 50))
+        return [info_rect]
 
-        solution[y, x] = 1
-        path.append((y, x))
+    def solve():
+        with metrics.phase('solve', algorithm='left_hand'):
+            return left_hand_walk(maze, start, end, max_steps=max_steps, observer=on_step)
 
-        if visualize and steps % 2 == 0:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            screen.fill(WHITE)
-            for iy in range(height):
-                for ix in range(width):
-                    px = ix * cell_size
-                    py = iy * cell_size
-                    
-                    if px >= screen_width - cell_size or py >= screen_height - 60:
-                        continue
-                    
-                    color = WHITE
-                    if maze[iy, ix] == 1:
-                        color = BLACK
-                    if solution[iy, ix] == 1:
-                        color = BLUE
-                    if (iy, ix) == start:
-                        color = GREEN
-                    if (iy, ix) == end:
-                        color = RED
-                    pygame.draw.rect(
-                        screen,
-                        color,
-                        (px, py, cell_size, cell_size),
-                    )
-            
-            elapsed = time.time() - start_time
-            info_text = f"Steps: {steps} | Path length: {len(path)} | Time: {elapsed:.2f}s"
-            text_surface = font.render(info_text, True, BLACK)
-            screen.blit(text_surface, (10, screen_height - 50))
-
-            pygame.display.flip()
-            clock.tick(120)
-
-    end_time = time.time()
-    solve_time = end_time - start_time
+    if visualize:
+        # The walk runs in a worker thread; the view follows it at a fixed frame rate
+        pipeline = FramePipeline(renderer)
+        path, steps, status = pipeline.run(solve, draw=draw_info)
+        solve_time = pipeline.solve_time
+    else:
+        path, steps, status = solve()
+        solve_time = time.time() - start_time
+    if status == 'step_limit':
+        raise RuntimeError("Left-hand rule exceeded step limit. Likely looping maze.")
+
+    # The walk omits the start and keeps its dead-end detours; the saved
+    # solution is the loop-erased route
+    path = erase_loops([start] + path)
+    ys, xs = zip(*path)
+    solution[list(ys), list(xs)] = 1
     
     print(f"\nLeft-Hand Rule Complete!")
     print(f"Total steps: {steps}")
@@ -186,34 +255,13 @@ def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
     print(f"Solve time: {solve_time:.2f} seconds")
     
     if visualize:
-        screen.fill(WHITE)
-        for iy in range(height):
-            for ix in range(width):
-                px = ix * cell_size
-                py = iy * cell_size
-                
-                if px >= screen_width - cell_size or py >= screen_height - 60:
-                    continue
-                
-                color = WHITE
-                if maze[iy, ix] == 1:
-                    color = BLACK
-                if solution[iy, ix] == 1:
-                    color = BLUE
-                if (iy, ix) == start:
-                    color = GREEN
-                if (iy, ix) == end:
-                    color = RED
-                pygame.draw.rect(
-                    screen,
-                    color,
-                    (px, py, cell_size, cell_size),
-                )
+        rects = renderer.flush()
+        screen.fill(WHITE, info_rect)
         
         final_text = f"SOLVED! Time: {solve_time:.2f}s | Path: {len(path)} cells"
         text_surface = font.render(final_text, True, (0, 128, 0))
         screen.blit(text_surface, (10, screen_height - 50))
-        pygame.display.flip()
+        pygame.display.update(rects + [info_rect])
         
         print("Solved. Close window to exit.")
         waiting = True
@@ -221,19 +269,26 @@ def left_hand_algo(maze, start, end, visualize = True, max_steps = 10000000):
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     waiting = False
+                elif renderer.handle_event(event):
+                    pygame.display.update(renderer.flush())
             clock.tick(30)
         pygame.quit()
 
     return solution, steps, solve_time
 
 
+@metrics.timed('save')
 def save_solution(filename, solution, steps, solve_time, directory="mazes"):
+    from solution_verifier import verify_solution
+
     filepath = os.path.join(directory, filename)
-    
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    maze, start, end, data = load_maze(filename, directory)
+    problems = verify_solution(maze, solution, start, end)
     
     data['solved'] = True
+    data['solution_valid'] = not problems
+    if problems:
+        data['solution_problems'] = problems
     data['solution'] = solution.tolist()
     data['algorithm'] = 'left_hand_rule'
     data['steps'] = int(steps)
@@ -245,6 +300,8 @@ def save_solution(filename, solution, steps, solve_time, directory="mazes"):
         json.dump(data, f, indent=2)
     
     print(f"\nSolution saved to: {filepath}")
+    if problems:
+        print(f"Warning: saved solution is not a single start-to-end path: {'; '.join(problems)}")
 
 
 def solve_and_save(filename, visualize=True):
@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pygame
+
+from maze_render import BLACK, BLUE, GREEN, RED, WHITE, END, SOLUTION, START, WALL
+from planner import choose_storage
+
+
+# Samples taken across each cell, per axis, for the majority vote; votes
+# are counted in 4-bit fields, so at most 15 samples per cell
+SAMPLES_PER_AXIS = 3
+
+# Pixel rows and columns scanned for color edges when detecting the cell size
+PROBE_LINES = 256
+
+# Fraction of the color edges that must fall on the cell grid for a cell size to fit
+GRID_FIT = 0.98
+
+# Share of neighbouring edges one pixel apart above which the image has 1 px cells
+ONE_PIXEL_GAPS = 0.25
+
+# Samples classified per band of cell rows; bounds the temporary arrays
+BAND_SAMPLES = 1 << 22
+
+
+def read_pixels(path):
+    """
+    Load an image for sampling without converting it to RGB.
+
+    Returns:
+        tuple: (pixels, palette) - palette images give their (height, width)
+        indices and the (n, 3) palette, others a (height, width, 3) RGB
+        array and None
+    """
+    surface = pygame.image.load(path)
+    if surface.get_bitsize() == 8:
+        palette = np.array([color[:3] for color in surface.get_palette()], dtype=np.uint8)
+        return pygame.surfarray.pixels2d(surface).T, palette
+    if surface.get_bytesize() in (3, 4):
+        return pygame.surfarray.pixels3d(surface).transpose(1, 0, 2), None
+    return pygame.surfarray.array3d(surface).transpose(1, 0, 2), None
+
+
+def color_table(colors):
+    """
+    Nearest-color lookup table over RGB quantized to 5 bits per channel.
+
+    Args:
+        colors (list): RGB colors, indexed by class
+
+    Returns:
+        numpy.ndarray: 32768 uint8 class indices, see rgb_classes
+    """
+    levels = (np.arange(32, dtype=np.int32) << 3) + 4
+    grid = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(-1, 1, 3)
+    distance = ((grid - np.asarray(colors, dtype=np.int32)[None]) ** 2).sum(axis=2)
+    return distance.argmin(axis=1).astype(np.uint8)
+
+
+def rgb_classes(rgb, table):
+    """Class of each RGB color in an (..., 3) uint8 array through a color_table."""
+    rgb = rgb >> 3
+    keys = (rgb[..., 0].astype(np.uint16) << 10) | (rgb[..., 1].astype(np.uint16) << 5) | rgb[..., 2]
+    return table[keys]
+
+
+def _sample(pixels, palette, table, values, ys, xs):
+    # values[class] for the pixels on rows ys and columns xs, gathered one
+    # axis at a time, the one leaving the smaller intermediate copy first
+    height, width = pixels.shape[:2]
+    if len(ys) * width <= len(xs) * height:
+        picked = pixels[ys][:, xs]
+    else:
+        picked = pixels[:, xs][ys]
+    if palette is not None:
+        return values[rgb_classes(palette, table)][picked]
+    return values[rgb_classes(picked, table)]
+
+
+def _divisors(n):
+    small = [d for d in range(1, int(n ** 0.5) + 1) if n % d == 0]
+    return sorted(set(small + [n // d for d in small]), reverse=True)
+
+
+def _line_edges(lines):
+    # (line, position) of the color changes along each row of a class
+    # array, leaving out changes next to start/end colors (the S/E labels)
+    label = lines >= START
+    line, offset = np.nonzero((lines[:, 1:] != lines[:, :-1]) & ~label[:, 1:] & ~label[:, :-1])
+    return line, offset + 1
+
+
+def detect_grid(pixels, palette, table):
+    """
+    Find the cell size and the height of the maze part of an exported image.
+
+    Exports draw the outer wall in the first pixel column and may add a
+    caption strip below the maze, so the maze ends where that column
+    stops being wall. Every color edge inside the maze lies on the cell
+    grid; the cell size is the largest divisor of the maze's pixel size
+    that puts (nearly) all edges on probed rows and columns on its grid.
+    Edges touching start or end colors are left out, as the S/E labels
+    drawn there are not on the grid. Every edge fits a 1 px grid, so 1 px
+    cells are only taken when neighbouring edges are mostly one pixel
+    apart, as corridors and walls are at that scale.
+
+    Returns:
+        tuple: (cell_size, maze_height) in pixels
+
+    Raises:
+        ValueError: When no cell size fits, with the best one found
+    """
+    height, width = pixels.shape[:2]
+    classes = np.arange(END + 1, dtype=np.uint8)
+    edge = _sample(pixels, palette, table, classes, np.arange(height), [0])[:, 0]
+    if edge[0] != WALL:
+        raise ValueError("image does not start with a wall at its top-left corner; not a maze export")
+    open_rows = np.flatnonzero(edge != WALL)
+    maze_height = int(open_rows[0]) if len(open_rows) else height
+
+    rows = np.unique(np.linspace(0, maze_height - 1, min(PROBE_LINES, maze_height)).astype(np.intp))
+    cols = np.unique(np.linspace(0, width - 1, min(PROBE_LINES, width)).astype(np.intp))
+    across_line, across = _line_edges(_sample(pixels, palette, table, classes, rows, np.arange(width)))
+    down_line, down = _line_edges(_sample(pixels, palette, table, classes, np.arange(maze_height), cols).T)
+    line = np.concatenate([across_line, down_line + len(rows)])
+    edges = np.concatenate([across, down])
+    if len(edges) == 0:
+        raise ValueError("image has no color edges; not a maze export")
+
+    best_size, best_fit = None, 0.0
+    for cell_size in _divisors(np.gcd(width, maze_height))[:-1]:
+        fit = np.count_nonzero(edges % cell_size == 0) / len(edges)
+        if fit >= GRID_FIT:
+            return cell_size, maze_height
+        if fit > best_fit:
+            best_size, best_fit = cell_size, fit
+
+    gaps = np.diff(edges)[line[1:] == line[:-1]]
+    if len(gaps) and np.count_nonzero(gaps == 1) >= ONE_PIXEL_GAPS * len(gaps):
+        return 1, maze_height
+    best = (f"best: {best_size} px with {best_fit:.1%}" if best_size else
+            f"{width}x{maze_height} px have no common divisor above 1")
+    raise ValueError(f"no cell size puts {GRID_FIT:.0%} of the color edges on its grid ({best}); "
+                     "not a maze export or not at a whole-pixel scale")
+
+
+def import_maze_image(path, solution=True, solution_color=BLUE):
+    """
+    Recover a maze (and its drawn solution) from a PNG exported by this project.
+
+    Reads images from export_maze_to_image, export_as_image,
+    export_solution_image and png_stream: the cell size is detected with
+    detect_grid, then a few pixels inside every cell are sampled with
+    array indexing, classified by nearest color (white, black, solution
+    color, green start, red end) and the cell takes the majority class,
+    so S/E labels and anti-aliasing do not leak into the grid. Nothing is
+    decoded beyond the image load itself.
+
+    Args:
+        path (str): PNG file
+        solution (bool): Extract cells in the solution color
+        solution_color (tuple): RGB the solution is drawn in (BLUE for exports;
+            the pen color for a scanned hand solution)
+
+    Returns:
+        tuple: (maze, start, end, solution, cell_size) where solution is a
+        uint8 grid including start and end, or None when not requested or
+        no solution cell was found
+    """
+    pixels, palette = read_pixels(path)
+    table = color_table([WHITE, BLACK, solution_color, GREEN, RED])
+    cell_size, maze_height = detect_grid(pixels, palette, table)
+
+    height, width = maze_height // cell_size, pixels.shape[1] // cell_size
+    samples = min(SAMPLES_PER_AXIS, cell_size)
+    # Offsets spread over the middle half of the cell
+    offsets = (cell_size * (0.25 + 0.5 * (np.arange(samples) + 0.5) / samples)).astype(np.intp)
+    xs = (np.arange(width)[:, None] * cell_size + offsets).ravel()
+    # Each sample votes with a one in its class's 4-bit field, so summing
+    # the samples of a cell counts the votes for every class at once
+    shifts = 4 * np.arange(END + 1, dtype=np.uint32)
+    votes = np.uint32(1) << shifts
+
+    codes = np.empty((height, width), dtype=np.uint8)
+    band = max(1, BAND_SAMPLES // (width * samples * samples))
+    for y0 in range(0, height, band):
+        y1 = min(height, y0 + band)
+        ys = (np.arange(y0, y1)[:, None] * cell_size + offsets).ravel()
+        sampled = _sample(pixels, palette, table, votes, ys, xs)
+        across = sampled[:, 0::samples].copy()
+        for i in range(1, samples):
+            across += sampled[:, i::samples]
+        counts = across[0::samples].copy()
+        for i in range(1, samples):
+            counts += across[i::samples]
+        codes[y0:y1] = ((counts[..., None] >> shifts) & 15).argmax(axis=-1)
+    del pixels
+
+    maze = (codes == WALL).astype(np.uint8)
+    start, end = (1, 1), (height - 2, width - 2)
+    for code in (START, END):
+        found = np.flatnonzero(codes == code)
+        if len(found):
+            cell = tuple(int(i) for i in np.unravel_index(found[0], codes.shape))
+            if code == START:
+                start = cell
+            else:
+                end = cell
+    maze[start] = maze[end] = 0
+
+    grid = None
+    if solution and np.any(codes == SOLUTION):
+        grid = (codes == SOLUTION).astype(np.uint8)
+        grid[start] = grid[end] = 1
+    return maze, start, end, grid, cell_size
+
+
+def save_imported_maze(maze, start, end, solution, source, directory="mazes", filename=None):
+    """
+    Save an imported maze in the generator's JSON format, with the solution if any.
+
+    Returns:
+        str: Path of the JSON file
+    """
+    from solution_verifier import verify_solution
+
+    os.makedirs(directory, exist_ok=True)
+    height, width = maze.shape
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if filename is None:
+        name = os.path.splitext(os.path.basename(source))[0]
+        filename = f"maze_{width}x{height}_imported_{name}.json"
+    filepath = os.path.join(directory, filename)
+
+    data = {
+        'width': int(width),
+        'height': int(height),
+        'total_cells': int(maze.size),
+        'start': [int(start[0]), int(start[1])],
+        'end': [int(end[0]), int(end[1])],
+        'timestamp': timestamp,
+        'source_image': os.path.basename(source),
+        'solved': False
+    }
+
+    # JSON lists while they fit the memory budget, else a .npy next to the JSON, like save_maze
+    if choose_storage(maze.size) == 'json':
+        data['maze'] = maze.tolist()
+    else:
+        np.save(filepath.replace('.json', '.npy'), maze)
+        data['maze_file'] = filename.replace('.json', '.npy')
+        data['note'] = 'Full maze data saved in separate .npy file'
+
+    if solution is not None:
+        problems = verify_solution(maze, solution, start, end)
+        data['solved'] = True
+        data['solution_valid'] = not problems
+        if problems:
+            data['solution_problems'] = problems
+        data['solution'] = solution.tolist()
+        data['algorithm'] = 'image_import'
+        data['solution_path_length'] = int(np.sum(solution))
+        data['solved_timestamp'] = timestamp
+
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=2)
+    return filepath
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn exported maze PNGs back into maze files")
+    parser.add_argument('images', nargs='+', help="PNG files to import")
+    parser.add_argument('--no-solution', action='store_true', help="Ignore solution-colored cells")
+    parser.add_argument('--solution-color', default=','.join(map(str, BLUE)),
+                        help="RGB of the drawn solution (default: %(default)s)")
+    parser.add_argument('--directory', default="mazes", help="Where to save the mazes (default: mazes)")
+    args = parser.parse_args()
+
+    solution_color = tuple(int(c) for c in args.solution_color.split(','))
+    total_start = time.time()
+    imported = 0
+
+    for path in args.images:
+        start_time = time.time()
+        try:
+            maze, start, end, solution, cell_size = import_maze_image(path, not args.no_solution,
+                                                                      solution_color)
+        except (ValueError, pygame.error) as e:
+            print(f"  {path}: {e}")
+            continue
+        elapsed = time.time() - start_time
+        filepath = save_imported_maze(maze, start, end, solution, path, args.directory)
+        imported += 1
+
+        height, width = maze.shape
+        found = f", solution of {int(solution.sum()):,} cells" if solution is not None else ""
+        print(f"  {path}: {width}x{height} maze, {cell_size}px cells{found} "
+              f"({elapsed:.2f} seconds) -> {filepath}")
+
+    total = time.time() - total_start
+    print(f"\nImported {imported}/{len(args.images)} images in {total:.1f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import os
+import time
+
+import numpy as np
+import pygame
+
+import metrics
+
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+BLUE = (100, 149, 237)
+
+# Cell codes, used as indices into a palette
+OPEN, WALL, SOLUTION, START, END = range(5)
+PALETTE = np.array([WHITE, BLACK, BLUE, GREEN, RED], dtype=np.uint8)
+
+# Pixels rendered per band; bounds the temporary arrays on huge images
+BAND_PIXELS = 1 << 24
+
+# SDL surfaces address their pixels with 32-bit signed offsets
+MAX_SURFACE_BYTES = (1 << 31) - 1
+MAX_SURFACE_SIDE = 32767
+
+
+def cell_codes(maze, solution=None, start=None, end=None, rows=slice(None)):
+    """
+    Palette codes for a band of maze rows.
+
+    Walls win over solution cells, start and end win over both.
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        solution (numpy.ndarray): Optional grid with non-zero cells on the path
+        start (tuple): Optional start cell (y, x)
+        end (tuple): Optional end cell (y, x)
+        rows (slice): Rows of the maze to encode
+
+    Returns:
+        numpy.ndarray: uint8 codes for the rows
+    """
+    codes = (np.asarray(maze[rows]) != 0).astype(np.uint8)
+    if solution is not None:
+        codes[(codes == OPEN) & (np.asarray(solution[rows]) != 0)] = SOLUTION
+
+    first, stop, _ = rows.indices(maze.shape[0])
+    for cell, code in ((start, START), (end, END)):
+        if cell is not None and first <= cell[0] < stop:
+            codes[cell[0] - first, cell[1]] = code
+    return codes
+
+
+def scale_cells(codes, cell_size, palette=PALETTE):
+    """
+    Map codes through the palette and scale every cell to cell_size pixels.
+
+    Codes are repeated before the palette lookup so the scaling copies one
+    byte per pixel instead of three.
+
+    Returns:
+        numpy.ndarray: uint8 RGB pixels of shape (rows * cell_size, cols * cell_size, 3)
+    """
+    if cell_size > 1:
+        codes = np.repeat(np.repeat(codes, cell_size, axis=0), cell_size, axis=1)
+    return palette[codes]
+
+
+def band_rows(width, cell_size):
+    """Maze rows per render band for a maze width and cell size."""
+    return max(1, BAND_PIXELS // max(1, width * cell_size * cell_size))
+
+
+def fits_surface(img_width, img_height):
+    """Whether an image of this size can be rendered on a single pygame surface."""
+    return (max(img_width, img_height) <= MAX_SURFACE_SIDE and
+            img_width * img_height * 4 <= MAX_SURFACE_BYTES)
+
+
+def draw_maze(surface, maze, cell_size, solution=None, start=None, end=None, palette=PALETTE,
+              origin=(0, 0)):
+    """
+    Draw a maze onto a surface band by band through a surfarray pixel view.
+
+    The palette is mapped to the surface's pixel format once, each band of
+    codes is looked up in it, and every cell is written as a cell_size block
+    through a broadcast assignment into pygame.surfarray.pixels2d - one array
+    write per band and no intermediate RGB image.
+
+    Args:
+        surface (pygame.Surface): 8, 16 or 32-bit target with room for the
+            scaled maze at origin
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        cell_size (int): Pixels per cell
+        solution (numpy.ndarray): Optional solution grid drawn in the solution color
+        start (tuple): Optional start cell (y, x)
+        end (tuple): Optional end cell (y, x)
+        palette (numpy.ndarray): RGB colors indexed by cell code
+        origin (tuple): Pixel (x, y) of the maze's top-left corner
+    """
+    height, width = maze.shape
+    ox, oy = origin
+    band = band_rows(width, cell_size)
+    mapped = np.array([surface.map_rgb(tuple(int(c) for c in color)) for color in palette])
+
+    # pixels2d is indexed (x, y); transpose to rows so bands are contiguous
+    view = pygame.surfarray.pixels2d(surface).T
+    try:
+        for y0 in range(0, height, band):
+            y1 = min(height, y0 + band)
+            rows = y1 - y0
+            colors = mapped[cell_codes(maze, solution, start, end, slice(y0, y1))]
+            target = view[oy + y0 * cell_size:oy + y1 * cell_size, ox:ox + width * cell_size]
+            # Splitting axes is always a view, so this writes into the surface
+            target.reshape(rows, cell_size, width, cell_size)[...] = colors[:, None, :, None]
+    finally:
+        del view
+
+
+def draw_markers(surface, start, end, cell_size):
+    """Label the start and end cells with S and E when cells are big enough to read."""
+    if cell_size < 8:
+        return
+    font = pygame.font.Font(None, min(24, cell_size * 2))
+    for (y, x), label in ((start, 'S'), (end, 'E')):
+        surface.blit(font.render(label, True, BLACK), (x * cell_size + 2, y * cell_size + 2))
+
+
+def render_maze_image(maze, cell_size, caption, solution=None, start=(1, 1), end=None, footer=40):
+    """
+    Render a maze (and optional solution) to a surface with a caption strip below.
+
+    Returns:
+        pygame.Surface
+    """
+    height, width = maze.shape
+    if end is None:
+        end = (height - 2, width - 2)
+
+    img_width, img_height = width * cell_size, height * cell_size + footer
+    if not fits_surface(img_width, img_height):
+        raise ValueError(f"{img_width}x{img_height} image is too large for a pygame surface; "
+                         "use a smaller cell size")
+
+    surface = pygame.Surface((img_width, img_height))
+    surface.fill(WHITE)
+    draw_maze(surface, maze, cell_size, solution, start, end)
+    draw_markers(surface, start, end, cell_size)
+
+    if footer:
+        font = pygame.font.Font(None, 24)
+        surface.blit(font.render(caption, True, BLACK), (10, height * cell_size + 10))
+    return surface
+
+
+@metrics.timed('render')
+def save_maze_image(maze, output_path, cell_size, caption, solution=None, start=(1, 1), end=None,
+                    stream=False):
+    """
+    Render a maze image and save it as PNG.
+
+    Images too large for a pygame surface, or any image when stream is
+    set (the surface would not fit the memory budget), are streamed with
+    png_stream instead, at full resolution but without the caption strip
+    and S/E labels.
+
+    Either way the PNG is written to output_path + '.tmp' and moved in
+    place once complete, so an export that fails or is killed leaves no
+    truncated image that would look up to date to batch_export.
+
+    Returns:
+        str: output_path
+    """
+    height, width = maze.shape
+    if stream or not fits_surface(width * cell_size, height * cell_size + 40):
+        from png_stream import write_maze_png
+
+        print(f"Image {'exceeds pygame surface limits' if not stream else 'streamed to bound memory'}; "
+              f"streaming {width * cell_size}x{height * cell_size} PNG")
+        if end is None:
+            end = (height - 2, width - 2)
+        return write_maze_png(maze, output_path, cell_size, solution, start, end)
+
+    pygame.init()
+    try:
+        surface = render_maze_image(maze, cell_size, caption, solution, start, end)
+        # Saved through a file object, the format comes from the name hint
+        try:
+            with open(output_path + '.tmp', 'wb') as f:
+                pygame.image.save(surface, f, os.path.basename(output_path))
+            os.replace(output_path + '.tmp', output_path)
+        except BaseException:
+            if os.path.exists(output_path + '.tmp'):
+                os.remove(output_path + '.tmp')
+            raise
+    finally:
+        pygame.quit()
+    return output_path
+
+
+def _draw_rect_loop(maze, cell_size, solution):
+    # The per-cell rendering this module replaces, kept for timing comparisons
+    height, width = maze.shape
+    surface = pygame.Surface((width * cell_size, height * cell_size))
+    surface.fill(WHITE)
+    for y in range(height):
+        for x in range(width):
+            if maze[y, x] == 1:
+                color = BLACK
+            elif solution[y, x] == 1:
+                color = BLUE
+            else:
+                continue
+            pygame.draw.rect(surface, color, pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size))
+    return surface
+
+
+def benchmark(sizes=(201, 501, 1001, 2001), per_cell_limit=1001, directory=None):
+    """
+    Time solution-image rendering and PNG export for each preset size.
+
+    Cell sizes follow export_solution_image. The per-cell draw.rect loop is
+    only timed up to per_cell_limit; above that it takes minutes.
+
+    Returns:
+        list: (size, cell_size, per_cell_seconds or None, render_seconds, save_seconds) rows
+    """
+    import random
+    import tempfile
+
+    from distance_field import solve_maze_wavefront
+    from large_maze_generator import LargeMazeGenerator
+
+    directory = directory or tempfile.mkdtemp()
+    rows = []
+    pygame.init()
+
+    for size in sizes:
+        random.seed(size)
+        maze = LargeMazeGenerator(size, size).generate_iterative(visualize=False)
+        start, end = (1, 1), (size - 2, size - 2)
+        solution, _, _ = solve_maze_wavefront(maze, start, end)
+
+        total_cells = size * size
+        if total_cells > 10000000:
+            cell_size = 5
+        elif total_cells > 4000000:
+            cell_size = 8
+        elif total_cells > 1000000:
+            cell_size = 12
+        elif total_cells > 100000:
+            cell_size = 15
+        else:
+            cell_size = 20
+        cell_size = max(1, min(cell_size, 32767 // size))
+
+        per_cell = None
+        if size <= per_cell_limit:
+            t = time.perf_counter()
+            _draw_rect_loop(maze, cell_size, solution)
+            per_cell = time.perf_counter() - t
+
+        t = time.perf_counter()
+        surface = render_maze_image(maze, cell_size, f"Solved: {size}x{size}", solution, start, end)
+        render = time.perf_counter() - t
+
+        output_path = os.path.join(directory, f"render_{size}.png")
+        t = time.perf_counter()
+        pygame.image.save(surface, output_path)
+        save = time.perf_counter() - t
+        del surface
+        os.remove(output_path)
+
+        rows.append((size, cell_size, per_cell, render, save))
+        per_cell_text = f"{per_cell:.2f}s" if per_cell is not None else "-"
+        print(f"{size}x{size} @ {cell_size}px: draw.rect {per_cell_text}, "
+              f"surfarray {render:.2f}s, PNG save {save:.2f}s")
+
+    pygame.quit()
+    return rows
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,366 @@
+import argparse
+import cProfile
+import functools
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# Seconds between stack samples of the sampling profiler
+SAMPLE_INTERVAL = 0.005
+
+
+class _NullPhase:
+    """Stand-in returned while metrics are disabled: entering, updating and leaving do nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, **fields):
+        pass
+
+    def end(self, **fields):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class StackSampler:
+    """
+    Sampling profiler for one thread.
+
+    A background thread looks at the target thread's current frame every
+    interval and counts its stack, so the profiled code runs at full speed
+    (unlike cProfile, which hooks every call). Stacks are written in the
+    collapsed format flame graph tools read: 'outer;inner;leaf count'.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def top(self, count=10):
+        """Most sampled innermost frames as (frame, share of samples)."""
+        leaves = Counter()
+        for stack, hits in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += hits
+        return [(leaf, hits / self.samples) for leaf, hits in leaves.most_common(count)]
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for stack, hits in self.stacks.most_common():
+                f.write(f"{stack} {hits}\n")
+
+
+class _Phase:
+    # One timed phase while metrics are enabled; see Metrics.phase
+
+    def __init__(self, metrics, name, fields):
+        self.metrics = metrics
+        self.name = name
+        self.fields = fields
+        self.profiler = None
+
+    def update(self, **fields):
+        """Add fields (counters, outcome) to the record written when the phase ends."""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.metrics._active().append(self.name)
+        self.profiler = self.metrics._start_profile(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def end(self, **fields):
+        """Finish a phase started with Metrics.begin, adding fields to its record."""
+        self.fields.update(fields)
+        self.__exit__(None, None, None)
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.metrics._stop_profile(self.name, self.profiler)
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.metrics._finish(self.name, seconds, self.fields)
+        return False
+
+
+class Metrics:
+    """
+    Named phase timers, counters and events, written as JSON lines.
+
+    Disabled (the default), phase() hands back a shared object whose
+    methods do nothing and count()/event() return at once, so the
+    instrumented code pays one attribute check per call. Instrumentation
+    sits at phase boundaries (load, generate, solve, render, save), never
+    per step inside the hot loops; loops report their totals at the end.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = Counter()
+        self.profile = None
+        self.profile_phases = None
+        self.profile_dir = "profiles"
+        self.sample_interval = SAMPLE_INTERVAL
+        self._sink = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiled = Counter()
+        self._profiling = False
+
+    def enable(self, output=None, profile=None, phases=None, profile_dir="profiles",
+               sample_interval=SAMPLE_INTERVAL):
+        """
+        Start collecting.
+
+        Args:
+            output (str): JSON lines file records are appended to (None: keep
+                them in memory only, see summary())
+            profile (str): Run phases under 'cprofile' (saved as .prof, for
+                pstats/snakeviz) or 'sample' (collapsed stacks, .folded)
+            phases (list): Phase names to profile (default: all)
+            profile_dir (str): Where profiles are saved
+            sample_interval (float): Seconds between samples for 'sample'
+        """
+        if profile not in (None, 'cprofile', 'sample'):
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.disable()
+        self.profile = profile
+        self.profile_phases = set(phases) if phases else None
+        self.profile_dir = profile_dir
+        self.sample_interval = sample_interval
+        if output:
+            self._sink = open(output, 'a', buffering=1)
+        self.enabled = True
+
+    def disable(self):
+        """Stop collecting and close the output file."""
+        self.enabled = False
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def phase(self, name, **fields):
+        """
+        Context manager timing a phase; fields go into its record.
+
+        A phase nested in a phase of the same name on the same thread
+        (save_maze_image handing over to write_maze_png) is not counted
+        twice.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        active = self._active()
+        if name in active:
+            return _NULL_PHASE
+        return _Phase(self, name, fields)
+
+    def begin(self, name, **fields):
+        """
+        Start timing a phase that ends with .end(**fields) on the returned
+        object - for phases that do not fit a with block (several exits,
+        an interactive tail that should not be timed).
+        """
+        return self.phase(name, **fields).__enter__()
+
+    def count(self, name, value=1):
+        """Add to a named counter."""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def event(self, name, **fields):
+        """Write a one-off record (progress, a decision taken)."""
+        if self.enabled:
+            self._write({'type': 'event', 'name': name, **fields})
+
+    def summary(self):
+        """Totals so far: per phase count/total/max seconds, and the counters."""
+        with self._lock:
+            return {'timers': {name: dict(timer) for name, timer in self.timers.items()},
+                    'counters': dict(self.counters)}
+
+    def write_summary(self):
+        if self.enabled:
+            self._write({'type': 'summary', **self.summary()})
+
+    def _active(self):
+        active = getattr(self._local, 'active', None)
+        if active is None:
+            active = self._local.active = []
+        return active
+
+    def _finish(self, name, seconds, fields):
+        self._active().remove(name)
+        with self._lock:
+            timer = self.timers.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            timer['count'] += 1
+            timer['total'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+        self._write({'type': 'phase', 'name': name, 'seconds': seconds, **fields})
+
+    def _write(self, record):
+        if self._sink is None:
+            return
+        record = {'time': time.time(), 'pid': os.getpid(), 'thread': threading.current_thread().name,
+                  **record}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if self._sink is not None:
+                self._sink.write(line + '\n')
+
+    def _start_profile(self, name):
+        if self.profile is None or (self.profile_phases is not None and name not in self.profile_phases):
+            return None
+        with self._lock:
+            # One profiler at a time; Python allows a single active profile hook
+            if self._profiling:
+                return None
+            self._profiling = True
+        if self.profile == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident(), self.sample_interval)
+            profiler.start()
+        return profiler
+
+    def _stop_profile(self, name, profiler):
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        else:
+            profiler.stop()
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        with self._lock:
+            self._profiled[name] += 1
+            number = self._profiled[name]
+            self._profiling = False
+        stem = os.path.join(self.profile_dir, f"{name}_{os.getpid()}_{number}")
+        if isinstance(profiler, cProfile.Profile):
+            path = stem + ".prof"
+            profiler.dump_stats(path)
+            self._write({'type': 'profile', 'name': name, 'profiler': 'cprofile', 'path': path})
+        else:
+            path = stem + ".folded"
+            profiler.save(path)
+            self._write({'type': 'profile', 'name': name, 'profiler': 'sample', 'path': path,
+                         'samples': profiler.samples,
+                         'top': [[leaf, round(share, 4)] for leaf, share in profiler.top()]})
+
+
+# Process-wide metrics every module reports to
+METRICS = Metrics()
+
+
+def phase(name, **fields):
+    """Time a phase on the process-wide METRICS, see Metrics.phase."""
+    return METRICS.phase(name, **fields)
+
+
+def begin(name, **fields):
+    """Start timing a phase on the process-wide METRICS, see Metrics.begin."""
+    return METRICS.begin(name, **fields)
+
+
+def count(name, value=1):
+    METRICS.count(name, value)
+
+
+def event(name, **fields):
+    METRICS.event(name, **fields)
+
+
+def timed(name):
+    """Decorator timing every call of a function as a phase."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            with METRICS.phase(name, function=func.__qualname__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def progress(name, done, total, verbose=False):
+    """
+    Report progress of a long loop: a '<name>.progress' event when metrics
+    are enabled, otherwise a console line when verbose is set.
+    """
+    if METRICS.enabled:
+        METRICS.event(f"{name}.progress", done=done, total=total)
+    elif verbose:
+        print(f"Progress: {done / total * 100:.1f}% - {done:,}/{total:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a script with phase metrics (and optionally a profiler) enabled",
+        usage="python metrics.py [options] script.py [script args...]")
+    parser.add_argument('--output', default="metrics.jsonl", help="JSON lines file (default: metrics.jsonl)")
+    parser.add_argument('--profile', choices=['cprofile', 'sample'], help="Profile phases with this profiler")
+    parser.add_argument('--phases', help="Comma-separated phases to profile (default: all)")
+    parser.add_argument('--profile-dir', default="profiles", help="Where profiles go (default: profiles)")
+    parser.add_argument('--interval', type=float, default=SAMPLE_INTERVAL,
+                        help=f"Sampling interval in seconds (default: {SAMPLE_INTERVAL})")
+    parser.add_argument('script', help="Python script to run, e.g. dead_end_solver.py")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Arguments for the script")
+    args = parser.parse_args()
+
+    METRICS.enable(args.output, args.profile, args.phases.split(',') if args.phases else None,
+                   args.profile_dir, args.interval)
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    try:
+        runpy.run_path(args.script, run_name="__main__")
+    finally:
+        METRICS.write_summary()
+        summary = METRICS.summary()
+        METRICS.disable()
+        print(f"\nMetrics written to {args.output}")
+        for name, timer in summary['timers'].items():
+            print(f"  {name:<10}{timer['count']:>5} x  total {timer['total']:.3f}s  max {timer['max']:.3f}s")
+
+
+if __name__ == "__main__":
+    # The instrumented modules import metrics; run through that module so
+    # they report to the METRICS enabled here, not to a __main__ copy
+    import metrics
+
+    metrics.main()
@@ -0,0 +1,157 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from dead_end_solver import load_maze
+from solver_registry import available_solvers, peak_rss, run_solver
+
+
+# Set in each worker by _attach_maze; the SharedMemory handle must stay
+# referenced for as long as the array view is used
+_shared = {}
+
+
+def _attach_maze(shm_name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    maze = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    maze.flags.writeable = False
+    _shared['shm'] = shm
+    _shared['maze'] = maze
+
+
+def _run_in_worker(name, start, end, track_memory, limits, options):
+    result = run_solver(name, _shared['maze'], start, end, track_memory=track_memory,
+                        **limits, **options.get(name, {}))
+    summary = result.to_dict()
+    # Each worker handles a single task, so its peak RSS belongs to this solve
+    summary['peak_rss'] = peak_rss()
+    return summary
+
+
+def run_parallel(maze, start, end, names=None, workers=None, track_memory=False, time_limit=None,
+                 memory_limit=None, verify=True, options=None):
+    """
+    Run solvers in parallel worker processes sharing one read-only copy of the maze.
+
+    Args:
+        maze (numpy.ndarray): The maze to solve
+        start (tuple): Starting position (y, x)
+        end (tuple): Ending position (y, x)
+        names (list): Registered solver names (all by default)
+        workers (int): Worker processes (all cores by default)
+        track_memory (bool): Also record tracemalloc peaks (slows solvers down)
+        time_limit (float): Per-solver deadline in seconds; late solvers return partial results
+        memory_limit (int): Per-solver memory growth budget in bytes
+        verify (bool): Verify each solution in its worker; bad ones get status 'invalid'
+        options (dict): Per-solver keyword options, keyed by solver name
+
+    Returns:
+        list: Result dicts (SolveResult.to_dict() plus 'peak_rss'), in the order of names
+    """
+    names = names or available_solvers()
+    workers = workers or os.cpu_count() or 1
+    maze = np.ascontiguousarray(maze)
+    limits = {'time_limit': time_limit, 'memory_limit': memory_limit, 'verify': verify}
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, maze.nbytes))
+    try:
+        np.ndarray(maze.shape, dtype=maze.dtype, buffer=shm.buf)[...] = maze
+
+        # One task per worker process keeps peak RSS attributable to a single solver
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(names)), mp_context=context,
+                                 initializer=_attach_maze,
+                                 initargs=(shm.name, maze.shape, maze.dtype.str),
+                                 max_tasks_per_child=1) as pool:
+            futures = {pool.submit(_run_in_worker, name, tuple(start), tuple(end),
+                                   track_memory, limits, options or {}): name for name in names}
+            results = {}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = {'algorithm': name, 'status': 'error', 'error': str(e)}
+                print(f"  finished: {name} ({results[name]['status']})")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return [results[name] for name in names]
+
+
+def print_comparison(results):
+    print(f"\n{'Solver':<24}{'Status':<12}{'Time (s)':>10}{'Steps':>12}{'Path':>12}{'Peak MB':>10}")
+    print("-" * 80)
+    for r in results:
+        solve_time = r.get('solve_time')
+        steps = r.get('steps')
+        path = r.get('path_length')
+        peak = r.get('peak_memory') or r.get('peak_rss')
+        print(f"{r['algorithm']:<24}{r['status']:<12}"
+              f"{solve_time if solve_time is not None else float('nan'):>10.3f}"
+              f"{steps if steps is not None else '-':>12}"
+              f"{path if path is not None else '-':>12}"
+              f"{peak / (1024 * 1024) if peak else float('nan'):>10.1f}")
+    for r in results:
+        if r.get('error'):
+            print(f"  {r['algorithm']}: {r['error']}")
+
+
+def main():
+    import glob
+
+    parser = argparse.ArgumentParser(description="Run maze solvers in parallel and compare them")
+    parser.add_argument('maze', nargs='?', help="Maze JSON file (default: latest in mazes/)")
+    parser.add_argument('--solvers', help=f"Comma-separated subset of: {', '.join(available_solvers())}")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: all cores)")
+    parser.add_argument('--track-memory', action='store_true',
+                        help="Record tracemalloc peaks instead of process RSS")
+    parser.add_argument('--time-limit', type=float, help="Per-solver deadline in seconds")
+    parser.add_argument('--memory-limit', type=float, help="Per-solver memory budget in MB")
+    parser.add_argument('--no-verify', action='store_true',
+                        help="Accept solutions without checking they form a single path")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    if args.maze:
+        directory, filename = os.path.split(args.maze)
+        directory = directory or "mazes"
+    else:
+        maze_files = glob.glob("mazes/maze_*.json")
+        if not maze_files:
+            print("No maze files found in 'mazes/' directory")
+            print("Run 'python maze.py' to create a maze first")
+            sys.exit(1)
+        directory, filename = "mazes", os.path.basename(max(maze_files, key=os.path.getctime))
+
+    maze, start, end, _ = load_maze(filename, directory)
+    names = args.solvers.split(',') if args.solvers else None
+
+    print(f"Maze: {filename} {maze.shape[0]}x{maze.shape[1]}")
+    print(f"Solvers: {', '.join(names or available_solvers())}\n")
+
+    start_time = time.time()
+    results = run_parallel(maze, start, end, names=names, workers=args.workers,
+                           track_memory=args.track_memory, time_limit=args.time_limit,
+                           verify=not args.no_verify,
+                           memory_limit=None if args.memory_limit is None
+                           else int(args.memory_limit * 1024 * 1024))
+    print_comparison(results)
+    print(f"\nWall time: {time.time() - start_time:.2f} seconds")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'maze': filename, 'shape': list(maze.shape), 'results': results}, f, indent=2)
+        print(f"Results written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
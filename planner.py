@@ -0,0 +1,334 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+
+# Peak memory growth per maze cell beyond the maze array itself, measured as
+# peak RSS in fresh processes on 1001x1001 and 2001x2001 mazes and rounded up
+GENERATOR_BYTES_PER_CELL = {'numba': 8, 'python': 42}
+SOLVER_BYTES_PER_CELL = {
+    'recursive_backtracking': 30,
+    'dead_end_filling': 20,
+    'left_hand': 110,
+    'wavefront_bfs': 30,
+    'junction_graph': 42,
+    'tree_index': 84,
+    'hierarchical': 42,
+}
+# Solvers registered later without a measurement
+DEFAULT_SOLVER_BYTES_PER_CELL = 120
+
+# Maze file formats: bytes per cell to save, to load, kept resident after
+# loading (the parsed lists stay in the returned data) and on disk
+STORAGE_BYTES_PER_CELL = {
+    'json': {'save': 8, 'load': 18, 'resident': 8, 'disk': 9},
+    'npy': {'save': 0, 'load': 1, 'resident': 0, 'disk': 1},
+}
+
+# Mazes past this size are never written as JSON lists, whatever the budget
+MAX_JSON_CELLS = 100000000
+
+# pygame surface exports: the RGB surface, the scaled codes and the encoder's buffers
+SURFACE_BYTES_PER_PIXEL = 7
+
+# Streamed exports (png_stream, svg_export) work band by band; their cost is bounded
+STREAM_EXPORT_BYTES = 64 * 1024 * 1024
+
+# Interpreter with NumPy, pygame and numba loaded
+BASE_BYTES = 160 * 1024 * 1024
+
+# Share of the budget a plan may use; the rest covers the OS and estimation error
+HEADROOM = 0.85
+
+# Maze files larger than this share of available memory are memory-mapped on load
+MMAP_SHARE = 0.25
+
+
+class PlanError(Exception):
+    """Raised when no choice of generator, storage and export fits the memory budget."""
+
+
+def format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def parse_bytes(text):
+    """Parse a size like '8G', '512M' or '1073741824' into bytes."""
+    text = text.strip().upper().rstrip('B')
+    scale = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def available_memory():
+    """
+    Bytes of memory available to a new allocation without swapping.
+
+    Reads MemAvailable on Linux; elsewhere falls back to free physical
+    pages, or half of physical memory when that is all the OS reports.
+
+    Returns:
+        int: Bytes, or None when the platform reports nothing
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        pass
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def image_cell_size(total_cells):
+    """Pixels per cell of the PNG LargeMazeGenerator.export_as_image writes for a maze size."""
+    if total_cells > 4000000:
+        return 5
+    elif total_cells > 1000000:
+        return 8
+    elif total_cells > 100000:
+        return 12
+    return 20
+
+
+def choose_storage(total_cells, budget=None):
+    """
+    Maze file format for a maze size: 'json' while the maze is within
+    MAX_JSON_CELLS and saving and loading the lists fits the budget
+    (available memory by default), 'npy' otherwise.
+    """
+    budget = budget if budget is not None else available_memory()
+    if total_cells > MAX_JSON_CELLS:
+        return 'npy'
+    if budget is None:
+        return 'json'
+    costs = STORAGE_BYTES_PER_CELL['json']
+    peak = BASE_BYTES + total_cells * (1 + max(costs['save'], costs['load']))
+    return 'json' if peak <= budget * HEADROOM else 'npy'
+
+
+def load_array(npy_path):
+    """
+    Load a maze .npy, memory-mapped (copy-on-write) when the file is large
+    next to the available memory, so its pages can be dropped and re-read
+    instead of pushing the process into swap.
+    """
+    available = available_memory()
+    if available is not None and os.path.getsize(npy_path) > available * MMAP_SHARE:
+        return np.load(npy_path, mmap_mode='c')
+    return np.load(npy_path)
+
+
+def estimate(width, height, generator='numba', storage='json', export=None, solver=None):
+    """
+    Estimated peak memory of each stage for a maze size and set of choices.
+
+    Args:
+        width (int): Maze width
+        height (int): Maze height
+        generator (str): 'numba' or 'python' carve
+        storage (str): 'json' or 'npy'
+        export (str): None, 'image' (pygame surface) or 'stream' (png_stream/svg_export)
+        solver (str): Registered solver name, or None
+
+    Returns:
+        dict: Stage name -> peak bytes ('generate', 'save', 'load' and, when
+        chosen, 'export' and 'solve')
+    """
+    cells = width * height
+    base = BASE_BYTES + cells
+    costs = STORAGE_BYTES_PER_CELL[storage]
+    stages = {
+        'generate': base + cells * GENERATOR_BYTES_PER_CELL[generator],
+        'save': base + cells * costs['save'],
+        'load': BASE_BYTES + cells * (1 + costs['load']),
+    }
+    if export == 'image':
+        cell_size = image_cell_size(cells)
+        stages['export'] = base + width * cell_size * (height * cell_size + 40) * SURFACE_BYTES_PER_PIXEL
+    elif export == 'stream':
+        stages['export'] = base + STREAM_EXPORT_BYTES
+    if solver is not None:
+        per_cell = SOLVER_BYTES_PER_CELL.get(solver, DEFAULT_SOLVER_BYTES_PER_CELL)
+        stages['solve'] = base + cells * (costs['resident'] + per_cell)
+    return stages
+
+
+class Plan:
+    """
+    Choices for generating, storing, exporting and solving one maze size
+    within a memory budget.
+
+    Attributes:
+        width, height: Maze size
+        budget: Bytes the plan had to fit in (HEADROOM of it is used), None if unknown
+        generator: 'numba' or 'python'
+        storage: 'json' or 'npy'
+        mmap: Whether the saved maze will be memory-mapped when loaded
+        export: 'image', 'stream' or None (no image fits)
+        solvers: Registered solvers that fit after loading the maze
+        stages: Estimated peak bytes per stage of the chosen plan
+        feasible: Whether the maze can be generated and saved at all
+        notes: Why choices were made or refused
+    """
+
+    def __init__(self, width, height, budget):
+        self.width = width
+        self.height = height
+        self.budget = budget
+        self.generator = None
+        self.storage = None
+        self.mmap = False
+        self.export = None
+        self.solvers = []
+        self.stages = {}
+        self.feasible = False
+        self.notes = []
+
+    @property
+    def peak(self):
+        """Largest estimated stage of generating, saving and exporting."""
+        return max(self.stages[stage] for stage in ('generate', 'save', 'export') if stage in self.stages)
+
+    def check(self):
+        """Raise PlanError with the reasons when the plan is not feasible."""
+        if not self.feasible:
+            raise PlanError('; '.join(self.notes))
+        return self
+
+    def describe(self):
+        within = f" within {format_bytes(self.budget)}" if self.budget is not None else ""
+        lines = [f"Plan for {self.width}x{self.height} ({self.width * self.height:,} cells){within}:"]
+        if self.feasible:
+            lines.append(f"  generator: {self.generator} carve, storage: {self.storage}"
+                         f"{' (memory-mapped on load)' if self.mmap else ''}, "
+                         f"export: {self.export or 'none'}")
+            lines.append(f"  estimated peak: {format_bytes(self.peak)}")
+            lines.append(f"  solvers that fit: {', '.join(self.solvers) or 'none'}")
+        lines.extend(f"  note: {note}" for note in self.notes)
+        return '\n'.join(lines)
+
+
+def plan_run(width, height, budget=None, export=True, generators=None):
+    """
+    Pick the choices that fit a memory budget for a maze size, or mark
+    the plan infeasible before anything is allocated.
+
+    The carve prefers numba (least memory) when it is installed; storage
+    is JSON while it fits, else a compact .npy, memory-mapped on load when
+    it is large next to the budget; the export is a pygame image while
+    the surface fits, else streamed band by band, else skipped.
+
+    Args:
+        width (int): Maze width
+        height (int): Maze height
+        budget (int): Bytes available (default: available_memory(); when
+            that is unknown nothing is ruled out)
+        export (bool): Plan an image export
+        generators (list): Carve backends to consider, in preference order
+
+    Returns:
+        Plan
+    """
+    from kernels import NUMBA_AVAILABLE
+    from maze_render import fits_surface
+    from solver_registry import available_solvers
+
+    if budget is None:
+        budget = available_memory()
+    plan = Plan(width, height, budget)
+    if budget is None:
+        plan.notes.append("available memory is unknown on this platform; sizes are not checked")
+    usable = budget * HEADROOM if budget is not None else float('inf')
+    cells = width * height
+
+    if generators is None:
+        generators = ['numba', 'python'] if NUMBA_AVAILABLE else ['python']
+    for generator in generators:
+        if estimate(width, height, generator)['generate'] <= usable:
+            plan.generator = generator
+            break
+    if plan.generator is None:
+        needed = min(estimate(width, height, g)['generate'] for g in generators)
+        plan.notes.append(f"generating needs about {format_bytes(needed)}, more than "
+                          f"{format_bytes(usable)} usable")
+        return plan
+
+    plan.storage = choose_storage(cells, budget)
+    if plan.storage == 'npy' and cells <= MAX_JSON_CELLS:
+        plan.notes.append("JSON lists would not fit; saving the array as .npy")
+    plan.mmap = plan.storage == 'npy' and budget is not None and cells > budget * MMAP_SHARE
+
+    if export:
+        cell_size = image_cell_size(cells)
+        surface = estimate(width, height, plan.generator, plan.storage, export='image')['export']
+        if fits_surface(width * cell_size, height * cell_size + 40) and surface <= usable:
+            plan.export = 'image'
+        elif estimate(width, height, plan.generator, plan.storage, export='stream')['export'] <= usable:
+            plan.export = 'stream'
+            if surface > usable:
+                plan.notes.append(f"a {cell_size}px image surface needs {format_bytes(surface)}; "
+                                  "streaming the PNG instead")
+        else:
+            plan.notes.append("no image export fits; skipping it")
+
+    for name in available_solvers():
+        if estimate(width, height, plan.generator, plan.storage, solver=name)['solve'] <= usable:
+            plan.solvers.append(name)
+    if not plan.solvers:
+        plan.notes.append("no solver fits this budget; the maze can be generated but not solved here")
+
+    plan.stages = estimate(width, height, plan.generator, plan.storage, plan.export)
+    plan.feasible = plan.stages['save'] <= usable
+    if not plan.feasible:
+        plan.notes.append(f"saving needs about {format_bytes(plan.stages['save'])}")
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate memory and plan a maze run within a budget")
+    parser.add_argument('width', type=int, help="Maze width")
+    parser.add_argument('height', type=int, nargs='?', help="Maze height (default: width)")
+    parser.add_argument('--budget', help="Memory budget, e.g. 8G or 512M (default: available memory)")
+    parser.add_argument('--no-export', action='store_true', help="Do not plan an image export")
+    args = parser.parse_args()
+
+    from solver_registry import available_solvers
+
+    height = args.height or args.width
+    budget = parse_bytes(args.budget) if args.budget else None
+    plan = plan_run(args.width, height, budget, export=not args.no_export)
+    print(plan.describe())
+
+    print(f"\n{'Choice':<34}{'Estimated peak':>16}  Fits")
+    usable = plan.budget * HEADROOM if plan.budget is not None else float('inf')
+    rows = [(f"generate ({g})", estimate(args.width, height, g)['generate'])
+            for g in GENERATOR_BYTES_PER_CELL]
+    for storage in STORAGE_BYTES_PER_CELL:
+        stages = estimate(args.width, height, storage=storage)
+        rows += [(f"save {storage}", stages['save']), (f"load {storage}", stages['load'])]
+    for export in ('image', 'stream'):
+        rows.append((f"export ({export})", estimate(args.width, height, export=export)['export']))
+    storage = plan.storage or 'npy'
+    for name in available_solvers():
+        rows.append((f"solve {name}", estimate(args.width, height, storage=storage, solver=name)['solve']))
+    for choice, peak in rows:
+        print(f"{choice:<34}{format_bytes(peak):>16}  {'yes' if peak <= usable else 'NO'}")
+
+    if not plan.feasible:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
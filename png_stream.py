@@ -0,0 +1,254 @@
+import os
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+import metrics
+from maze_render import PALETTE, band_rows, cell_codes
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class StreamingPNGWriter:
+    """
+    PNG encoder that takes scanlines in bands and never holds the whole image.
+
+    Rows are packed to the output bit depth, stored with the PNG Up filter
+    (each byte minus the byte above it, which turns the repeated rows of
+    scaled-up cells into zeros) and pushed through one zlib compressor;
+    compressed output is written as IDAT chunks whenever chunk_size bytes
+    have accumulated. Memory use is bounded by the band being written, so
+    images far beyond pygame's 32767 px and 2 GB surface limits can be
+    produced.
+
+    Two formats are supported: 1-bit grayscale (palette=None; 0 = black,
+    1 = white) and indexed color with a palette of up to 256 entries, stored
+    at the smallest bit depth (1, 2, 4 or 8) that fits it. Indexed images
+    can carry per-entry alpha (0 = transparent) for overlay layers.
+
+    The image is written to path + '.tmp' and moved over path by close(),
+    so a failed or interrupted export never leaves a truncated PNG behind;
+    leaving the with block on an exception deletes the temporary file.
+    """
+
+    def __init__(self, path, width, height, palette=None, alpha=None, compression=6,
+                 chunk_size=1 << 20):
+        if width <= 0 or height <= 0 or width > 0x7FFFFFFF or height > 0x7FFFFFFF:
+            raise ValueError(f"Invalid PNG dimensions {width}x{height}")
+
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.chunk_size = chunk_size
+
+        if palette is None:
+            self.bit_depth, color_type = 1, 0
+        else:
+            palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+            if not 1 <= len(palette) <= 256:
+                raise ValueError(f"Palette must have 1-256 colors, got {len(palette)}")
+            self.bit_depth = next(d for d in (1, 2, 4, 8) if len(palette) <= 1 << d)
+            color_type = 3
+
+        self.row_bytes = (width * self.bit_depth + 7) // 8
+        self._last_row = np.zeros(self.row_bytes, dtype=np.uint8)
+        self._compressor = zlib.compressobj(compression)
+        self._pending = []
+        self._pending_size = 0
+
+        self.path = path
+        self._temp_path = path + '.tmp'
+        self.file = open(self._temp_path, 'wb')
+        self.file.write(PNG_SIGNATURE)
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, self.bit_depth,
+                                               color_type, 0, 0, 0))
+        if palette is not None:
+            self._write_chunk(b'PLTE', palette.tobytes())
+            if alpha is not None:
+                self._write_chunk(b'tRNS', np.asarray(alpha, dtype=np.uint8).tobytes())
+
+    def _write_chunk(self, chunk_type, data):
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+    def _queue(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= self.chunk_size:
+            self._flush_idat()
+
+    def _flush_idat(self):
+        if self._pending:
+            self._write_chunk(b'IDAT', b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def pack_rows(self, pixels):
+        """Pack a (rows, width) array of pixel values into PNG scanline bytes."""
+        pixels = np.asarray(pixels, dtype=np.uint8)
+        if self.bit_depth == 8:
+            return pixels
+        if self.bit_depth == 1:
+            return np.packbits(pixels & 1, axis=1)
+
+        # 2 or 4 bits: first pixel in the high bits of each byte
+        per_byte = 8 // self.bit_depth
+        row_bytes = -(-pixels.shape[1] // per_byte)
+        padded = np.zeros((pixels.shape[0], row_bytes * per_byte), dtype=np.uint8)
+        padded[:, :pixels.shape[1]] = pixels
+        groups = padded.reshape(pixels.shape[0], row_bytes, per_byte)
+        packed = np.zeros((pixels.shape[0], row_bytes), dtype=np.uint8)
+        for i in range(per_byte):
+            packed |= groups[:, :, i] << (8 - self.bit_depth * (i + 1))
+        return packed
+
+    def write_rows(self, pixels):
+        """
+        Append scanlines.
+
+        Args:
+            pixels (numpy.ndarray): (rows, width) palette indices, or 0/1
+                values for 1-bit grayscale
+        """
+        pixels = np.asarray(pixels)
+        if pixels.ndim != 2 or pixels.shape[1] != self.width:
+            raise ValueError(f"Expected rows of width {self.width}, got shape {pixels.shape}")
+        if self.rows_written + pixels.shape[0] > self.height:
+            raise ValueError("More rows written than the image height")
+
+        packed = self.pack_rows(pixels)
+        if not len(packed):
+            return
+        # Filter type 2 (Up); uint8 subtraction wraps modulo 256 as PNG requires
+        scanlines = np.empty((packed.shape[0], self.row_bytes + 1), dtype=np.uint8)
+        scanlines[:, 0] = 2
+        scanlines[0, 1:] = packed[0] - self._last_row
+        scanlines[1:, 1:] = packed[1:] - packed[:-1]
+        self._last_row = packed[-1].copy()
+        self._queue(self._compressor.compress(scanlines.tobytes()))
+        self.rows_written += pixels.shape[0]
+
+    def close(self):
+        if self.file is None:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Image has {self.height} rows but {self.rows_written} were written")
+            self._queue(self._compressor.flush())
+            self._flush_idat()
+            self._write_chunk(b'IEND', b'')
+        except BaseException:
+            self._discard()
+            raise
+        self._commit()
+
+    def _commit(self):
+        self.file.close()
+        self.file = None
+        os.replace(self._temp_path, self.path)
+
+    def _discard(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+@metrics.timed('render')
+def write_maze_png(maze, output_path, cell_size, solution=None, start=None, end=None,
+                   monochrome=False, compression=6):
+    """
+    Stream a maze image to PNG band by band.
+
+    Each band of maze rows is turned into palette codes, scaled to
+    cell_size blocks with broadcasting and handed to the writer, so peak
+    memory is one band no matter how large the image is.
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        output_path (str): PNG file to write
+        cell_size (int): Pixels per cell
+        solution (numpy.ndarray): Optional solution grid (ignored when monochrome)
+        start (tuple): Optional start cell (y, x)
+        end (tuple): Optional end cell (y, x)
+        monochrome (bool): 1-bit black and white output for printing
+        compression (int): zlib level
+
+    Returns:
+        str: output_path
+    """
+    height, width = maze.shape
+    img_width, img_height = width * cell_size, height * cell_size
+    band = band_rows(width, cell_size)
+
+    palette = None if monochrome else PALETTE
+    with StreamingPNGWriter(output_path, img_width, img_height, palette=palette,
+                            compression=compression) as writer:
+        for y0 in range(0, height, band):
+            y1 = min(height, y0 + band)
+            if monochrome:
+                # Open cells white, walls black
+                values = (np.asarray(maze[y0:y1]) == 0).astype(np.uint8)
+            else:
+                values = cell_codes(maze, solution, start, end, slice(y0, y1))
+            rows = y1 - y0
+            pixels = np.broadcast_to(values[:, None, :, None], (rows, cell_size, width, cell_size))
+            writer.write_rows(pixels.reshape(rows * cell_size, img_width))
+
+    return output_path
+
+
+def main():
+    import argparse
+
+    from dead_end_solver import load_maze
+
+    parser = argparse.ArgumentParser(description="Export a maze as a full-resolution PNG of any size")
+    parser.add_argument('maze', help="Maze JSON file")
+    parser.add_argument('--cell-size', type=int, default=5, help="Pixels per cell (default: 5)")
+    parser.add_argument('--monochrome', action='store_true', help="1-bit black and white output")
+    parser.add_argument('--solution', action='store_true', help="Draw the saved solution")
+    parser.add_argument('--output', help="Output PNG (default: next to the maze file)")
+    args = parser.parse_args()
+
+    directory, filename = os.path.split(args.maze)
+    maze, start, end, data = load_maze(filename, directory or "mazes")
+
+    solution = None
+    if args.solution:
+        if 'solution' not in data:
+            print(f"{filename} has no saved solution")
+            sys.exit(1)
+        solution = np.array(data['solution'])
+
+    output_path = args.output or os.path.join(directory or "mazes", filename.replace('.json', '_full.png'))
+    height, width = maze.shape
+    print(f"Streaming {width * args.cell_size}x{height * args.cell_size} PNG "
+          f"({'1-bit' if args.monochrome else 'palette'})...")
+
+    start_time = time.time()
+    write_maze_png(maze, output_path, args.cell_size, solution, start, end, monochrome=args.monochrome)
+    elapsed = time.time() - start_time
+
+    file_size = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"Image saved: {output_path} ({file_size:.2f} MB, {elapsed:.1f} seconds)")
+
+
+if __name__ == "__main__":
+    main()
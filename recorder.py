@@ -0,0 +1,380 @@
+import os
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from maze_render import BLACK, BLUE, GREEN, RED, WHITE
+from png_stream import StreamingPNGWriter
+
+
+GRAY = (160, 160, 160)
+
+# Frame codes match the solver_registry CELL_* states (open, wall, visited,
+# path), then start and end
+FRAME_PALETTE = np.array([WHITE, BLACK, GRAY, BLUE, GREEN, RED], dtype=np.uint8)
+FRAME_START, FRAME_END = 4, 5
+
+# Where cells share a pixel the highest priority wins: path over visited
+# over open over wall, so carved corridors are not buried under walls.
+# The table swaps open and wall and is its own inverse
+FRAME_PRIORITY = np.array([1, 0, 2, 3, 4, 5], dtype=np.uint8)
+
+
+class APNGWriter(StreamingPNGWriter):
+    """
+    Animated PNG encoder for indexed frames.
+
+    The first frame is the regular image (IDAT), so viewers without APNG
+    support show it; every later frame stores only the bounding box of the
+    pixels that changed since the previous frame (fcTL + fdAT), drawn over
+    it. The frame count in acTL is filled in by close().
+    """
+
+    def __init__(self, path, width, height, palette, fps=30, loops=0, compression=6):
+        super().__init__(path, width, height, palette=palette, compression=compression)
+        self.fps = fps
+        self.loops = loops
+        self.frames = 0
+        self.compression = compression
+        self._sequence = 0
+        self._previous = None
+        self._actl_offset = self.file.tell()
+        self._write_chunk(b'acTL', struct.pack('>II', 0, loops))
+
+    def add_frame(self, pixels, duration=None):
+        """
+        Append a frame.
+
+        Args:
+            pixels (numpy.ndarray): (height, width) palette indices; the
+                array is kept for the next frame's diff, so it must not be
+                changed afterwards
+            duration (float): Seconds the frame is shown (1 / fps by default)
+        """
+        pixels = np.asarray(pixels, dtype=np.uint8)
+        if pixels.shape != (self.height, self.width):
+            raise ValueError(f"Expected a {self.height}x{self.width} frame, got shape {pixels.shape}")
+
+        y0, x0, region = 0, 0, pixels
+        if self._previous is not None:
+            changed = pixels != self._previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            if rows.size:
+                cols = np.flatnonzero(changed.any(axis=0))
+                y0, x0 = int(rows[0]), int(cols[0])
+                region = pixels[y0:rows[-1] + 1, x0:cols[-1] + 1]
+            else:
+                region = pixels[:1, :1]
+        self._previous = pixels
+
+        # Delays are fractions of a second: 1/fps, or duration in milliseconds
+        delay = (1, self.fps) if duration is None else (int(round(duration * 1000)), 1000)
+        height, width = region.shape
+        self._write_chunk(b'fcTL', struct.pack('>IIIIIHHBB', self._sequence, width, height, x0, y0,
+                                               delay[0], delay[1], 0, 0))
+        self._sequence += 1
+
+        packed = self.pack_rows(region)
+        scanlines = np.zeros((height, packed.shape[1] + 1), dtype=np.uint8)
+        scanlines[:, 1:] = packed
+        data = zlib.compress(scanlines.tobytes(), self.compression)
+        if self.frames == 0:
+            self._write_chunk(b'IDAT', data)
+        else:
+            self._write_chunk(b'fdAT', struct.pack('>I', self._sequence) + data)
+            self._sequence += 1
+        self.frames += 1
+
+    def close(self):
+        if self.file is None:
+            return
+        try:
+            if not self.frames:
+                raise ValueError("Animation has no frames")
+            self._write_chunk(b'IEND', b'')
+            self.file.seek(self._actl_offset)
+            self._write_chunk(b'acTL', struct.pack('>II', self.frames, self.loops))
+        except BaseException:
+            self._discard()
+            raise
+        self._commit()
+
+
+class Recorder:
+    """
+    Headless recording of a generator or solver run: an observer(cells, state).
+
+    Marked cells update a grid of frame codes. Every `interval` marked cells
+    a frame is taken: the grid is reduced to at most max_size pixels by
+    keeping the highest-priority code of each block (FRAME_PRIORITY), so
+    open corridors and paths stay visible, and handed to a background thread
+    that scales it up (small mazes) and encodes it. The interval is chosen
+    from the expected number of marked cells so a run yields about `frames`
+    frames; a run that goes past the estimate doubles it each time another
+    `frames` frames are taken.
+
+    An output ending in .png is written as one animated PNG; any other
+    output is a directory that receives a frame_00000.png, ... sequence.
+    """
+
+    def __init__(self, maze, output, start=None, end=None, frames=300, expected_cells=None, fps=30,
+                 max_size=1024, hold=2.0, queue_size=32):
+        """
+        Args:
+            maze (numpy.ndarray): Maze array (1 = wall, 0 = path) at the start of the run
+            output (str): .png file for an animation, or a directory for a PNG sequence
+            start (tuple): Optional start cell (y, x), drawn on every frame
+            end (tuple): Optional end cell (y, x), drawn on every frame
+            frames (int): Frame budget for the run
+            expected_cells (int): Cells the run is expected to mark (the
+                maze's open cells by default)
+            fps (int): Playback frame rate of the animation
+            max_size (int): Largest frame side in pixels
+            hold (float): Seconds the last frame of the animation is shown
+            queue_size (int): Frames waiting for the writer thread before
+                the run waits for it
+        """
+        self.codes = (np.asarray(maze) != 0).astype(np.uint8)
+        self.output = output
+        self.fixed = [(tuple(cell), code) for cell, code in ((start, FRAME_START), (end, FRAME_END))
+                      if cell is not None]
+        self.frame_budget = frames
+        self.fps = fps
+        self.hold = hold
+        self.animated = output.lower().endswith('.png')
+
+        rows, cols = self.codes.shape
+        longest = max(rows, cols)
+        if longest > max_size:
+            self.block, self.cell_size = -(-longest // max_size), 1
+        else:
+            self.block, self.cell_size = 1, max(1, max_size // longest)
+        self.frame_height = -(-rows // self.block) * self.cell_size
+        self.frame_width = -(-cols // self.block) * self.cell_size
+
+        if expected_cells is None:
+            expected_cells = int(np.count_nonzero(self.codes == 0))
+        self.interval = max(1, expected_cells // max(1, frames))
+        self.frames = 0
+        self.cells_marked = 0
+        self._since = 0
+
+        if not self.animated:
+            os.makedirs(output, exist_ok=True)
+        self.error = None
+        self._frames = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._write, name="recorder", daemon=True)
+        self._thread.start()
+
+    def mark(self, cells, state):
+        """Observer: set cells (y, x) to a CELL_* state, taking a frame when one is due."""
+        if len(cells) <= 16:
+            for y, x in cells:
+                self.codes[y, x] = state
+            self.cells_marked += len(cells)
+            self._since += len(cells)
+            if self._since >= self.interval:
+                self.capture()
+            return
+
+        # Large batches (a chunk of a compiled walk) are split where frames fall due
+        cells = np.asarray(cells).reshape(-1, 2)
+        done = 0
+        while done < len(cells):
+            stop = min(len(cells), done + self.interval - self._since)
+            self.codes[cells[done:stop, 0], cells[done:stop, 1]] = state
+            self.cells_marked += stop - done
+            self._since += stop - done
+            done = stop
+            if self._since >= self.interval:
+                self.capture()
+
+    __call__ = mark
+
+    def _frame_codes(self):
+        block = self.block
+        if block == 1:
+            frame = self.codes.copy()
+        else:
+            rows, cols = self.codes.shape
+            # Padding ranks lowest (wall) so it never wins a block
+            padded = np.zeros((-(-rows // block) * block, -(-cols // block) * block), dtype=np.uint8)
+            padded[:rows, :cols] = FRAME_PRIORITY[self.codes]
+            frame = padded.reshape(padded.shape[0], -1, block).max(axis=2)
+            frame = FRAME_PRIORITY[frame.reshape(-1, block, frame.shape[1]).max(axis=1)]
+        for (y, x), code in self.fixed:
+            frame[y // block, x // block] = code
+        return frame
+
+    def capture(self, duration=None):
+        """Take a frame now (the writer thread encodes it)."""
+        if self.error is not None:
+            raise self.error
+        self._since = 0
+        self.frames += 1
+        if self.frames % self.frame_budget == 0:
+            self.interval *= 2
+        self._frames.put((self._frame_codes(), duration))
+
+    def _write(self):
+        writer = None
+        index = 0
+        while True:
+            item = self._frames.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+
+            frame, duration = item
+            try:
+                if self.cell_size > 1:
+                    frame = np.repeat(np.repeat(frame, self.cell_size, axis=0), self.cell_size, axis=1)
+                if self.animated:
+                    if writer is None:
+                        writer = APNGWriter(self.output, self.frame_width, self.frame_height,
+                                            FRAME_PALETTE, fps=self.fps)
+                    writer.add_frame(frame, duration)
+                else:
+                    path = os.path.join(self.output, f"frame_{index:05d}.png")
+                    with StreamingPNGWriter(path, self.frame_width, self.frame_height,
+                                            palette=FRAME_PALETTE) as png:
+                        png.write_rows(frame)
+                index += 1
+            except Exception as e:
+                # Keep draining so a waiting capture() is not blocked forever
+                self.error = e
+
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception as e:
+                self.error = self.error or e
+
+    def close(self):
+        """Take the final frame (held for `hold` seconds), then wait for the writer."""
+        if self._thread is None:
+            return
+        if self._since or not self.frames:
+            self.capture(self.hold)
+        self._frames.put(None)
+        self._thread.join()
+        self._thread = None
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._thread is not None:
+            self._frames.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+def record_solver(name, maze, start, end, output, **options):
+    """
+    Run a registered solver headlessly and record it.
+
+    Args:
+        name (str): Registered solver name
+        options: Passed to Recorder
+
+    Returns:
+        tuple: (SolveResult, Recorder)
+    """
+    from solver_registry import run_solver
+
+    with Recorder(maze, output, start, end, **options) as recorder:
+        result = run_solver(name, maze, start, end, observer=recorder, track_memory=False)
+    return result, recorder
+
+
+def record_generation(width, height, output, seed=None, **options):
+    """
+    Generate a maze with LargeMazeGenerator.generate_iterative and record the carve.
+
+    Returns:
+        tuple: (maze, Recorder)
+    """
+    from large_maze_generator import LargeMazeGenerator
+
+    generator = LargeMazeGenerator(width, height)
+    if seed is not None:
+        random.seed(seed)
+
+    options.setdefault('expected_cells', generator.total_cells // 2)
+    with Recorder(np.ones((generator.HEIGHT, generator.WIDTH), dtype=np.uint8), output,
+                  **options) as recorder:
+        maze = generator.generate_iterative(visualize=False, observer=recorder)
+    return maze, recorder
+
+
+def main():
+    import argparse
+    import glob
+
+    from dead_end_solver import load_maze
+    from solver_registry import available_solvers
+
+    parser = argparse.ArgumentParser(description="Record maze generation or solver runs as animated PNGs")
+    parser.add_argument('maze', nargs='?', help="Maze JSON file (default: latest in mazes/)")
+    parser.add_argument('--solvers', default='all',
+                        help=f"Comma-separated solvers to record, or 'all' ({', '.join(available_solvers())})")
+    parser.add_argument('--generate', type=int, metavar='SIZE',
+                        help="Record the generation of a new SIZExSIZE maze instead")
+    parser.add_argument('--seed', type=int, help="Random seed for --generate")
+    parser.add_argument('--frames', type=int, default=300, help="Frame budget per run (default: 300)")
+    parser.add_argument('--fps', type=int, default=30, help="Playback frame rate (default: 30)")
+    parser.add_argument('--max-size', type=int, default=1024, help="Largest frame side in pixels (default: 1024)")
+    parser.add_argument('--sequence', action='store_true',
+                        help="Write a directory of PNG frames instead of an animated PNG")
+    parser.add_argument('--output', help="Output file or directory (default: next to the maze)")
+    args = parser.parse_args()
+
+    options = {'frames': args.frames, 'fps': args.fps, 'max_size': args.max_size}
+    suffix = '' if args.sequence else '.png'
+
+    if args.generate:
+        output = args.output or os.path.join("mazes", f"generate_{args.generate}x{args.generate}{suffix}")
+        start_time = time.time()
+        _, recorder = record_generation(args.generate, args.generate, output, args.seed, **options)
+        print(f"Recorded generation: {recorder.frames} frames in {time.time() - start_time:.2f}s -> {output}")
+        return
+
+    if args.maze:
+        directory, filename = os.path.split(args.maze)
+        directory = directory or "mazes"
+    else:
+        maze_files = glob.glob("mazes/maze_*.json")
+        if not maze_files:
+            print("No maze files found in 'mazes/' directory")
+            print("Generate a maze first using maze.py or large_maze_generator.py")
+            sys.exit(1)
+        directory, filename = "mazes", os.path.basename(max(maze_files, key=os.path.getctime))
+
+    maze, start, end, _ = load_maze(filename, directory)
+    solvers = available_solvers() if args.solvers == 'all' else args.solvers.split(',')
+
+    for name in solvers:
+        if len(solvers) > 1 or not args.output:
+            output = os.path.join(args.output or directory, filename.replace('.json', f'_{name}{suffix}'))
+        else:
+            output = args.output
+        start_time = time.time()
+        result, recorder = record_solver(name, maze, start, end, output, **options)
+        print(f"{name}: {result.status}, {recorder.frames} frames in {time.time() - start_time:.2f}s "
+              f"(solve {result.solve_time:.2f}s) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,15 @@ import json
 import os
 import time
 import pygame
-import sys
 from datetime import datetime
 
+import metrics
+from dirty_renderer import DirtyCellRenderer
+from frame_pipeline import FramePipeline
+from viewport import CONTROLS
 
+
+@metrics.timed('load')
 def load_maze(filename, directory="mazes"):
     """
     Load a maze from a JSON file.
@@ -33,6 +38,88 @@ def load_maze(filename, directory="mazes"):
     return maze, start_pos, end_pos, data
 
 
+def backtrack_search(maze, start, end, observer=None, budget=None):
+    """
+    Headless recursive backtracking, run with an explicit stack.
+
+    Explores moves in the same order as solve_maze_with_pygame, so it finds
+    the same path and step count without recursion limits or a display.
+
+    Args:
+        maze (numpy.ndarray): The maze to solve
+        start (tuple): Starting position (y, x)
+        end (tuple): Ending position (y, x)
+        observer (callable): Optional observer(cells, state) notified when
+            cells join (CELL_PATH) or leave (CELL_VISITED) the current path
+        budget (SolveBudget): Optional limits; SolveInterrupted is raised
+            with the explored cells when they run out
+
+    Returns:
+        tuple: (path, steps) where path is a list of (y, x) from start to
+        end, or None if the end is unreachable
+    """
+    from solver_registry import CELL_PATH, CELL_VISITED, SolveInterrupted, nearest_cell
+
+    height, width = maze.shape
+    start, end = tuple(start), tuple(end)
+
+    if start == end:
+        return [start], 0
+    if maze[start] == 1:
+        return None, 0
+
+    visited = np.zeros(maze.shape, dtype=bool)
+    moves = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+    visited[start] = True
+    steps = 1
+    path = [start]
+    next_move = [0]
+    if observer:
+        observer([start], CELL_PATH)
+
+    while path:
+        if budget is not None and budget.exceeded():
+            raise SolveInterrupted(budget.reason, explored=visited,
+                                   frontier=nearest_cell(visited, end),
+                                   counters={'steps': steps, 'depth': len(path)})
+
+        y, x = path[-1]
+        i = next_move[-1]
+
+        if i == len(moves):
+            path.pop()
+            next_move.pop()
+            if observer:
+                observer([(y, x)], CELL_VISITED)
+            continue
+
+        next_move[-1] = i + 1
+        dy, dx = moves[i]
+        ny, nx = y + dy, x + dx
+
+        if not (0 <= ny < height and 0 <= nx < width):
+            continue
+
+        if (ny, nx) == end:
+            path.append(end)
+            if observer:
+                observer([end], CELL_PATH)
+            return path, steps
+
+        if visited[ny, nx] or maze[ny, nx] == 1:
+            continue
+
+        visited[ny, nx] = True
+        steps += 1
+        path.append((ny, nx))
+        next_move.append(0)
+        if observer:
+            observer([(ny, nx)], CELL_PATH)
+
+    return None, steps
+
+
 def solve_maze_with_pygame(maze, start, end, cell_size=None):
     """
     Solve maze using recursive backtracking with pygame visualization.
@@ -46,6 +133,8 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
     Returns:
         tuple: (solution, steps, solve_time)
     """
+    from solver_registry import CELL_PATH, CELL_VISITED
+
     pygame.init()
     
     height, width = maze.shape
@@ -53,7 +142,7 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
     
     if total_cells > 10000000:
         print(f"\n⚠️  Warning: Very large maze ({total_cells:,} cells)")
-        print("Solving may take several minutes. Visualization updates reduced to prevent lag.\n")
+        print("Solving may take several minutes.\n")
     
     # Auto-calculate cell size to fit screen if not provided
     if cell_size is None:
@@ -70,7 +159,7 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
         # Ensure walls are clearly visible: minimum 4px, maximum 15px for balance
         if cell_size < 4:
             cell_size = 4
-            print(f"Note: Maze is large. Using 4px cells - you may need to scroll or zoom")
+            print(f"Note: Maze is large. Using 4px cells - zoom out for the whole maze")
         elif cell_size > 15:
             cell_size = 15
             print(f"Note: Using 15px cells for optimal visibility")
@@ -87,6 +176,7 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
     
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption(f"Maze Solver - {height}x{width} | Cell size: {cell_size}px")
+    print(f"View: {CONTROLS}")
     
     # Colors
     WHITE = (255, 255, 255)
@@ -96,104 +186,55 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
     RED = (255, 0, 0)
     GRAY = (200, 200, 200)
     
-    solution = np.zeros_like(maze)
-    visited = np.zeros_like(maze, dtype=bool)
-    
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, 24)
     
+    # Walls and grid are drawn once; frames repaint only the cells marked since the last one
+    renderer = DirtyCellRenderer(screen, maze, cell_size, {CELL_PATH: LIGHT_BLUE, CELL_VISITED: GRAY},
+                                 palette=np.array([WHITE, BLACK, LIGHT_BLUE, GREEN, RED], dtype=np.uint8),
+                                 start=start, end=end, area=(screen_width, screen_height - 60),
+                                 grid_color=BLACK, highlight=(CELL_PATH,))
+    screen.fill(WHITE)
+    info_rect = pygame.Rect(0, screen_height - 60, screen_width, 60)
+    
+    # The search runs in a worker thread; the view follows it at a fixed frame rate
+    pipeline = FramePipeline(renderer)
     start_time = time.time()
     steps = 0
     solved = False
     
-    def draw_maze():
-        screen.fill(WHITE)
-        
-        for y in range(height):
-            for x in range(width):
-                rect = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
-                
-                if (y, x) == start:
-                    pygame.draw.rect(screen, GREEN, rect)
-                elif (y, x) == end:
-                    pygame.draw.rect(screen, RED, rect)
-                elif maze[y, x] == 1:
-                    pygame.draw.rect(screen, BLACK, rect)
-                elif solution[y, x] == 1:
-                    pygame.draw.rect(screen, LIGHT_BLUE, rect)
-                elif visited[y, x]:
-                    pygame.draw.rect(screen, GRAY, rect)
-                else:
-                    pygame.draw.rect(screen, WHITE, rect)
-                
-                pygame.draw.rect(screen, BLACK, rect, 1)
-        
+    def on_step(cells, state):
+        nonlocal steps
+        if state == CELL_PATH:
+            steps += 1
+        pipeline.publish(cells, state)
+    
+    def draw_info():
+        screen.fill(WHITE, info_rect)
         elapsed_time = time.time() - start_time
         info_text = f"Steps: {steps} | Time: {elapsed_time:.3f}s | Status: {'SOLVED!' if solved else 'Searching...'}"
         text_surface = font.render(info_text, True, BLACK)
         screen.blit(text_surface, (10, screen_height - 50))
-        
-        pygame.display.flip()
+        return [info_rect]
     
-    def backtrack(pos):
-        nonlocal steps, solved
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        
-        y, x = pos
-        
-        if pos == end:
-            solution[y, x] = 1
-            solved = True
-            draw_maze()
-            return True
-        
-        if visited[y, x] or maze[y, x] == 1:
-            return False
-        
-        visited[y, x] = True
-        solution[y, x] = 1
-        steps += 1
-        
-        # Adaptive update frequency based on maze size
-        total_cells = height * width
-        if total_cells > 10000000:
-            update_freq = 1000
-        elif total_cells > 1000000:
-            update_freq = 100
-        else:
-            update_freq = 10
-        
-        if steps % update_freq == 0:
-            draw_maze()
-            clock.tick(120)
-        
-        moves = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        
-        for dy, dx in moves:
-            ny, nx = y + dy, x + dx
-            
-            if 0 <= ny < height and 0 <= nx < width:
-                if backtrack((ny, nx)):
-                    return True
-        
-        solution[y, x] = 0
-        return False
+    def solve():
+        with metrics.phase('solve', algorithm='recursive_backtracking'):
+            return backtrack_search(maze, start, end, observer=on_step)
     
-    draw_maze()
-    backtrack(start)
-    draw_maze()
+    path, steps = pipeline.run(solve, draw=draw_info)
+    solve_time = pipeline.solve_time
+    solved = path is not None
     
-    end_time = time.time()
-    solve_time = end_time - start_time
+    solution = np.zeros_like(maze)
+    if solved:
+        ys, xs = zip(*path)
+        solution[list(ys), list(xs)] = 1
     
+    draw_info()
     final_text = f"SOLVED in {solve_time:.3f} seconds with {steps} steps!"
     text_surface = font.render(final_text, True, GREEN)
     screen.blit(text_surface, (10, screen_height - 30))
-    pygame.display.flip()
+    pygame.display.update(info_rect)
     
     print(f"\n{'='*50}")
     print(f"Maze Solving Results:")
@@ -208,6 +249,8 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 waiting = False
+            elif renderer.handle_event(event):
+                pygame.display.update(renderer.flush())
         clock.tick(30)
     
     pygame.quit()
@@ -215,14 +258,19 @@ def solve_maze_with_pygame(maze, start, end, cell_size=None):
     return solution, steps, solve_time
 
 
+@metrics.timed('save')
 def save_solution(filename, solution, steps, solve_time, directory="mazes"):
     """Save the solution back to the maze file."""
+    from solution_verifier import verify_solution
+
     filepath = os.path.join(directory, filename)
-    
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    maze, start, end, data = load_maze(filename, directory)
+    problems = verify_solution(maze, solution, start, end)
     
     data['solved'] = True
+    data['solution_valid'] = not problems
+    if problems:
+        data['solution_problems'] = problems
     data['solution'] = solution.tolist()
     data['steps'] = steps
     data['solve_time'] = solve_time
@@ -232,6 +280,8 @@ def save_solution(filename, solution, steps, solve_time, directory="mazes"):
         json.dump(data, f, indent=2)
     
     print(f"✅ Solution saved to: {filepath}")
+    if problems:
+        print(f"Warning: saved solution is not a single start-to-end path: {'; '.join(problems)}")
 
 
 def solve_and_save(filename):
@@ -262,9 +312,6 @@ def solve_and_save(filename):
 if __name__ == "__main__":
     import glob
     
-    # Increase recursion limit for large mazes
-    sys.setrecursionlimit(50000)
-    
     maze_files = glob.glob("mazes/maze_*.json")
     
     if not maze_files:
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from dead_end_solver import load_maze
+from junction_graph import open_neighbor_counts
+
+
+def component_labels(mask):
+    """
+    Connected components of the set cells, by hooking and pointer jumping.
+
+    Shiloach-Vishkin style: every round, each component root is hooked onto
+    the smallest root across its edges, then every parent pointer is jumped
+    to its root. Every component with an outside edge merges each round, so
+    a path of n cells needs O(log n) rounds of whole-array operations instead
+    of the n steps a cell-by-cell walk would.
+
+    Args:
+        mask (numpy.ndarray): 2D boolean array
+
+    Returns:
+        tuple: (cells, labels) - flat indices of the set cells and, for each,
+        the smallest index (into cells) in its component
+    """
+    width = mask.shape[1]
+    flat = mask.ravel()
+    cells = np.flatnonzero(flat)
+
+    # Only entries at set cells are ever read, so ids can stay uninitialised
+    # elsewhere and the edge lookups scale with the path, not the grid
+    ids = np.empty(flat.size, dtype=np.int64)
+    ids[cells] = np.arange(len(cells))
+    flat = np.append(flat, False)
+
+    u, v = [], []
+    for step in (1, width):
+        neighbour = np.minimum(cells + step, flat.size - 1)
+        linked = flat[neighbour]
+        if step == 1:
+            linked &= neighbour % width != 0
+        u.append(np.flatnonzero(linked))
+        v.append(ids[neighbour[linked]])
+    u, v = np.concatenate(u), np.concatenate(v)
+
+    parent = np.arange(len(cells))
+    while True:
+        pu, pv = parent[u], parent[v]
+        hook = pu != pv
+        if not hook.any():
+            break
+        low = np.minimum(pu[hook], pv[hook])
+        high = np.maximum(pu[hook], pv[hook])
+        np.minimum.at(parent, high, low)
+
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    return cells, parent
+
+
+def verify_solution(maze, solution, start, end):
+    """
+    Check that a solution grid marks exactly one start-to-end path.
+
+    The checks are whole-array operations, so they run in milliseconds on
+    mazes of millions of cells:
+
+    - every marked cell is open
+    - start and end are marked
+    - start and end have one marked neighbour, every other marked cell two
+      (no branches, no stray cells)
+    - the marked cells form a single connected component (no separate loops)
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        solution (numpy.ndarray): Grid with non-zero cells on the path
+        start (tuple): Starting position (y, x)
+        end (tuple): Ending position (y, x)
+
+    Returns:
+        list: Problems found, empty when the solution is valid
+    """
+    maze = np.asarray(maze)
+    solution = np.asarray(solution)
+    if solution.shape != maze.shape:
+        return [f"Solution shape {solution.shape} does not match maze shape {maze.shape}"]
+
+    start, end = tuple(start), tuple(end)
+    height, width = maze.shape
+    for name, (y, x) in (('Start', start), ('End', end)):
+        if not (0 <= y < height and 0 <= x < width):
+            return [f"{name} position {(y, x)} is out of bounds"]
+
+    path = solution != 0
+    problems = []
+
+    blocked = int(np.count_nonzero(path & (maze != 0)))
+    if blocked:
+        problems.append(f"{blocked:,} path cells are walls")
+
+    for name, cell in (('Start', start), ('End', end)):
+        if not path[cell]:
+            problems.append(f"{name} {cell} is not on the path")
+    if problems:
+        return problems
+
+    if start == end:
+        if np.count_nonzero(path) != 1:
+            problems.append("Start equals end but more than one cell is marked")
+        return problems
+
+    # Path cells play the part of open cells: count marked neighbours
+    degree = open_neighbor_counts(~path)
+    expected = np.full(maze.shape, 2, dtype=np.uint8)
+    expected[start] = 1
+    expected[end] = 1
+    wrong = path & (degree != expected)
+    if wrong.any():
+        branches = int(np.count_nonzero(wrong & (degree > expected)))
+        ends = int(np.count_nonzero(wrong & (degree < expected)))
+        if branches:
+            problems.append(f"{branches:,} path cells branch")
+        if ends:
+            problems.append(f"{ends:,} path cells are loose ends")
+        return problems
+
+    _, labels = component_labels(path)
+    components = int(np.count_nonzero(labels == np.arange(len(labels))))
+    if components != 1:
+        problems.append(f"Path cells form {components:,} separate pieces")
+
+    return problems
+
+
+def verify_path(maze, path, start, end):
+    """
+    Check that an ordered path is a simple start-to-end walk through open cells.
+
+    Unlike verify_solution this needs the cell order, but it does not
+    depend on how the path looks as a grid: on a maze with loops a valid
+    path can run alongside itself, which the degree check on a solution
+    grid reports as a branch. Checked with whole-array operations:
+
+    - the path starts at start and ends at end
+    - every cell is in bounds and open
+    - consecutive cells are 4-neighbours
+    - no cell is visited twice
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        path (sequence): Cells (y, x) from start to end
+        start (tuple): Starting position (y, x)
+        end (tuple): Ending position (y, x)
+
+    Returns:
+        list: Problems found, empty when the path is valid
+    """
+    maze = np.asarray(maze)
+    cells = np.asarray(path, dtype=np.int64).reshape(-1, 2)
+    if not len(cells):
+        return ["Path is empty"]
+
+    problems = []
+    if tuple(cells[0]) != tuple(start):
+        problems.append(f"Path starts at {tuple(int(v) for v in cells[0])}, not at start {tuple(start)}")
+    if tuple(cells[-1]) != tuple(end):
+        problems.append(f"Path ends at {tuple(int(v) for v in cells[-1])}, not at end {tuple(end)}")
+
+    height, width = maze.shape
+    ys, xs = cells[:, 0], cells[:, 1]
+    outside = int(np.count_nonzero((ys < 0) | (ys >= height) | (xs < 0) | (xs >= width)))
+    if outside:
+        problems.append(f"{outside:,} path cells are out of bounds")
+        return problems
+
+    blocked = int(np.count_nonzero(maze[ys, xs] != 0))
+    if blocked:
+        problems.append(f"{blocked:,} path cells are walls")
+
+    jumps = int(np.count_nonzero(np.abs(np.diff(cells, axis=0)).sum(axis=1) != 1))
+    if jumps:
+        problems.append(f"{jumps:,} steps are not between neighbouring cells")
+
+    repeats = len(cells) - len(np.unique(ys * width + xs))
+    if repeats:
+        problems.append(f"{repeats:,} path cells are visited more than once")
+
+    return problems
+
+
+def is_valid_solution(maze, solution, start, end):
+    return not verify_solution(maze, solution, start, end)
+
+
+if __name__ == "__main__":
+    import glob
+
+    maze_files = glob.glob("mazes/maze_*.json")
+
+    if not maze_files:
+        print("No maze files found in 'mazes/' directory")
+        print("Run 'python maze.py' to create a maze first")
+        sys.exit(0)
+
+    latest_file = max(maze_files, key=os.path.getctime)
+    filename = os.path.basename(latest_file)
+    maze, start, end, maze_data = load_maze(filename)
+
+    if 'solution' not in maze_data:
+        print(f"{filename} has no saved solution; solve it first")
+        sys.exit(0)
+
+    solution = np.array(maze_data['solution'])
+    start_time = time.time()
+    problems = verify_solution(maze, solution, start, end)
+    elapsed = time.time() - start_time
+
+    print(f"Maze: {filename} {maze.shape[0]}x{maze.shape[1]} "
+          f"({maze_data.get('algorithm', 'unknown algorithm')})")
+    if problems:
+        print(f"Solution is INVALID ({elapsed * 1000:.1f} ms):")
+        for problem in problems:
+            print(f"  - {problem}")
+    else:
+        print(f"Solution is valid: {int(np.count_nonzero(solution)):,} cells ({elapsed * 1000:.1f} ms)")
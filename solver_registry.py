@@ -0,0 +1,441 @@
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import metrics
+
+
+# Cell states reported to observers as observer(cells, state)
+CELL_OPEN = 0
+CELL_WALL = 1
+CELL_VISITED = 2
+CELL_PATH = 3
+
+
+SOLVERS = {}
+
+
+def peak_rss():
+    """Peak resident memory of this process in bytes."""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_memory():
+    """Bytes in use now: traced bytes under tracemalloc, otherwise process RSS."""
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # No /proc (macOS): peak RSS is the best cheap approximation
+        return peak_rss()
+
+
+class SolveInterrupted(Exception):
+    """
+    Raised by solver cores when a SolveBudget runs out.
+
+    Carries the partial state: explored (bool grid of cells reached so far),
+    frontier (explored cell closest to the end) and counters.
+    """
+
+    def __init__(self, reason, explored=None, frontier=None, counters=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.explored = explored
+        self.frontier = frontier
+        self.counters = counters or {}
+
+
+class SolveBudget:
+    """
+    Deadline and memory budget checked cheaply from solver inner loops.
+
+    Solvers call exceeded(work) once per unit of progress; the clock and
+    memory are only read after check_interval units of work, so the cost in
+    hot loops is a decrement and a compare. memory_limit is measured as
+    growth (bytes) over the memory in use when the budget was created.
+    """
+
+    def __init__(self, time_limit=None, memory_limit=None, check_interval=4096):
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.check_interval = check_interval
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.base_memory = current_memory() if memory_limit is not None else 0
+        self.reason = None
+        self._countdown = check_interval
+
+    def exceeded(self, work=1):
+        """Return 'timeout' or 'memory_limit' once the budget is spent, else None."""
+        self._countdown -= work
+        if self._countdown > 0:
+            return None
+        self._countdown = self.check_interval
+        return self.check()
+
+    def check(self):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.reason = 'timeout'
+        elif (self.memory_limit is not None and
+              current_memory() - self.base_memory > self.memory_limit):
+            self.reason = 'memory_limit'
+        return self.reason
+
+
+def nearest_cell(explored, target):
+    """Explored cell with the smallest Manhattan distance to target, or None."""
+    ys, xs = np.nonzero(explored)
+    if len(ys) == 0:
+        return None
+    i = int(np.argmin(np.abs(ys - target[0]) + np.abs(xs - target[1])))
+    return (int(ys[i]), int(xs[i]))
+
+
+class SolveResult:
+    """
+    Outcome of one solver run through the registry.
+
+    Attributes:
+        algorithm: Registered solver name
+        status: 'solved', 'no_path', 'step_limit', 'timeout', 'memory_limit', 'invalid'
+            (solved, but the result failed verification) or 'error'
+        path: Cells (y, x) from start to end, or None
+        solution: Solution grid (1 = solution cell), or None
+        steps: Solver-specific step count
+        counters: Extra solver-specific counters
+        solve_time: Seconds spent inside the solver
+        peak_memory: Peak bytes traced by tracemalloc during the run (None if not tracked)
+        error: Error message when status is 'error', the verification problems when 'invalid'
+        explored: For interrupted runs, bool grid of the cells reached so far
+        frontier: For interrupted runs, the explored cell closest to the end
+    """
+
+    def __init__(self, algorithm, status, path=None, solution=None, steps=0, counters=None,
+                 solve_time=0.0, peak_memory=None, error=None, explored=None, frontier=None):
+        self.algorithm = algorithm
+        self.status = status
+        self.path = path
+        self.solution = solution
+        self.steps = steps
+        self.counters = counters or {}
+        self.solve_time = solve_time
+        self.peak_memory = peak_memory
+        self.error = error
+        self.explored = explored
+        self.frontier = frontier
+
+    @property
+    def solved(self):
+        return self.status == 'solved'
+
+    @property
+    def path_length(self):
+        """Moves along the reported path (cells - 1), or None without a path."""
+        if self.path is None:
+            return None
+        return len(self.path) - 1
+
+    def to_dict(self):
+        """JSON-friendly summary (the path and solution grid are left out)."""
+        return {
+            'algorithm': self.algorithm,
+            'status': self.status,
+            'steps': int(self.steps),
+            'path_length': self.path_length,
+            'counters': {k: int(v) for k, v in self.counters.items()},
+            'solve_time': self.solve_time,
+            'peak_memory': self.peak_memory,
+            'error': self.error,
+            'explored_cells': None if self.explored is None else int(np.count_nonzero(self.explored)),
+            'frontier': None if self.frontier is None else list(self.frontier),
+        }
+
+    def __repr__(self):
+        return (f"SolveResult({self.algorithm!r}, status={self.status!r}, steps={self.steps}, "
+                f"path_length={self.path_length}, solve_time={self.solve_time:.3f})")
+
+
+def register_solver(name, description=""):
+    """
+    Decorator registering a headless solver.
+
+    The solver is called as func(maze, start, end, observer=None, budget=None,
+    **options) and returns a dict with 'status', 'path' and optionally 'solution',
+    'steps' and 'counters'. Solvers that honour the budget raise
+    SolveInterrupted when it runs out.
+    """
+    def decorator(func):
+        SOLVERS[name] = (func, description)
+        return func
+    return decorator
+
+
+def available_solvers():
+    """Names of all registered solvers, in registration order."""
+    return list(SOLVERS)
+
+
+def get_solver(name):
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{name}'. Available: {', '.join(SOLVERS)}")
+    return SOLVERS[name][0]
+
+
+def path_to_solution(shape, path):
+    solution = np.zeros(shape, dtype=np.uint8)
+    if path:
+        ys, xs = zip(*path)
+        solution[list(ys), list(xs)] = 1
+    return solution
+
+
+def run_solver(name, maze, start, end, observer=None, track_memory=True, time_limit=None,
+               memory_limit=None, check_interval=4096, verify=True, **options):
+    """
+    Run a registered solver headlessly and collect a SolveResult.
+
+    Args:
+        name (str): Registered solver name
+        maze (numpy.ndarray): The maze to solve
+        start (tuple): Starting position (y, x)
+        end (tuple): Ending position (y, x)
+        observer (callable): Optional observer(cells, state)
+        track_memory (bool): Record peak memory with tracemalloc (slows
+            allocation-heavy solvers down)
+        time_limit (float): Seconds before the solve is stopped
+        memory_limit (int): Bytes of memory growth before the solve is stopped
+        check_interval (int): Units of solver work between budget checks
+        verify (bool): Check a solved result - the ordered path with
+            verify_path when the solver returns one, else the solution grid
+            with verify_solution; a result that is not a single start-to-end
+            path gets status 'invalid'
+        **options: Passed through to the solver
+
+    Returns:
+        SolveResult
+    """
+    func = get_solver(name)
+    start, end = tuple(start), tuple(end)
+
+    tracing = track_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+
+    budget = None
+    if time_limit is not None or memory_limit is not None:
+        budget = SolveBudget(time_limit, memory_limit, check_interval)
+
+    solve_phase = metrics.begin('solve', algorithm=name, cells=int(maze.size))
+    start_time = time.perf_counter()
+    outcome = {'status': 'error', 'path': None}
+    error = None
+    peak_memory = None
+    try:
+        outcome = func(maze, start, end, observer=observer, budget=budget, **options)
+    except SolveInterrupted as e:
+        outcome = {'status': e.reason, 'path': None, 'counters': e.counters,
+                   'steps': e.counters.get('steps', 0),
+                   'explored': e.explored, 'frontier': e.frontier}
+    except (ValueError, RuntimeError) as e:
+        outcome = {'status': 'error', 'path': None}
+        error = str(e)
+    finally:
+        # Anything else propagates, but must not leave tracing on or the
+        # 'solve' phase open for the rest of the thread
+        solve_time = time.perf_counter() - start_time
+        solve_phase.end(**{**(outcome.get('counters') or {}), 'status': outcome['status'],
+                           'steps': outcome.get('steps', 0)})
+        if tracing:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    path = outcome.get('path')
+    solution = outcome.get('solution')
+    if solution is None and path is not None:
+        solution = path_to_solution(maze.shape, path)
+
+    status = outcome['status']
+    if verify and status == 'solved':
+        from solution_verifier import verify_path, verify_solution
+
+        # The grid check reads the path's shape, which misreads a valid path
+        # running alongside itself on a maze with loops; use the order when known
+        if path is not None:
+            problems = verify_path(maze, path, start, end)
+        else:
+            problems = verify_solution(maze, solution, start, end)
+        if problems:
+            status = 'invalid'
+            error = '; '.join(problems)
+
+    return SolveResult(name, status, path=path, solution=solution,
+                       steps=outcome.get('steps', 0), counters=outcome.get('counters'),
+                       solve_time=solve_time, peak_memory=peak_memory, error=error,
+                       explored=outcome.get('explored'), frontier=outcome.get('frontier'))
+
+
+def trace_path(solution, start, end):
+    """
+    Order the cells of a solution grid from start to end.
+
+    Returns None if the marked cells do not form a single unbranched path.
+    """
+    height, width = solution.shape
+    if not solution[start] or not solution[end]:
+        return None
+
+    path = [start]
+    prev = None
+    cur = start
+    while cur != end:
+        y, x = cur
+        nxt = [(y + dy, x + dx) for dy, dx in [(0, 1), (1, 0), (0, -1), (-1, 0)]
+               if 0 <= y + dy < height and 0 <= x + dx < width
+               and solution[y + dy, x + dx] and (y + dy, x + dx) != prev]
+        if len(nxt) != 1:
+            return None
+        prev, cur = cur, nxt[0]
+        path.append(cur)
+    return path
+
+
+def erase_loops(walk):
+    """Reduce a walk to a simple path by cutting out every revisited loop."""
+    path = []
+    position = {}
+    for cell in walk:
+        if cell in position:
+            for dropped in path[position[cell] + 1:]:
+                del position[dropped]
+            del path[position[cell] + 1:]
+        else:
+            position[cell] = len(path)
+            path.append(cell)
+    return path
+
+
+def _emit_path(observer, path):
+    if observer and path:
+        observer(path, CELL_PATH)
+
+
+@register_solver('recursive_backtracking', "Depth-first search with backtracking")
+def _solve_recursive_backtracking(maze, start, end, observer=None, budget=None):
+    from recursive_backtracking import backtrack_search
+
+    path, steps = backtrack_search(maze, start, end, observer=observer, budget=budget)
+    return {'status': 'solved' if path else 'no_path', 'path': path, 'steps': steps}
+
+
+@register_solver('dead_end_filling', "Fill dead ends until only the solution remains")
+def _solve_dead_end_filling(maze, start, end, observer=None, budget=None, backend='auto'):
+    from dead_end_solver import fill_dead_ends
+
+    working_maze = maze.copy()
+    iterations, cells_filled = fill_dead_ends(working_maze, start, end, observer=observer,
+                                               budget=budget, backend=backend)
+    solution = (working_maze == 0).astype(np.uint8)
+    status = 'solved' if solution[start] and solution[end] else 'no_path'
+
+    # On mazes with loops the remaining cells are not a single path; the
+    # shortest path through them is reported instead
+    path = trace_path(solution, start, end)
+    if path is None and status == 'solved':
+        from distance_field import compute_distance_field, path_from_distance_field
+
+        dist = compute_distance_field(working_maze != 0, start, stop_at=end)
+        path = path_from_distance_field(dist, end)
+        solution = path_to_solution(maze.shape, path)
+    _emit_path(observer, path)
+    return {'status': status, 'path': path, 'solution': solution, 'steps': iterations,
+            'counters': {'iterations': iterations, 'cells_filled': cells_filled}}
+
+
+@register_solver('left_hand', "Wall follower keeping the left hand on the wall")
+def _solve_left_hand(maze, start, end, observer=None, budget=None, max_steps=10000000,
+                     backend='auto'):
+    from left_hand_algo import left_hand_walk
+
+    walk, steps, status = left_hand_walk(maze, start, end, max_steps=max_steps,
+                                        observer=observer, budget=budget, backend=backend)
+    if status != 'solved':
+        return {'status': status, 'path': None, 'steps': steps}
+
+    path = erase_loops([start] + walk)
+    return {'status': status, 'path': path, 'steps': steps,
+            'counters': {'walk_length': len(walk)}}
+
+
+@register_solver('wavefront_bfs', "Vectorized BFS wavefront with descent")
+def _solve_wavefront(maze, start, end, observer=None, budget=None):
+    from distance_field import compute_distance_field, path_from_distance_field
+
+    dist = compute_distance_field(maze, start, stop_at=end, budget=budget)
+    if dist[end] < 0:
+        return {'status': 'no_path', 'path': None,
+                'counters': {'cells_reached': int(np.count_nonzero(dist >= 0))}}
+
+    path = path_from_distance_field(dist, end)
+    _emit_path(observer, path)
+    return {'status': 'solved', 'path': path, 'steps': int(dist[end]),
+            'counters': {'cells_reached': int(np.count_nonzero(dist >= 0))}}
+
+
+@register_solver('junction_graph', "Dijkstra on the corridor-contracted graph")
+def _solve_junction_graph(maze, start, end, observer=None, budget=None, graph=None):
+    from junction_graph import JunctionGraph
+
+    if graph is None:
+        graph = JunctionGraph.build(maze, keep=(start, end), budget=budget)
+
+    result = graph.shortest_path(start, end)
+    counters = {'nodes': graph.node_count, 'edges': graph.edge_count}
+    if result is None:
+        return {'status': 'no_path', 'path': None, 'counters': counters}
+
+    nodes, edges, length = result
+    solution = graph.expand(nodes, edges)
+    path = trace_path(solution, start, end)
+    _emit_path(observer, path)
+    return {'status': 'solved', 'path': path, 'solution': solution, 'steps': length,
+            'counters': counters}
+
+
+@register_solver('tree_index', "LCA query on a perfect-maze tree index")
+def _solve_tree_index(maze, start, end, observer=None, budget=None, index=None):
+    from tree_index import MazeTreeIndex
+
+    if index is None:
+        index = MazeTreeIndex.build(maze, root=start, budget=budget)
+
+    path = index.path(start, end)
+    _emit_path(observer, path)
+    return {'status': 'solved', 'path': path, 'steps': len(path) - 1}
+
+
+@register_solver('hierarchical', "HPA*-style search over maze tiles")
+def _solve_hierarchical(maze, start, end, observer=None, budget=None, index=None, tile_size=64):
+    from hierarchical_solver import HierarchicalIndex
+
+    if index is None:
+        index = HierarchicalIndex.build(maze, tile_size=tile_size, budget=budget)
+
+    path = index.path(maze, start, end)
+    if path is None:
+        return {'status': 'no_path', 'path': None}
+    _emit_path(observer, path)
+    return {'status': 'solved', 'path': path, 'steps': len(path) - 1,
+            'counters': {'entrances': index.node_count}}
+
+
+def run_all(maze, start, end, names=None, **kwargs):
+    """Run several registered solvers (all by default) and return their results."""
+    return [run_solver(name, maze, start, end, **kwargs) for name in (names or available_solvers())]
@@ -0,0 +1,216 @@
+import gzip
+import os
+import sys
+import time
+
+import numpy as np
+
+from maze_render import BLACK, BLUE, GREEN, RED, WHITE
+
+
+# Cells handled per band of run detection; bounds the temporary arrays
+BAND_CELLS = 1 << 22
+
+# Path commands joined per write
+WRITE_BATCH = 1 << 16
+
+
+def _hex(color):
+    return '#%02x%02x%02x' % tuple(color)
+
+
+def find_runs(cells):
+    """
+    Runs of True along the rows of a 2D bool array.
+
+    Returns:
+        tuple: (rows, first, last) int arrays, one entry per run, in row
+        order; first and last are the columns of the run's end cells
+    """
+    height, width = cells.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = cells
+    edges = np.diff(padded, axis=1)
+    # nonzero walks row by row, so the n-th start and n-th end belong to the same run
+    rows, first = np.nonzero(edges == 1)
+    _, stop = np.nonzero(edges == -1)
+    return rows, first, stop - 1
+
+
+def _segments(rows, first, last, horizontal):
+    # Path commands from cell (row, first) to (row, last); coordinates are
+    # doubled so cell centers are odd integers
+    rows, first, last = rows * 2 + 1, first * 2 + 1, last * 2 + 1
+    if horizontal:
+        return map('M{1} {0}H{2}'.format, rows.tolist(), first.tolist(), last.tolist())
+    return map('M{0} {1}V{2}'.format, rows.tolist(), first.tolist(), last.tolist())
+
+
+def wall_segments(maze, band_cells=BAND_CELLS):
+    """
+    Path commands drawing every wall cell, merged into horizontal and vertical runs.
+
+    Wall cells in a horizontal run of two or more become one horizontal
+    segment, those in a vertical run of two or more one vertical segment
+    (cells at corners are in both), and isolated cells zero-length
+    segments. Drawn with a two-unit stroke and square caps, in a viewBox
+    of twice the maze size, the segments cover exactly the wall cells.
+    Runs are found band by band with NumPy, so the commands can be
+    streamed for mazes of any size.
+
+    Yields:
+        str: Path commands for one band
+    """
+    height, width = maze.shape
+
+    row_band = max(1, band_cells // max(1, width))
+    for y0 in range(0, height, row_band):
+        y1 = min(height, y0 + row_band)
+        rows, first, last = find_runs(np.asarray(maze[y0:y1]) != 0)
+        keep = last > first
+        yield ''.join(_segments(rows[keep] + y0, first[keep], last[keep], True))
+
+    col_band = max(1, band_cells // max(1, height))
+    for x0 in range(0, width, col_band):
+        x1 = min(width, x0 + col_band)
+        cols, first, last = find_runs((np.asarray(maze[:, x0:x1]) != 0).T)
+        keep = last > first
+        yield ''.join(_segments(cols[keep] + x0, first[keep], last[keep], False))
+
+    # Cells with no wall neighbor in either direction
+    for y0 in range(0, height, row_band):
+        y1 = min(height, y0 + row_band)
+        lo, hi = max(0, y0 - 1), min(height, y1 + 1)
+        walls = np.zeros((hi - lo + 2, width + 2), dtype=bool)
+        walls[1:-1, 1:-1] = np.asarray(maze[lo:hi]) != 0
+        center = walls[1:-1, 1:-1]
+        alone = center & ~walls[1:-1, :-2] & ~walls[1:-1, 2:] & ~walls[:-2, 1:-1] & ~walls[2:, 1:-1]
+        ys, xs = np.nonzero(alone[y0 - lo:y1 - lo])
+        yield ''.join(_segments(ys + y0, xs, xs, True))
+
+
+def solution_points(solution, start, end):
+    """
+    Corner points of the solution path, or None if it is not a single path.
+
+    Returns:
+        numpy.ndarray: (n, 2) cells (y, x) where the path turns, with start and end
+    """
+    from solver_registry import trace_path
+
+    path = trace_path(solution, tuple(start), tuple(end))
+    if path is None:
+        return None
+    path = np.asarray(path)
+    if len(path) < 3:
+        return path
+    steps = np.diff(path, axis=0)
+    turns = np.flatnonzero((steps[1:] != steps[:-1]).any(axis=1)) + 1
+    return path[np.concatenate([[0], turns, [len(path) - 1]])]
+
+
+def write_maze_svg(maze, output_path, cell_size=4, solution=None, start=None, end=None,
+                   band_cells=BAND_CELLS):
+    """
+    Stream a maze as an SVG of merged wall runs.
+
+    The solution, if given, is drawn as one polyline through its corners
+    (or as merged runs when it is not a single start-to-end path). A path
+    ending in .svgz is gzip-compressed.
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        output_path (str): SVG file to write
+        cell_size (int): Nominal pixels per cell (the SVG scales freely)
+        solution (numpy.ndarray): Optional solution grid
+        start (tuple): Optional start cell (y, x)
+        end (tuple): Optional end cell (y, x)
+
+    Returns:
+        dict: Counts of path segments and polyline points written
+    """
+    height, width = maze.shape
+    opener = gzip.open if output_path.endswith('.svgz') else open
+    counts = {'wall_segments': 0, 'solution_points': 0}
+
+    with opener(output_path, 'wt', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * cell_size}" '
+                f'height="{height * cell_size}" viewBox="0 0 {width * 2} {height * 2}" '
+                f'shape-rendering="crispEdges">\n')
+        f.write(f'<rect width="{width * 2}" height="{height * 2}" fill="{_hex(WHITE)}"/>\n')
+
+        f.write(f'<path fill="none" stroke="{_hex(BLACK)}" stroke-width="2" stroke-linecap="square" d="')
+        for commands in wall_segments(maze, band_cells):
+            counts['wall_segments'] += commands.count('M')
+            f.write(commands)
+        f.write('"/>\n')
+
+        if solution is not None:
+            points = None
+            if start is not None and end is not None:
+                points = solution_points(solution, start, end)
+            if points is not None:
+                counts['solution_points'] = len(points)
+                f.write(f'<polyline fill="none" stroke="{_hex(BLUE)}" stroke-width="2" '
+                        f'stroke-linecap="square" stroke-linejoin="miter" points="')
+                coords = points[:, ::-1] * 2 + 1
+                for i in range(0, len(coords), WRITE_BATCH):
+                    f.write(' '.join(map('{0[0]},{0[1]}'.format, coords[i:i + WRITE_BATCH].tolist())))
+                    f.write(' ')
+                f.write('"/>\n')
+            else:
+                # Not one path (mazes with loops): merged runs of solution cells
+                f.write(f'<path fill="none" stroke="{_hex(BLUE)}" stroke-width="2" '
+                        f'stroke-linecap="square" d="')
+                marked = np.asarray(solution) != 0
+                for commands in wall_segments(marked & (np.asarray(maze) == 0), band_cells):
+                    f.write(commands)
+                f.write('"/>\n')
+
+        for cell, color in ((start, GREEN), (end, RED)):
+            if cell is not None:
+                f.write(f'<rect x="{cell[1] * 2}" y="{cell[0] * 2}" width="2" height="2" '
+                        f'fill="{_hex(color)}"/>\n')
+        f.write('</svg>\n')
+
+    return counts
+
+
+def main():
+    import argparse
+
+    from dead_end_solver import load_maze
+
+    parser = argparse.ArgumentParser(description="Export a maze as an SVG of merged wall runs")
+    parser.add_argument('maze', help="Maze JSON file")
+    parser.add_argument('--cell-size', type=int, default=4, help="Nominal pixels per cell (default: 4)")
+    parser.add_argument('--solution', action='store_true', help="Draw the saved solution")
+    parser.add_argument('--output', help="Output .svg or .svgz (default: next to the maze file)")
+    args = parser.parse_args()
+
+    directory, filename = os.path.split(args.maze)
+    maze, start, end, data = load_maze(filename, directory or "mazes")
+
+    solution = None
+    if args.solution:
+        if 'solution' not in data:
+            print(f"{filename} has no saved solution")
+            sys.exit(1)
+        solution = np.array(data['solution'], dtype=np.uint8)
+
+    output_path = args.output or os.path.join(directory or "mazes", filename.replace('.json', '.svg'))
+    height, width = maze.shape
+    print(f"Streaming {width}x{height} maze as SVG...")
+
+    start_time = time.time()
+    counts = write_maze_svg(maze, output_path, args.cell_size, solution, start, end)
+    elapsed = time.time() - start_time
+
+    file_size = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"SVG saved: {output_path} ({file_size:.2f} MB, {counts['wall_segments']:,} wall segments "
+          f"for {int(np.count_nonzero(maze)):,} wall cells, {elapsed:.1f} seconds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import pytest
+
+from benchmark_compare import compare_reports, compare_result, is_regression
+
+MB = 1024 * 1024
+
+
+def result(case='solve:left_hand', median=1.0, spread=0.0, status='ok', peak_rss=100 * MB):
+    # spread is (p95 - min) / median, split evenly around the median
+    if status != 'ok':
+        return {'case': case, 'width': 201, 'height': 201, 'preset': '1', 'status': status,
+                'peak_rss': peak_rss}
+    return {'case': case, 'width': 201, 'height': 201, 'preset': '1', 'status': 'ok',
+            'median': median, 'min': median * (1 - spread / 2), 'p95': median * (1 + spread / 2),
+            'peak_rss': peak_rss}
+
+
+def test_within_tolerance_is_ok():
+    comparison = compare_result(result(median=1.0), result(median=1.05))
+    assert comparison['verdict'] == 'ok'
+    assert not is_regression(comparison)
+
+
+def test_slowdown_is_regression():
+    comparison = compare_result(result(median=1.0), result(median=1.2))
+    assert comparison['verdict'] == 'regression'
+    assert is_regression(comparison)
+
+
+def test_speedup_is_improvement():
+    comparison = compare_result(result(median=1.0), result(median=0.8))
+    assert comparison['verdict'] == 'improvement'
+    assert not is_regression(comparison)
+
+
+def test_spread_widens_allowed_change():
+    quiet = compare_result(result(median=1.0), result(median=1.2))
+    noisy = compare_result(result(median=1.0, spread=0.3), result(median=1.2))
+    assert noisy['limit'] == pytest.approx(quiet['limit'] + 0.3)
+    assert quiet['verdict'] == 'regression'
+    assert noisy['verdict'] == 'ok'
+
+
+def test_tiny_absolute_change_is_ok():
+    # +100% but only 2 ms, under MIN_DELTA
+    comparison = compare_result(result(median=0.002), result(median=0.004))
+    assert comparison['verdict'] == 'ok'
+
+
+def test_failed_and_fixed():
+    failed = compare_result(result(), result(status='timeout'))
+    assert failed['verdict'] == 'failed'
+    assert is_regression(failed)
+
+    fixed = compare_result(result(status='timeout'), result())
+    assert fixed['verdict'] == 'fixed'
+    assert not is_regression(fixed)
+
+    still = compare_result(result(status='error'), result(status='timeout'))
+    assert still['verdict'] == 'still failing'
+
+
+def test_memory_regression():
+    grown = compare_result(result(peak_rss=100 * MB), result(peak_rss=150 * MB))
+    assert grown['verdict'] == 'ok'
+    assert grown['memory_verdict'] == 'regression'
+    assert is_regression(grown)
+
+    # +20% but only 8 MB, under MIN_MEMORY_DELTA
+    small = compare_result(result(peak_rss=40 * MB), result(peak_rss=48 * MB))
+    assert small['memory_verdict'] == 'ok'
+
+
+def test_compare_reports_matches_cases():
+    base = {'results': [result('generate'), result('solve:left_hand'), result('solve:wavefront_bfs')]}
+    new = {'results': [result('solve:left_hand', median=1.5), result('generate'), result('solve:junction_graph')]}
+
+    comparisons, missing, added = compare_reports(base, new)
+
+    verdicts = {c['case']: c['verdict'] for c in comparisons}
+    assert verdicts == {'solve:left_hand': 'regression', 'generate': 'ok'}
+    assert missing == [('solve', 'wavefront_bfs', '201x201')]
+    assert added == [('solve', 'junction_graph', '201x201')]
+
+
+def test_compare_reports_passes_thresholds():
+    base = {'results': [result(median=1.0)]}
+    new = {'results': [result(median=1.2)]}
+    comparisons, _, _ = compare_reports(base, new, tolerance=0.5)
+    assert comparisons[0]['verdict'] == 'ok'
@@ -0,0 +1,41 @@
+import random
+
+import numpy as np
+import pytest
+
+from distance_field import compute_distance_field
+from incremental_solver import IncrementalSolver
+from large_maze_generator import LargeMazeGenerator
+from solution_verifier import verify_path
+
+
+def fresh_length(maze, start, end):
+    dist = compute_distance_field(maze, start, stop_at=end)
+    return None if dist[end] < 0 else int(dist[end])
+
+
+@pytest.mark.parametrize('reseed_limit', [None, 40])
+@pytest.mark.parametrize('seed', range(40))
+def test_random_edits_match_fresh_bfs(seed, reseed_limit):
+    random.seed(seed)
+    maze = LargeMazeGenerator(31, 31, verbose=False).generate_iterative(visualize=False)
+    start, end = (1, 1), (29, 29)
+    solver = IncrementalSolver(maze, start, end, reseed_limit=reseed_limit)
+
+    rng = np.random.default_rng(seed)
+    for _ in range(60):
+        # Mostly single toggles, sometimes a batch; the end may be walled in
+        cells = set()
+        while len(cells) < rng.choice([1, 1, 1, 3]):
+            cell = tuple(int(v) for v in rng.integers(1, 30, size=2))
+            if cell != start:
+                cells.add(cell)
+        result = solver.toggle_cells(sorted(cells))
+
+        assert result['path_length'] == fresh_length(maze, start, end)
+        if result['path_length'] is not None:
+            assert verify_path(maze, solver.path, start, end) == []
+            assert np.array_equal(np.argwhere(solver.solution), sorted(solver.path))
+
+    if reseed_limit is not None:
+        assert solver.reseeds > 0
@@ -0,0 +1,52 @@
+import os
+import random
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pytest
+
+from large_maze_generator import LargeMazeGenerator
+from maze_import import import_maze_image
+from maze_render import save_maze_image
+from png_stream import write_maze_png
+from solver_registry import run_solver
+
+
+@pytest.fixture(scope='module')
+def solved_maze():
+    random.seed(7)
+    maze = LargeMazeGenerator(41, 25, verbose=False).generate_iterative(visualize=False)
+    start, end = (1, 1), (maze.shape[0] - 2, maze.shape[1] - 2)
+    result = run_solver('wavefront_bfs', maze, start, end, track_memory=False)
+    return maze, start, end, result.solution
+
+
+@pytest.mark.parametrize('cell_size', [1, 2, 3, 5, 8])
+@pytest.mark.parametrize('writer', ['save_maze_image', 'write_maze_png'])
+def test_round_trip(tmp_path, solved_maze, writer, cell_size):
+    maze, start, end, solution = solved_maze
+    path = str(tmp_path / "maze.png")
+    if writer == 'save_maze_image':
+        save_maze_image(maze, path, cell_size, "Round trip", solution=solution, start=start, end=end)
+    else:
+        write_maze_png(maze, path, cell_size, solution, start, end)
+
+    imported, imported_start, imported_end, imported_solution, imported_size = import_maze_image(path)
+
+    assert imported_size == cell_size
+    assert np.array_equal(imported, maze)
+    assert (imported_start, imported_end) == (start, end)
+    assert np.array_equal(imported_solution, solution)
+
+
+def test_maze_without_solution(tmp_path, solved_maze):
+    maze, start, end, _ = solved_maze
+    path = str(tmp_path / "maze.png")
+    write_maze_png(maze, path, 4, None, start, end)
+
+    imported, _, _, imported_solution, _ = import_maze_image(path)
+
+    assert np.array_equal(imported, maze)
+    assert imported_solution is None
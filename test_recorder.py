@@ -0,0 +1,30 @@
+import os
+import random
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pygame
+
+from large_maze_generator import LargeMazeGenerator
+from recorder import Recorder
+from maze_render import WHITE
+
+
+def test_block_reduced_frames_keep_open_cells(tmp_path):
+    random.seed(1)
+    maze = LargeMazeGenerator(201, 201).generate_iterative(visualize=False)
+    end = (maze.shape[0] - 2, maze.shape[1] - 2)
+
+    # A 201 maze in 64 px frames: blocks of 4x4 cells per pixel
+    with Recorder(maze, str(tmp_path / "frames"), (1, 1), end, frames=2, max_size=64) as recorder:
+        assert recorder.block > 1
+        frame = recorder._frame_codes()
+        recorder.capture()
+
+    assert np.count_nonzero(frame == 0) > frame.size // 2
+
+    image = pygame.image.load(str(tmp_path / "frames" / "frame_00000.png"))
+    pixels = pygame.surfarray.array3d(image)
+    assert np.all(pixels == WHITE, axis=2).sum() > frame.size // 2
@@ -0,0 +1,88 @@
+import numpy as np
+
+from solution_verifier import verify_path, verify_solution
+
+
+# A 9x9 room: open inside the border except for one wall cell at (4, 4)
+MAZE = np.ones((9, 9), dtype=np.uint8)
+MAZE[1:-1, 1:-1] = 0
+MAZE[4, 4] = 1
+START, END = (1, 1), (7, 7)
+
+# Along the top row, then down the right-hand column
+PATH = [(1, x) for x in range(1, 8)] + [(y, 7) for y in range(2, 8)]
+
+
+def grid(cells):
+    solution = np.zeros_like(MAZE)
+    for cell in cells:
+        solution[cell] = 1
+    return solution
+
+
+def test_solution_valid():
+    assert verify_solution(MAZE, grid(PATH), START, END) == []
+
+
+def test_solution_branch():
+    problems = verify_solution(MAZE, grid(PATH + [(2, 3)]), START, END)
+    assert problems == ["1 path cells branch", "1 path cells are loose ends"]
+
+
+def test_solution_disconnected_loop():
+    loop = [(3, 2), (3, 3), (4, 2), (4, 3)]
+    problems = verify_solution(MAZE, grid(PATH + loop), START, END)
+    assert problems == ["Path cells form 2 separate pieces"]
+
+
+def test_solution_missing_start_and_end():
+    assert verify_solution(MAZE, grid(PATH[1:]), START, END) == ["Start (1, 1) is not on the path"]
+    assert verify_solution(MAZE, grid(PATH[:-1]), START, END) == ["End (7, 7) is not on the path"]
+
+
+def test_solution_on_wall():
+    row = [(4, x) for x in range(1, 8)]
+    problems = verify_solution(MAZE, grid(row), (4, 1), (4, 7))
+    assert problems == ["1 path cells are walls"]
+
+
+def test_solution_shape_and_bounds():
+    assert verify_solution(MAZE, np.zeros((3, 3)), START, END)[0].startswith("Solution shape")
+    assert verify_solution(MAZE, grid(PATH), START, (9, 9)) == ["End position (9, 9) is out of bounds"]
+
+
+def test_path_valid():
+    assert verify_path(MAZE, PATH, START, END) == []
+
+
+def test_path_alongside_itself():
+    # A valid walk that doubles back next to itself: the grid check sees
+    # extra neighbours, the ordered check does not
+    path = [(1, 1), (1, 2), (2, 2), (2, 1), (3, 1), (3, 2), (3, 3)]
+    assert verify_path(MAZE, path, (1, 1), (3, 3)) == []
+    assert verify_solution(MAZE, grid(path), (1, 1), (3, 3)) != []
+
+
+def test_path_endpoints():
+    problems = verify_path(MAZE, PATH[1:-1], START, END)
+    assert problems == ["Path starts at (1, 2), not at start (1, 1)",
+                        "Path ends at (6, 7), not at end (7, 7)"]
+    assert verify_path(MAZE, [], START, END) == ["Path is empty"]
+
+
+def test_path_on_wall():
+    row = [(4, x) for x in range(1, 8)]
+    assert verify_path(MAZE, row, (4, 1), (4, 7)) == ["1 path cells are walls"]
+
+
+def test_path_jump_and_repeat():
+    jump = PATH[:3] + PATH[4:]
+    assert verify_path(MAZE, jump, START, END) == ["1 steps are not between neighbouring cells"]
+
+    repeat = PATH[:3] + [PATH[1], PATH[2]] + PATH[3:]
+    assert verify_path(MAZE, repeat, START, END) == ["2 path cells are visited more than once"]
+
+
+def test_path_out_of_bounds():
+    path = [(1, 1), (0, 1), (-1, 1)]
+    assert verify_path(MAZE, path, START, (-1, 1)) == ["1 path cells are out of bounds"]
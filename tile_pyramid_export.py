@@ -0,0 +1,341 @@
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from maze_render import BLUE, OPEN, PALETTE, cell_codes
+from png_stream import StreamingPNGWriter
+
+
+TILE_SIZE = 256
+
+# Maze cells reduced per band when building the first reduced level
+BAND_CELLS = 1 << 22
+
+# Base layer palette: the maze colors, then gray levels for zoomed-out
+# pixels that cover several cells (shade = fraction of open cells)
+GRAY_OFFSET = len(PALETTE)
+GRAY_LEVELS = 256 - GRAY_OFFSET
+BASE_PALETTE = np.vstack([
+    PALETTE,
+    np.repeat(np.round(np.linspace(0, 255, GRAY_LEVELS)).astype(np.uint8)[:, None], 3, axis=1),
+])
+
+# Solution overlay: transparent everywhere except the path
+OVERLAY_PALETTE = np.array([(0, 0, 0), BLUE], dtype=np.uint8)
+OVERLAY_ALPHA = np.array([0, 255], dtype=np.uint8)
+
+
+class TilePyramid:
+    """
+    Multi-resolution XYZ tile pyramid over a maze, rendered on demand.
+
+    At the deepest zoom every cell is cell_size pixels; each level up halves
+    the scale. Levels where a pixel still covers at least one cell are cut
+    straight from the cell codes and scaled up with broadcasting. Coarser
+    levels come from block reduction: open-cell counts are summed over 2x2
+    blocks, one level at a time, and each pixel is shaded by its open
+    fraction; a solution flag per block (any solution cell) feeds the
+    overlay. The first level is reduced from the maze band by band, and
+    counts use the smallest dtype that holds them, so all reduced levels
+    together take about a third of a byte per cell. Levels are built the
+    first time a tile needs them, or passed in prebuilt (see reduce_all).
+
+    Tiles are addressed as (layer, z, x, y) with layer 'maze' or 'solution'.
+    """
+
+    def __init__(self, maze, solution=None, start=None, end=None, cell_size=4, tile_size=TILE_SIZE,
+                 reduced=None):
+        if cell_size < 1 or cell_size & (cell_size - 1) or cell_size > tile_size:
+            raise ValueError(f"cell_size must be a power of two up to {tile_size}, got {cell_size}")
+
+        self.maze = maze
+        self.solution = solution
+        self.start = start
+        self.end = end
+        self.cell_size = cell_size
+        self.tile_size = tile_size
+
+        height, width = maze.shape
+        self.max_zoom = max(0, math.ceil(math.log2(max(height, width) * cell_size / tile_size)))
+        self._reduced = dict(reduced or {})
+
+    def layers(self):
+        return ['maze'] + (['solution'] if self.solution is not None else [])
+
+    def scale(self, z):
+        """Pixels per cell at zoom z (below 1 when a pixel covers several cells)."""
+        return self.cell_size * 2.0 ** (z - self.max_zoom)
+
+    def image_size(self, z):
+        height, width = self.maze.shape
+        scale = self.scale(z)
+        return math.ceil(width * scale), math.ceil(height * scale)
+
+    def tile_counts(self, z):
+        img_width, img_height = self.image_size(z)
+        return math.ceil(img_width / self.tile_size), math.ceil(img_height / self.tile_size)
+
+    def reduced_blocks(self):
+        """Block sizes (cells per pixel side) of the reduced zoom levels, finest first."""
+        return [int(round(1 / self.scale(z))) for z in range(self.max_zoom, -1, -1) if self.scale(z) < 1]
+
+    def reduce_all(self):
+        """
+        Build every reduced level.
+
+        Returns:
+            dict: block -> (open counts, solution flags or None), ready to
+            pass as `reduced` to another TilePyramid over the same maze
+        """
+        for block in self.reduced_blocks():
+            self._reduced_counts(block)
+        return dict(self._reduced)
+
+    def _reduced_counts(self, block):
+        # Open cell counts and solution flags per block x block group, built
+        # by repeated 2x2 reductions from the next finer level
+        if block not in self._reduced:
+            dtype = np.min_scalar_type(block * block)
+            if block == 2:
+                height, width = self.maze.shape
+                band = max(2, BAND_CELLS // width // 2 * 2)
+                open_count = np.empty(((height + 1) // 2, (width + 1) // 2), dtype=dtype)
+                on_path = None if self.solution is None else np.empty_like(open_count)
+                for y0 in range(0, height, band):
+                    rows = slice(y0, y0 + band)
+                    out = slice(y0 // 2, (y0 + band) // 2)
+                    open_count[out] = self._reduce_2x2(np.asarray(self.maze[rows]) == 0, dtype)
+                    if on_path is not None:
+                        on_path[out] = self._reduce_2x2(np.asarray(self.solution[rows]) != 0, np.uint8, any_cell=True)
+            else:
+                finer_open, finer_path = self._reduced_counts(block // 2)
+                open_count = self._reduce_2x2(finer_open, dtype)
+                on_path = None if finer_path is None else self._reduce_2x2(finer_path, np.uint8, any_cell=True)
+            self._reduced[block] = (open_count, on_path)
+        return self._reduced[block]
+
+    @staticmethod
+    def _reduce_2x2(values, dtype, any_cell=False):
+        # Sum of each 2x2 group in dtype, or 1 where any of it is set
+        height, width = values.shape
+        padded = np.zeros((height + height % 2, width + width % 2), dtype=dtype)
+        padded[:height, :width] = values
+        groups = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+        return groups.max(axis=(1, 3)) if any_cell else groups.sum(axis=(1, 3), dtype=dtype)
+
+    def tile(self, layer, z, x, y):
+        """
+        Render one tile.
+
+        Returns:
+            numpy.ndarray: (tile_size, tile_size) uint8 palette indices into
+            BASE_PALETTE ('maze') or OVERLAY_PALETTE ('solution'); pixels
+            beyond the maze are white / transparent
+        """
+        if layer not in self.layers():
+            raise ValueError(f"Unknown layer '{layer}'")
+        if not 0 <= z <= self.max_zoom:
+            raise ValueError(f"Zoom {z} outside 0-{self.max_zoom}")
+
+        size = self.tile_size
+        tile = np.full((size, size), OPEN if layer == 'maze' else 0, dtype=np.uint8)
+        scale = self.scale(z)
+
+        if scale >= 1:
+            scale = int(scale)
+            span = size // scale
+            rows = slice(y * span, (y + 1) * span)
+            cols = slice(x * span, (x + 1) * span)
+            if layer == 'maze':
+                # Codes for the tile's columns only; start and end shift with the window
+                window = self.maze[:, cols]
+                first, stop = cols.start, cols.start + window.shape[1]
+                start, end = ((cell[0], cell[1] - first) if cell is not None and first <= cell[1] < stop
+                              else None for cell in (self.start, self.end))
+                values = cell_codes(window, None, start, end, rows)
+            else:
+                values = (np.asarray(self.solution[rows, cols]) != 0).astype(np.uint8)
+            h, w = values.shape
+            tile[:h * scale, :w * scale] = np.broadcast_to(
+                values[:, None, :, None], (h, scale, w, scale)).reshape(h * scale, w * scale)
+        else:
+            block = int(round(1 / scale))
+            open_count, on_path = self._reduced_counts(block)
+            rows = slice(y * size, (y + 1) * size)
+            cols = slice(x * size, (x + 1) * size)
+            if layer == 'maze':
+                fraction = open_count[rows, cols] / float(block * block)
+                values = (GRAY_OFFSET + np.round(fraction * (GRAY_LEVELS - 1))).astype(np.uint8)
+            else:
+                values = on_path[rows, cols]
+            tile[:values.shape[0], :values.shape[1]] = values
+
+        return tile
+
+    def write_tile(self, directory, layer, z, x, y):
+        path = os.path.join(directory, layer, str(z), str(x), f"{y}.png")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if layer == 'maze':
+            palette, alpha = BASE_PALETTE, None
+        else:
+            palette, alpha = OVERLAY_PALETTE, OVERLAY_ALPHA
+        with StreamingPNGWriter(path, self.tile_size, self.tile_size, palette=palette, alpha=alpha) as writer:
+            writer.write_rows(self.tile(layer, z, x, y))
+        return path
+
+    def metadata(self):
+        height, width = self.maze.shape
+        return {
+            'maze_shape': [height, width],
+            'tile_size': self.tile_size,
+            'cell_size': self.cell_size,
+            'min_zoom': 0,
+            'max_zoom': self.max_zoom,
+            'layers': {layer: f"{layer}/{{z}}/{{x}}/{{y}}.png" for layer in self.layers()},
+            'levels': [{'zoom': z, 'image_size': list(self.image_size(z)),
+                        'tiles': list(self.tile_counts(z))} for z in range(self.max_zoom + 1)],
+        }
+
+
+# Set in each worker by _attach_pyramid; the SharedMemory handles must stay
+# referenced for as long as the array views are used
+_worker = {}
+
+
+def _attach_pyramid(arrays, start, end, cell_size, blocks):
+    views = {}
+    for key, (shm_name, shape, dtype) in arrays.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker.setdefault('shm', []).append(shm)
+        views[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    reduced = {block: (views[f'open_{block}'], views.get(f'path_{block}')) for block in blocks}
+    _worker['pyramid'] = TilePyramid(views['maze'], views.get('solution'), start, end, cell_size,
+                                     reduced=reduced)
+
+
+def _write_tile_column(directory, layer, z, x):
+    pyramid = _worker['pyramid']
+    _, rows = pyramid.tile_counts(z)
+    for y in range(rows):
+        pyramid.write_tile(directory, layer, z, x, y)
+    return rows
+
+
+def export_pyramid(maze, directory, solution=None, start=None, end=None, cell_size=4, workers=None):
+    """
+    Write every tile of the pyramid, one tile column per task across worker processes.
+
+    The reduced levels are built once here; they, the maze and the
+    solution are shared with the workers through shared memory, so workers
+    add no per-cell memory of their own.
+
+    Args:
+        maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+        directory (str): Output directory; tiles go to <layer>/<z>/<x>/<y>.png
+        solution (numpy.ndarray): Optional solution grid, written as a
+            transparent 'solution' overlay layer
+        start (tuple): Optional start cell (y, x), drawn on the base layer
+        end (tuple): Optional end cell (y, x), drawn on the base layer
+        cell_size (int): Pixels per cell at the deepest zoom (power of two)
+        workers (int): Worker processes (all cores by default)
+
+    Returns:
+        dict: Pyramid metadata, also written to tiles.json
+    """
+    pyramid = TilePyramid(maze, solution, start, end, cell_size)
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    tasks = [(layer, z, x) for layer in pyramid.layers() for z in range(pyramid.max_zoom + 1)
+             for x in range(pyramid.tile_counts(z)[0])]
+
+    reduced = pyramid.reduce_all()
+    shared = [('maze', maze), ('solution', solution)]
+    for block, (open_count, on_path) in reduced.items():
+        shared += [(f'open_{block}', open_count), (f'path_{block}', on_path)]
+
+    handles = []
+    try:
+        arrays = {}
+        for key, array in shared:
+            if array is None:
+                continue
+            array = np.ascontiguousarray(array)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            handles.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            arrays[key] = (shm.name, array.shape, array.dtype.str)
+
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_attach_pyramid,
+                                 initargs=(arrays, start, end, cell_size, list(reduced))) as pool:
+            tiles = sum(pool.map(_write_tile_column, *zip(*[(directory,) + task for task in tasks])))
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    metadata = pyramid.metadata()
+    metadata['tile_count'] = tiles
+    with open(os.path.join(directory, 'tiles.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def main():
+    import argparse
+    import glob
+
+    from dead_end_solver import load_maze
+
+    parser = argparse.ArgumentParser(description="Export a maze as a deep-zoom XYZ tile pyramid")
+    parser.add_argument('maze', nargs='?', help="Maze JSON file (default: latest in mazes/)")
+    parser.add_argument('--cell-size', type=int, default=4,
+                        help="Pixels per cell at the deepest zoom, a power of two (default: 4)")
+    parser.add_argument('--solution', action='store_true', help="Add the saved solution as an overlay layer")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', help="Output directory (default: <maze>_tiles next to the maze)")
+    args = parser.parse_args()
+
+    if args.maze:
+        directory, filename = os.path.split(args.maze)
+        directory = directory or "mazes"
+    else:
+        maze_files = glob.glob("mazes/maze_*.json")
+        if not maze_files:
+            print("No maze files found in 'mazes/' directory")
+            print("Generate a maze first using maze.py or large_maze_generator.py")
+            sys.exit(1)
+        directory, filename = "mazes", os.path.basename(max(maze_files, key=os.path.getctime))
+
+    maze, start, end, data = load_maze(filename, directory)
+
+    solution = None
+    if args.solution:
+        if 'solution' not in data:
+            print(f"{filename} has no saved solution")
+            sys.exit(1)
+        solution = np.array(data['solution'], dtype=np.uint8)
+
+    output = args.output or os.path.join(directory, filename.replace('.json', '_tiles'))
+    print(f"Exporting {maze.shape[1]}x{maze.shape[0]} maze as tiles to {output}...")
+
+    start_time = time.time()
+    metadata = export_pyramid(maze, output, solution, start, end, args.cell_size, args.workers)
+    elapsed = time.time() - start_time
+
+    print(f"Zoom levels 0-{metadata['max_zoom']}, {metadata['tile_count']:,} tiles "
+          f"in {elapsed:.1f} seconds")
+    for layer, template in metadata['layers'].items():
+        print(f"  {layer}: {os.path.join(output, template)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from dead_end_solver import load_maze
+from distance_field import compute_distance_field
+
+
+def maze_checksum(maze):
+    """CRC of the open/wall layout, used to detect stale index files."""
+    return zlib.crc32(np.packbits(np.asarray(maze) == 0).tobytes())
+
+
+def index_path_for(maze_filepath):
+    """Path of the tree index stored next to a maze JSON file."""
+    return maze_filepath.replace('.json', '_tree.npz')
+
+
+class MazeTreeIndex:
+    """
+    Precomputed LCA index for perfect mazes.
+
+    Mazes from LargeMazeGenerator.generate_iterative are spanning trees over
+    their open cells, so the path between any two cells is unique. The index
+    roots the tree, stores parent and depth per open cell, and a binary
+    lifting table so that path lengths cost O(log n) and paths cost
+    O(path length) instead of a full search per query.
+
+    Open cells are addressed by compact node ids: node i is the open cell
+    with flat index cells[i] (cells is sorted).
+    """
+
+    def __init__(self, shape, cells, parent, depth, up, root, checksum=None):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.cells = cells
+        self.parent = parent
+        self.depth = depth
+        self.up = up
+        self.root = int(root)
+        self.checksum = checksum
+
+    @classmethod
+    def build(cls, maze, root=(1, 1), budget=None):
+        """
+        Build the index for a perfect maze.
+
+        Args:
+            maze (numpy.ndarray): Maze array (1 = wall, 0 = path)
+            root (tuple): Cell (y, x) the tree is rooted at
+            budget (SolveBudget): Optional limits for the BFS from the root;
+                SolveInterrupted is raised when they run out
+
+        Returns:
+            MazeTreeIndex
+        """
+        maze = np.asarray(maze)
+        height, width = maze.shape
+        open_flat = (maze == 0).ravel()
+
+        if not open_flat[root[0] * width + root[1]]:
+            raise ValueError(f"Root position {root} is a wall")
+
+        cells = np.flatnonzero(open_flat)
+        n = len(cells)
+
+        # A connected graph is a tree iff it has exactly n - 1 edges
+        open_grid = maze == 0
+        edges = (int(np.count_nonzero(open_grid[:, :-1] & open_grid[:, 1:])) +
+                 int(np.count_nonzero(open_grid[:-1, :] & open_grid[1:, :])))
+        if edges != n - 1:
+            raise ValueError(
+                f"Maze is not a perfect maze ({n:,} open cells, {edges:,} passages); "
+                "tree index requires exactly one path between any two cells")
+
+        dist = compute_distance_field(maze, root, budget=budget)
+        depth = dist.ravel()[cells]
+        if np.any(depth < 0):
+            raise ValueError("Maze is not connected; tree index requires a perfect maze")
+
+        # In a tree every non-root cell has exactly one neighbour one step closer
+        # to the root, so parents fall out of the BFS distances without a walk
+        dist_pad = np.full((height + 2, width + 2), -1, dtype=np.int32)
+        dist_pad[1:-1, 1:-1] = dist
+        dist_pad = dist_pad.ravel()
+        stride = width + 2
+        ys, xs = np.divmod(cells, width)
+        padded = (ys + 1) * stride + xs + 1
+
+        root_flat = root[0] * width + root[1]
+        parent_flat = np.full(n, root_flat, dtype=np.int64)
+        for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            is_parent = (depth > 0) & (dist_pad[padded + dy * stride + dx] == depth - 1)
+            parent_flat[is_parent] = cells[is_parent] + dy * width + dx
+
+        return cls.from_parents(maze.shape, cells, parent_flat, depth,
+                                root_flat, checksum=maze_checksum(maze))
+
+    @classmethod
+    def from_parents(cls, shape, cells, parent_flat, depth, root_flat, checksum=None):
+        """Build the lifting table from per-node parent flat indices and depths."""
+        parent = np.searchsorted(cells, parent_flat).astype(np.int32)
+        depth = depth.astype(np.int32)
+        root = int(np.searchsorted(cells, root_flat))
+
+        levels = max(1, int(depth.max()).bit_length())
+        up = np.empty((levels, len(cells)), dtype=np.int32)
+        up[0] = parent
+        for k in range(1, levels):
+            up[k] = up[k - 1][up[k - 1]]
+
+        return cls(shape, cells, parent, depth, up, root, checksum=checksum)
+
+    def node(self, pos):
+        """Node id of open cell (y, x)."""
+        y, x = pos
+        if not (0 <= y < self.shape[0] and 0 <= x < self.shape[1]):
+            raise ValueError(f"Position {pos} is out of bounds")
+        flat = y * self.shape[1] + x
+        i = int(np.searchsorted(self.cells, flat))
+        if i >= len(self.cells) or self.cells[i] != flat:
+            raise ValueError(f"Position {pos} is a wall")
+        return i
+
+    def position(self, node):
+        """Cell (y, x) of a node id."""
+        y, x = divmod(int(self.cells[node]), self.shape[1])
+        return (y, x)
+
+    def _lift(self, a, steps):
+        k = 0
+        while steps:
+            if steps & 1:
+                a = int(self.up[k, a])
+            steps >>= 1
+            k += 1
+        return a
+
+    def lca(self, a, b):
+        """Lowest common ancestor of two node ids in O(log n)."""
+        da, db = int(self.depth[a]), int(self.depth[b])
+        if da < db:
+            a, b, da, db = b, a, db, da
+        a = self._lift(a, da - db)
+        if a == b:
+            return a
+        for k in range(len(self.up) - 1, -1, -1):
+            ua, ub = int(self.up[k, a]), int(self.up[k, b])
+            if ua != ub:
+                a, b = ua, ub
+        return int(self.parent[a])
+
+    def path_length(self, start, end):
+        """Number of moves on the unique path between two open cells."""
+        a, b = self.node(start), self.node(end)
+        c = self.lca(a, b)
+        return int(self.depth[a]) + int(self.depth[b]) - 2 * int(self.depth[c])
+
+    def path(self, start, end):
+        """
+        Unique path between two open cells.
+
+        Returns:
+            list: Cells (y, x) from start to end inclusive
+        """
+        a, b = self.node(start), self.node(end)
+        c = self.lca(a, b)
+
+        up_part = []
+        while a != c:
+            up_part.append(a)
+            a = int(self.parent[a])
+        down_part = []
+        while b != c:
+            down_part.append(b)
+            b = int(self.parent[b])
+
+        nodes = up_part + [c] + down_part[::-1]
+        return [self.position(i) for i in nodes]
+
+    def solution_grid(self, start, end):
+        """Solution array in the format used by the solvers (1 = path cell)."""
+        solution = np.zeros(self.shape, dtype=np.uint8)
+        for y, x in self.path(start, end):
+            solution[y, x] = 1
+        return solution
+
+    def matches(self, maze):
+        return (tuple(maze.shape) == self.shape and
+                (self.checksum is None or self.checksum == maze_checksum(maze)))
+
+    def save(self, path):
+        np.savez(path, shape=np.array(self.shape), cells=self.cells, parent=self.parent,
+                 depth=self.depth, up=self.up, root=np.array(self.root),
+                 checksum=np.array(-1 if self.checksum is None else self.checksum, dtype=np.int64))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            checksum = int(data['checksum'])
+            return cls(tuple(data['shape']), data['cells'], data['parent'], data['depth'],
+                       data['up'], int(data['root']),
+                       checksum=None if checksum < 0 else checksum)
+
+
+def load_or_build_index(maze, maze_filepath=None, root=(1, 1)):
+    """
+    Load the tree index saved next to a maze file, rebuilding it if missing or stale.
+
+    Args:
+        maze (numpy.ndarray): The maze the index must describe
+        maze_filepath (str): Path of the maze JSON file (index is not persisted if None)
+        root (tuple): Root cell used when building
+
+    Returns:
+        MazeTreeIndex
+    """
+    index_path = index_path_for(maze_filepath) if maze_filepath else None
+
+    if index_path and os.path.exists(index_path):
+        index = MazeTreeIndex.load(index_path)
+        if index.matches(maze):
+            return index
+        print("Tree index is stale, rebuilding...")
+
+    start_time = time.time()
+    index = MazeTreeIndex.build(maze, root=root)
+    print(f"Tree index built in {time.time() - start_time:.2f} seconds "
+          f"({len(index.cells):,} nodes, {len(index.up)} lifting levels)")
+
+    if index_path:
+        index.save(index_path)
+        print(f"Tree index saved to: {index_path}")
+
+    return index
+
+
+def solve_maze_tree_index(maze, start, end, index=None):
+    """
+    Solve a perfect maze with a tree index.
+
+    Returns:
+        tuple: (solution, path_length, solve_time)
+    """
+    if index is None:
+        index = MazeTreeIndex.build(maze, root=start)
+
+    start_time = time.time()
+    solution = index.solution_grid(start, end)
+    path_length = index.path_length(start, end)
+    solve_time = time.time() - start_time
+
+    return solution, path_length, solve_time
+
+
+if __name__ == "__main__":
+    import glob
+
+    maze_files = glob.glob("mazes/maze_*.json")
+
+    if not maze_files:
+        print("No maze files found in 'mazes/' directory")
+        print("Run 'python large_maze_generator.py' to create a maze first")
+        sys.exit(0)
+
+    latest_file = max(maze_files, key=os.path.getctime)
+    filename = os.path.basename(latest_file)
+
+    print(f"\n{'='*60}")
+    print(f"Loading maze: {filename}")
+    print(f"{'='*60}\n")
+
+    maze, start, end, maze_data = load_maze(filename)
+    index = load_or_build_index(maze, latest_file)
+
+    query_start = time.time()
+    length = index.path_length(start, end)
+    length_time = time.time() - query_start
+
+    query_start = time.time()
+    path = index.path(start, end)
+    path_time = time.time() - query_start
+
+    print(f"\nStart: {start}  End: {end}")
+    print(f"Path length: {length:,} moves ({length_time * 1000:.3f} ms)")
+    print(f"Path cells: {len(path):,} ({path_time * 1000:.1f} ms)")
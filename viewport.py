@@ -0,0 +1,375 @@
+import math
+
+import numpy as np
+import pygame
+
+
+MAX_SCALE = 64
+
+CONTROLS = "mouse wheel or +/- to zoom, drag or arrow keys to pan, F to fit, 0 to reset"
+
+
+def _sum_2x2(counts, dtype):
+    # Sum each 2x2 block of the last two axes, padding odd sizes with zeros
+    *lead, height, width = counts.shape
+    padded = np.zeros((*lead, height + height % 2, width + width % 2), dtype=dtype)
+    padded[..., :height, :width] = counts
+    return padded.reshape(*lead, padded.shape[-2] // 2, 2, padded.shape[-1] // 2, 2).sum(
+        axis=(-3, -1), dtype=dtype)
+
+
+def _sum_blocks(cells, block, dtype):
+    # Sum each block x block square (block a power of two), padding the edges with
+    # zeros; pairwise adds of strided halves are several times faster than a 4D sum
+    height, width = cells.shape
+    sums = np.zeros((-(-height // block) * block, -(-width // block) * block), dtype=dtype)
+    sums[:height, :width] = cells
+    while block > 1:
+        sums = sums[:, ::2] + sums[:, 1::2]
+        sums = sums[::2] + sums[1::2]
+        block //= 2
+    return sums
+
+
+def _count_dtype(level):
+    cells = 4 ** level
+    if cells <= np.iinfo(np.uint8).max:
+        return np.uint8
+    if cells <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.uint32
+
+
+class Viewport:
+    """
+    Pan and zoom window onto a maze-sized grid of palette codes.
+
+    Only the visible window is ever drawn. From one pixel per cell upwards
+    the window's codes are looked up in the palette and scaled up; below
+    that the view is a downsampled overview read from a pyramid of per-code
+    cell counts over 2x2, 4x4, ... blocks: each pixel gets the mean color of
+    its block, with highlight codes (solution, start, end) painted over it so
+    thin paths stay visible. The pyramid is built once and kept current by
+    set_cells, so a frame costs O(visible pixels) however large the maze is.
+
+    Scales are whole pixels per cell, or 1/2, 1/4, ... in the overview,
+    where the window is aligned to whole blocks.
+
+    Without the pyramid the codes array is shared instead of copied and
+    the overview is block-reduced from the visible window on every render,
+    O(visible cells): the mode for a grid that changes too fast to track
+    cell by cell, such as a maze being carved, drawn with render() alone.
+    """
+
+    def __init__(self, codes, palette, view_size, scale=1, highlight=(), grid_color=None,
+                 background=None, origin=(0, 0), pyramid=True):
+        """
+        Args:
+            codes (numpy.ndarray): 2D palette indices, one per cell; the
+                viewport keeps its own uint8 copy
+            palette (numpy.ndarray): RGB color per code
+            view_size (tuple): (width, height) of the view in pixels
+            scale (int): Initial pixels per cell
+            highlight (sequence): Codes drawn over the overview wherever a
+                block contains one, later codes on top
+            grid_color (tuple): Optional one pixel border around cells
+                larger than 2px
+            background (tuple): Color beyond the maze edges (palette[0] by default)
+            origin (tuple): Pixel (x, y) of the view on the target surface
+            pyramid (bool): Keep the overview pyramid; when False, codes
+                (a uint8 array) is used as is and read at every render
+        """
+        self.codes = np.array(codes, dtype=np.uint8) if pyramid else codes
+        self.palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        self.view_width, self.view_height = view_size
+        self.highlight = list(highlight)
+        self.grid_color = grid_color
+        self.background = self.palette[0] if background is None else np.asarray(background, dtype=np.uint8)
+        self.origin = origin
+
+        rows, cols = self.codes.shape
+        # Deepest pyramid level: the whole maze fits in the view
+        ratio = max(rows / max(1, self.view_height), cols / max(1, self.view_width))
+        self.max_level = math.ceil(math.log2(ratio)) if ratio > 1 else 0
+        self.pyramid = pyramid
+        self.levels = self._build_levels() if pyramid else [None]
+
+        self.home_scale = max(1, int(scale))
+        self.scale = self.home_scale
+        self.top = self.left = 0
+        self.changed = True
+        self._dragging = False
+        self._residual = [0.0, 0.0]
+
+    def _build_levels(self):
+        levels = [None]
+        if not self.max_level:
+            return levels
+
+        # Level 1 one code at a time to keep the temporaries at one byte per cell
+        dtype = _count_dtype(1)
+        first = np.stack([_sum_2x2((self.codes == code).view(np.uint8), dtype)
+                          for code in range(len(self.palette))])
+        levels.append(first)
+        for level in range(2, self.max_level + 1):
+            levels.append(_sum_2x2(levels[-1], _count_dtype(level)))
+        return levels
+
+    @property
+    def block(self):
+        """Cells per pixel along each axis in the overview (1 when zoomed in)."""
+        return 1 if self.scale >= 1 else int(round(1 / self.scale))
+
+    @property
+    def level(self):
+        return self.block.bit_length() - 1
+
+    def visible_cells(self):
+        """(rows, cols) of cells the view spans at the current scale."""
+        if self.scale >= 1:
+            return math.ceil(self.view_height / self.scale), math.ceil(self.view_width / self.scale)
+        return self.view_height * self.block, self.view_width * self.block
+
+    def _clamp(self):
+        rows, cols = self.codes.shape
+        visible_rows, visible_cols = self.visible_cells()
+        top = min(max(0, int(self.top)), max(0, rows - visible_rows))
+        left = min(max(0, int(self.left)), max(0, cols - visible_cols))
+        block = self.block
+        self.top, self.left = top - top % block, left - left % block
+
+    def _set_view(self, scale, top, left):
+        before = (self.scale, self.top, self.left)
+        self.scale, self.top, self.left = scale, top, left
+        self._clamp()
+        if (self.scale, self.top, self.left) != before:
+            self.changed = True
+            return True
+        return False
+
+    def zoom(self, steps, anchor=None):
+        """
+        Zoom in (steps > 0) or out by powers of two, keeping the cell under
+        anchor - a pixel (x, y) in the view, its center by default - in place.
+        """
+        ax, ay = anchor if anchor is not None else (self.view_width // 2, self.view_height // 2)
+        cell_y = self.top + ay / self.scale
+        cell_x = self.left + ax / self.scale
+
+        scale = self.scale
+        for _ in range(abs(steps)):
+            if steps > 0:
+                scale = min(MAX_SCALE, scale * 2)
+            elif scale > 1:
+                scale = max(1, scale // 2)
+            else:
+                scale = max(scale / 2, 1 / (1 << self.max_level))
+        if scale >= 1:
+            scale = int(scale)
+        return self._set_view(scale, cell_y - ay / scale, cell_x - ax / scale)
+
+    def pan(self, dx, dy):
+        """Move the maze by (dx, dy) pixels, like dragging it."""
+        # Sub-cell drags accumulate until they add up to whole cells
+        self._residual[0] -= dx / self.scale
+        self._residual[1] -= dy / self.scale
+        step_x, step_y = int(self._residual[0]), int(self._residual[1])
+        self._residual[0] -= step_x
+        self._residual[1] -= step_y
+        return self._set_view(self.scale, self.top + step_y, self.left + step_x)
+
+    def fit(self):
+        """Zoom out until the whole maze is in view."""
+        return self._set_view(1 / (1 << self.max_level) if self.max_level else 1, 0, 0)
+
+    def reset(self):
+        return self._set_view(self.home_scale, 0, 0)
+
+    def handle_event(self, event):
+        """
+        Apply a pygame mouse or keyboard event; see CONTROLS.
+
+        Returns:
+            bool: Whether the view moved
+        """
+        ox, oy = self.origin
+
+        def in_view(pos):
+            return 0 <= pos[0] - ox < self.view_width and 0 <= pos[1] - oy < self.view_height
+
+        if event.type == pygame.MOUSEWHEEL:
+            pos = pygame.mouse.get_pos()
+            if in_view(pos) and event.y:
+                return self.zoom(1 if event.y > 0 else -1, (pos[0] - ox, pos[1] - oy))
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self._dragging = in_view(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self._dragging = False
+        elif event.type == pygame.MOUSEMOTION and self._dragging:
+            return self.pan(*event.rel)
+        elif event.type == pygame.KEYDOWN:
+            step_x, step_y = self.view_width // 4, self.view_height // 4
+            moves = {pygame.K_LEFT: (step_x, 0), pygame.K_RIGHT: (-step_x, 0),
+                     pygame.K_UP: (0, step_y), pygame.K_DOWN: (0, -step_y)}
+            if event.key in moves:
+                return self.pan(*moves[event.key])
+            if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                return self.zoom(1)
+            if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                return self.zoom(-1)
+            if event.key in (pygame.K_f, pygame.K_HOME):
+                return self.fit()
+            if event.key in (pygame.K_0, pygame.K_KP0):
+                return self.reset()
+        return False
+
+    def set_cells(self, ys, xs, codes):
+        """
+        Change cell codes, keeping the overview pyramid in step.
+
+        Cells must be distinct; nothing is drawn.
+        """
+        ys = np.asarray(ys, dtype=np.intp)
+        xs = np.asarray(xs, dtype=np.intp)
+        codes = np.asarray(codes, dtype=np.uint8)
+        old = self.codes[ys, xs]
+        moved = old != codes
+        if not moved.any():
+            return
+        ys, xs, old, codes = ys[moved], xs[moved], old[moved], codes[moved]
+        self.codes[ys, xs] = codes
+
+        for level in range(1, len(self.levels)):
+            counts = self.levels[level]
+            by, bx = ys >> level, xs >> level
+            np.add.at(counts, (codes, by, bx), 1)
+            np.subtract.at(counts, (old, by, bx), 1)
+
+    def _window_counts(self):
+        # Per-code counts of the visible blocks, from the pyramid or reduced on the spot
+        block = self.block
+        if self.pyramid:
+            return self.levels[self.level][:, self.top // block:self.top // block + self.view_height,
+                                           self.left // block:self.left // block + self.view_width]
+
+        window = self.codes[self.top:self.top + self.view_height * block,
+                            self.left:self.left + self.view_width * block]
+        dtype = _count_dtype(self.level)
+        counts = np.zeros((len(self.palette), -(-window.shape[0] // block), -(-window.shape[1] // block)),
+                          dtype=dtype)
+        for code in range(len(self.palette)):
+            cells = window == code
+            if cells.any():
+                counts[code] = _sum_blocks(cells.view(np.uint8), block, dtype)
+        return counts
+
+    def _overview_colors(self, counts):
+        # Mean color of each block, then highlight codes painted over it
+        n, height, width = counts.shape
+        flat = counts.reshape(n, -1).astype(np.float32)
+        total = flat.sum(axis=0)
+        total[total == 0] = 1
+        rgb = (self.palette.T.astype(np.float32) @ flat) / total
+        rgb = np.rint(rgb.T).astype(np.uint8).reshape(height, width, 3)
+        for code in self.highlight:
+            rgb[counts[code] > 0] = self.palette[code]
+        return rgb
+
+    def _target(self, surface):
+        ox, oy = self.origin
+        # pixels3d is indexed (x, y, channel); transpose to rows
+        return pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)[
+            oy:oy + self.view_height, ox:ox + self.view_width]
+
+    def render(self, surface):
+        """
+        Draw the whole view.
+
+        Returns:
+            pygame.Rect: Area of the surface drawn
+        """
+        rows, cols = self.codes.shape
+        if self.scale >= 1:
+            scale = self.scale
+            visible_rows, visible_cols = self.visible_cells()
+            window = self.codes[self.top:self.top + visible_rows, self.left:self.left + visible_cols]
+            pixels = self.palette[window]
+            if scale > 1:
+                pixels = np.repeat(np.repeat(pixels, scale, axis=0), scale, axis=1)
+        else:
+            pixels = self._overview_colors(self._window_counts())
+
+        view = self._target(surface)
+        try:
+            height = min(pixels.shape[0], view.shape[0])
+            width = min(pixels.shape[1], view.shape[1])
+            view[height:] = self.background
+            view[:height, width:] = self.background
+            view[:height, :width] = pixels[:height, :width]
+
+            if self.grid_color is not None and self.scale > 2:
+                for axis, limit in ((0, height), (1, width)):
+                    edges = np.arange(0, limit, self.scale)
+                    lines = np.concatenate([edges, edges + self.scale - 1])
+                    lines = lines[lines < limit]
+                    if axis == 0:
+                        view[lines, :width] = self.grid_color
+                    else:
+                        view[:height, lines] = self.grid_color
+        finally:
+            del view
+
+        self.changed = False
+        return pygame.Rect(self.origin, (self.view_width, self.view_height))
+
+    def paint(self, surface, ys, xs):
+        """
+        Redraw only the given cells (or, in the overview, their blocks).
+
+        Returns:
+            pygame.Rect: Area of the surface drawn, or None if none of the
+            cells are in view
+        """
+        ys = np.asarray(ys, dtype=np.intp)
+        xs = np.asarray(xs, dtype=np.intp)
+        visible_rows, visible_cols = self.visible_cells()
+        keep = ((ys >= self.top) & (ys < self.top + visible_rows) &
+                (xs >= self.left) & (xs < self.left + visible_cols))
+        ys, xs = ys[keep], xs[keep]
+        if not ys.size:
+            return None
+        if self.scale < 1 and not self.pyramid:
+            return self.render(surface)
+
+        view = self._target(surface)
+        try:
+            height, width = view.shape[:2]
+            if self.scale >= 1:
+                scale = self.scale
+                inset = 1 if self.grid_color is not None and scale > 2 else 0
+                offsets = np.arange(inset, scale - inset)
+                py = (ys - self.top)[:, None] * scale + offsets
+                px = (xs - self.left)[:, None] * scale + offsets
+                # Cells cut by the view edge: pixels past it repeat the cell's first one
+                inside = (py[:, 0] < height) & (px[:, 0] < width)
+                ys, xs, py, px = ys[inside], xs[inside], py[inside], px[inside]
+                if not ys.size:
+                    return None
+                py = np.where(py < height, py, py[:, :1])
+                px = np.where(px < width, px, px[:, :1])
+                view[py[:, :, None], px[:, None, :]] = self.palette[self.codes[ys, xs]][:, None, None]
+                y0, x0 = (int(ys.min()) - self.top) * scale, (int(xs.min()) - self.left) * scale
+                y1, x1 = (int(ys.max()) - self.top + 1) * scale, (int(xs.max()) - self.left + 1) * scale
+            else:
+                level = self.level
+                blocks = np.unique(np.stack([ys >> level, xs >> level]), axis=1)
+                by, bx = blocks
+                colors = self._overview_colors(self.levels[level][:, by, bx][:, :, None])
+                py, px = by - self.top // self.block, bx - self.left // self.block
+                view[py, px] = colors[:, 0]
+                y0, x0, y1, x1 = int(py.min()), int(px.min()), int(py.max()) + 1, int(px.max()) + 1
+        finally:
+            del view
+
+        ox, oy = self.origin
+        return pygame.Rect(ox + x0, oy + y0, min(x1, self.view_width) - x0, min(y1, self.view_height) - y0)